@@ -1,111 +1,319 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Query
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+import io
 import os
-import shutil
+import logging
+from typing import List, Literal, Optional
+from pydantic import BaseModel
 
 
 from utils import ID_TO_TABLE, TABLE_TO_ID
 
 import pandas as pd
-from database import DatabaseManager
+from database import DatabaseManager, TABLE_NAMES
 from report_generator import ReportGenerator
+from report_cache import ReportCache
+from export import EXPORT_FORMATS, encode_batches
+from report_jobs import ReportJobManager
+from renderer import RendererPool
+import config
+import profiling
 
 import base64
-import os
-from PIL import Image
-from io import BytesIO
+from images import get_thumbnail
+
+logger = logging.getLogger(__name__)
 
-# Initialize database and report generator
-db_manager = DatabaseManager()
-report_generator = ReportGenerator(db_manager)
+# Initialize database and report generator. Seeding is explicit (python -m database seed),
+# so a restart or --reload never replaces imported rows with the CSVs in assets/
+db_manager = DatabaseManager(initialize=False, read_replica=bool(config.READ_REPLICA))
+renderer_pool = RendererPool(config.RENDER_POOL_WORKERS) if config.RENDER_POOL_WORKERS > 0 else None
+report_cache = ReportCache() if config.REPORT_CACHE_MAX_BYTES > 0 else None
+report_generator = ReportGenerator(db_manager, renderer=renderer_pool, cache=report_cache)
+report_jobs = ReportJobManager(report_generator)
 
 # Create V1 Router
 router_v1 = APIRouter(prefix="/api/v1", tags=["v1"])
 
 @router_v1.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
-    """Upload a CSV file and import data into the enhanced database"""
+def upload_csv(
+    file: UploadFile = File(...),
+    mode: str = Query("replace", pattern="^(replace|upsert)$"),
+    delete_missing: bool = Query(False),
+):
+    """
+    Upload a CSV file and stream it into the database in batches.
+
+    mode=replace reloads the whole table; mode=upsert merges the file on the
+    table's ID column and, with delete_missing, removes rows absent from it.
+    """
+    def log_progress(rows_done, rows_per_second):
+        logger.info("Importing %s: %d rows (%.0f rows/s)", file.filename, rows_done, rows_per_second)
+
+    # The upload is spooled to disk by the multipart parser; parse it incrementally from there
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
     try:
-        # Create uploads directory if not exists
-        os.makedirs('uploads', exist_ok=True)
-        
-        # Save uploaded file
-        file_path = os.path.join('uploads', file.filename)
-        with open(file_path, 'wb') as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        df = pd.read_csv(file_path)
-
-        db_manager.import_csv(df)
-        
+        stats = db_manager.import_csv_stream(
+            stream, mode=mode, delete_missing=delete_missing, progress=log_progress
+        )
+
         return JSONResponse(
             status_code=200, 
             content={
                 "filename": file.filename, 
-                "tablename": ID_TO_TABLE.get(df.columns[0], None),
+                "tablename": stats["table"],
+                "rows": stats["rows"],
+                "rows_per_second": stats["rows_per_second"],
+                "mode": stats["mode"],
+                "inserted": stats["inserted"],
+                "updated": stats["updated"],
+                "deleted": stats["deleted"],
+                "student_ids": stats["student_ids"],
+                "rejected": stats["rejected"],
+                "reject_file": stats["reject_path"],
                 "status": "Uploaded and imported successfully",
                 "message": "Data has been successfully imported into the database."
             }
         )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Leave closing the underlying upload to FastAPI
+        stream.detach()
 
 @router_v1.get("/table/{table_name}")
-async def get_table_data(table_name: str, limit = Query(100), id: int = Query(None)):
-    """Retrieve data from specified table"""
+def get_table_data(
+    request: Request,
+    table_name: str,
+    limit: int = Query(100),
+    id: int = Query(None),
+    after: int = Query(None),
+    columns: str = Query(None),
+    filter: List[str] = Query(None),
+    total: bool = Query(False),
+):
+    """
+    Retrieve one page of a table in primary key order.
+
+    - after: cursor from the X-Next-Cursor header of the previous page
+    - columns: comma-separated projection; the primary key is always returned
+    - filter: column:operator:value with operator eq, lt, lte, gt or gte, repeatable;
+      only the primary key and indexed columns can be filtered
+    - total: also return the number of matching rows in X-Total-Count
+
+    The body is the list of rows; a Link header points at the next page.
+    """
     try:
-        with db_manager.get_connection() as conn:
-            if id:
-                query = f'select * from {table_name} where {TABLE_TO_ID[table_name]} = {int(id)}  LIMIT {limit}'
-            else:
-                query = f'select * from {table_name} LIMIT {limit}'
-            return pd.read_sql(query, conn).to_dict('records')
+        filters = [tuple(condition.split(":", 2)) for condition in filter or []]
+        if any(len(condition) != 3 for condition in filters):
+            raise ValueError("Filters must look like column:operator:value.")
+        if id:
+            # Unknown tables fall through to get_table_page, which rejects them
+            filters.append((TABLE_TO_ID.get(TABLE_NAMES.get(table_name.lower()), "id"), "eq", id))
+
+        page = db_manager.get_table_page(
+            table_name,
+            limit=limit,
+            after=after,
+            columns=columns.split(",") if columns else None,
+            filters=filters,
+            with_total=total,
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    headers = {}
+    if page["next_cursor"] is not None:
+        headers["X-Next-Cursor"] = str(page["next_cursor"])
+        headers["Link"] = f'<{request.url.include_query_params(after=page["next_cursor"])}>; rel="next"'
+    if page["total"] is not None:
+        headers["X-Total-Count"] = str(page["total"])
+    return JSONResponse(content=page["rows"], headers=headers)
+
 
+@router_v1.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    compress: bool = Query(False),
+):
+    """
+    Stream a table, or the joined all-grades dataset, as CSV or NDJSON.
+
+    Rows are read and encoded in fixed-size batches while the response is
+    being sent; compress=true gzips the stream.
+    """
+    try:
+        chunks = encode_batches(db_manager.iter_dataset(dataset), format, compress)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    filename = f"{dataset.lower()}.{format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if compress else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def requested_profile(
+    profile: Optional[str] = Query(None),
+    x_profile: Optional[str] = Header(None),
+) -> Optional[str]:
+    """Profile mode asked for with ?profile= or an X-Profile header; always None unless ARS_PROFILING is on"""
+    mode = profile or x_profile
+    if not config.PROFILING or mode is None:
+        return None
+    if mode not in profiling.PROFILE_MODES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown profile mode {mode!r}, expected one of {', '.join(profiling.PROFILE_MODES)}.",
+        )
+    return mode
+
+
+# Report rendering is CPU-bound, so these handlers are sync and run in FastAPI's threadpool
 @router_v1.get("/reports/student-profile/{student_id}")
-async def generate_student_profile_report(student_id: int):
+def generate_student_profile_report(student_id: int, profile_mode: Optional[str] = Depends(requested_profile)):
     """Generate comprehensive student profile report"""
     try:
-        pdf_path = report_generator.generate_student_profile_report(student_id)
-        return FileResponse(pdf_path, media_type='application/pdf', filename=f'student_{student_id}_profile_report.pdf')
+        with profiling.profiled(profile_mode, f"student-profile-{student_id}") as profile:
+            pdf_path = report_generator.generate_student_profile_report(student_id)
+        return FileResponse(pdf_path, media_type='application/pdf', filename=f'student_{student_id}_profile_report.pdf',
+                            headers=profile.headers() if profile else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router_v1.get("/reports/academic-performance")
-async def generate_academic_performance_report():
+def generate_academic_performance_report(profile_mode: Optional[str] = Depends(requested_profile)):
     """Generate comprehensive academic performance distribution report"""
     try:
-        pdf_path = report_generator.generate_academic_performance_report()
-        return FileResponse(pdf_path, media_type='application/pdf', filename='academic_performance_report.pdf')
+        with profiling.profiled(profile_mode, "academic-performance") as profile:
+            pdf_path = report_generator.generate_academic_performance_report()
+        return FileResponse(pdf_path, media_type='application/pdf', filename='academic_performance_report.pdf',
+                            headers=profile.headers() if profile else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router_v1.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """Download a request profile by the id from the X-Profile-Id header of the profiled response"""
+    try:
+        if not config.PROFILING:
+            raise LookupError("Profiling is disabled.")
+        path = profiling.profile_path(profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    media_type = "text/plain" if path.endswith(".collapsed") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+@router_v1.get("/reports/cache")
+async def get_report_cache_stats():
+    """Return hit/miss counters and the size of the rendered report cache"""
+    if report_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **report_cache.stats()}
+
+
+@router_v1.get("/reports/cohort")
+def generate_cohort_reports(
+    university_id: Optional[int] = Query(None),
+    academic_year: Optional[int] = Query(None),
+    student_ids: Optional[List[int]] = Query(None),
+):
+    """
+    Generate the profile reports of a cohort and stream them as a ZIP archive.
+
+    Filter by university, academic year and/or repeated student_ids; PDFs are
+    added to the archive as they finish rendering.
+    """
+    try:
+        chunks = report_generator.stream_cohort_zip(university_id, academic_year, student_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="cohort_profile_reports.zip"'},
+    )
+
+
+class ReportJobRequest(BaseModel):
+    report_type: Literal["student-profile", "academic-performance"]
+    student_id: Optional[int] = None
+
+
+def _report_job_response(job):
+    return {
+        **job.to_dict(),
+        "status_url": f"{router_v1.prefix}/report-jobs/{job.id}",
+        "download_url": f"{router_v1.prefix}/report-jobs/{job.id}/download",
+    }
+
+
+@router_v1.post("/report-jobs", status_code=202)
+async def create_report_job(request: ReportJobRequest):
+    """Queue a report for background rendering and return its job id"""
+    params = {}
+    if request.report_type == "student-profile":
+        if request.student_id is None:
+            raise HTTPException(status_code=422, detail="student_id is required for student-profile reports")
+        params["student_id"] = request.student_id
+
+    job = report_jobs.submit(request.report_type, **params)
+    return _report_job_response(job)
+
+
+@router_v1.get("/report-jobs/{job_id}")
+async def get_report_job(job_id: str):
+    """Return the status of a report job"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found or expired")
+    return _report_job_response(job)
+
+
+@router_v1.get("/report-jobs/{job_id}/download")
+async def download_report_job(job_id: str):
+    """Download the PDF produced by a finished report job"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found or expired")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status}")
+
+    filename = (
+        f"student_{job.params['student_id']}_profile_report.pdf"
+        if job.report_type == "student-profile" else "academic_performance_report.pdf"
+    )
+    return FileResponse(job.output_path, media_type="application/pdf", filename=filename)
+
+
 @router_v1.get("/image/{image_name}")
-async def get_image(image_name: str):
+def get_image(image_name: str):
     try:
         image_path = os.path.join("static", "imgs", "students", image_name)
 
         if not os.path.exists(image_path):
             raise HTTPException(status_code=404, detail="Image not found")
 
-        # Open and convert image to base64
-        with Image.open(image_path) as img:
-            # Resize if needed
-            img.thumbnail((300, 300))
-
-            # Convert to RGB if necessary
-            if img.mode in ("RGBA", "LA"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])
-                img = background
-
-            # Save to bytes
-            buffer = BytesIO()
-            img.save(buffer, format="JPEG", quality=85)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        # Same resized JPEG as embedded in reports, shared through the thumbnail cache
+        image_base64 = base64.b64encode(get_thumbnail(image_path)).decode("utf-8")
 
         return {"image": f"data:image/jpeg;base64,{image_base64}"}
 
@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+REMOTE_SCHEMES = ('http://', 'https://')
+
+
+class AssetResolver:
+    """
+    Local copies of remote report assets such as university logos.
+
+    Each URL is downloaded once through a pooled session with strict
+    timeouts and stored under directory with its ETag/Last-Modified
+    validators. A copy younger than revalidate_seconds is used without any
+    network I/O; an older one is revalidated with a conditional GET. When
+    the host is slow or down the last good copy keeps being served and the
+    host is not retried for retry_seconds, so rendering never waits on a
+    remote host for more than one timeout.
+    """
+
+    def __init__(self, directory=None, timeout=None, revalidate_seconds=None, retry_seconds=None,
+                 max_bytes=None, session=None):
+        """
+        Args:
+            directory (str): Where assets are stored, defaults to config.ASSET_CACHE_DIR.
+            timeout (tuple): (connect, read) timeout in seconds for every request.
+            revalidate_seconds (int): Age after which a stored copy is revalidated.
+            retry_seconds (int): How long a failed URL is not requested again.
+            max_bytes (int): Downloads larger than this are rejected.
+            session (requests.Session): Session to reuse, a pooled one by default.
+        """
+        self.directory = directory or config.ASSET_CACHE_DIR
+        self.timeout = timeout or (config.ASSET_CONNECT_TIMEOUT, config.ASSET_READ_TIMEOUT)
+        self.revalidate_seconds = (
+            config.ASSET_REVALIDATE_SECONDS if revalidate_seconds is None else revalidate_seconds
+        )
+        self.max_bytes = config.ASSET_MAX_BYTES if max_bytes is None else max_bytes
+        self.retry_seconds = config.ASSET_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.session = session or self._create_session()
+        self._data_uris = {}
+        self._url_locks = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _paths(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + '.asset', base + '.json'
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def resolve(self, url):
+        """
+        Return the path of a local copy of url, downloading or revalidating it if needed.
+
+        Args:
+            url (str): http(s) URL of the asset.
+
+        Returns:
+            str: Path of the stored asset, or None if it was never fetched successfully.
+        """
+        asset_path, meta_path = self._paths(url)
+
+        # One download per URL at a time; other callers wait and reuse it
+        with self._url_lock(url):
+            meta = self._read_meta(meta_path)
+            if meta is not None and time.time() - meta['fetched_at'] < self.revalidate_seconds:
+                return asset_path
+
+            # Do not pay a timeout on every report while a host is down
+            failed_at = self._failures.get(url)
+            if failed_at is not None and time.time() - failed_at < self.retry_seconds:
+                return asset_path if meta is not None else None
+
+            try:
+                self._fetch(url, asset_path, meta_path, meta)
+                self._failures.pop(url, None)
+            except (requests.RequestException, ValueError) as e:
+                self._failures[url] = time.time()
+                if meta is None:
+                    logger.warning("Could not fetch asset %s: %s", url, e)
+                    return None
+                logger.warning("Could not revalidate asset %s, using the stored copy: %s", url, e)
+            return asset_path
+
+    def _fetch(self, url, asset_path, meta_path, meta):
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and meta is not None:
+                meta['fetched_at'] = time.time()
+                self._write(meta_path, json.dumps(meta).encode('utf-8'))
+                return
+            response.raise_for_status()
+            if response.status_code != 200:
+                raise ValueError(f'unexpected status {response.status_code}')
+
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ValueError(f'asset is larger than {self.max_bytes} bytes')
+                chunks.append(chunk)
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+            new_meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_type': content_type or mimetypes.guess_type(url)[0] or 'application/octet-stream',
+                'fetched_at': time.time(),
+            }
+
+        # Asset first, so the metadata never points at a missing or partial file
+        self._write(asset_path, b''.join(chunks))
+        self._write(meta_path, json.dumps(new_meta).encode('utf-8'))
+        with self._lock:
+            self._data_uris.pop(url, None)
+
+    @staticmethod
+    def _read_meta(meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def data_uri(self, url):
+        """
+        Return an asset as a data: URI so templates embed it without network I/O.
+
+        Local paths and existing data URIs are returned unchanged.
+
+        Args:
+            url (str): Asset URL or local path.
+
+        Returns:
+            str: data: URI of the stored copy, or '' if the asset is unavailable.
+        """
+        if not url or not url.startswith(REMOTE_SCHEMES):
+            return url or ''
+
+        asset_path = self.resolve(url)
+        if asset_path is None:
+            return ''
+
+        with self._lock:
+            cached = self._data_uris.get(url)
+        stat = os.stat(asset_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns:
+            return cached[1]
+
+        content_type = self._read_meta(self._paths(url)[1])['content_type']
+        with open(asset_path, 'rb') as f:
+            uri = f"data:{content_type};base64,{base64.b64encode(f.read()).decode('ascii')}"
+        with self._lock:
+            self._data_uris[url] = (stat.st_mtime_ns, uri)
+        return uri
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def default_resolver():
+    """Return the process-wide AssetResolver"""
+    global _default_resolver
+    if _default_resolver is None:
+        with _default_resolver_lock:
+            if _default_resolver is None:
+                _default_resolver = AssetResolver()
+    return _default_resolver
@@ -0,0 +1,99 @@
+"""
+Measure academic performance statistics as the Grades table grows.
+
+The seeded database gets --students synthetic students, and for each row
+count a synthetic Grades table of that size. Then it reports:
+
+- stats:   DatabaseManager.get_academic_statistics, served from the summary tables
+- rebuild: rebuild_summaries, i.e. the full aggregation scan the summaries avoid
+- upsert:  an upsert of 100 changed grades, including incremental summary maintenance
+
+Usage:
+    python -m benchmarks.bench_academic_statistics [--rows 100000 1000000] [--students 10000]
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from database import DatabaseManager
+
+BAND_BOUNDS = [50, 60, 70, 80, 90]
+
+
+def students_csv(count, university_id):
+    buffer = io.StringIO()
+    buffer.write('StudentID,FirstName,LastName,AcademicYear,DateOfBirth,Email,ImageURL,UniversityID\n')
+    for student_id in range(1, count + 1):
+        buffer.write(f'{student_id},First{student_id},Last{student_id},2025,2000-01-01,'
+                     f'student{student_id}@example.com,,{university_id}\n')
+    buffer.seek(0)
+    return buffer
+
+
+def grades_csv(rows, student_ids, exam_ids, seed=42, first_id=1):
+    rng = np.random.default_rng(seed)
+    buffer = io.StringIO()
+    buffer.write('GradeID,StudentID,ExamID,MarksObtained\n')
+    np.savetxt(buffer, np.column_stack([
+        np.arange(first_id, first_id + rows),
+        rng.choice(student_ids, rows),
+        rng.choice(exam_ids, rows),
+        rng.integers(0, 101, rows),
+    ]), fmt='%d', delimiter=',')
+    buffer.seek(0)
+    return buffer
+
+
+def timed(call, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--csv-dir', default='assets/')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        manager = DatabaseManager(db_path=os.path.join(work_dir, 'bench.db'), csv_dir=args.csv_dir)
+        with manager.connection() as conn:
+            university_id = conn.execute('SELECT MIN(UniversityID) FROM Universities').fetchone()[0]
+            exam_ids = [row[0] for row in conn.execute('SELECT ExamID FROM Exams')]
+        manager.import_csv_stream(students_csv(args.students, university_id))
+        student_ids = np.arange(1, args.students + 1)
+
+        print(f"{'grades':>12}{'stats ms':>12}{'rebuild ms':>12}{'upsert ms':>12}")
+        for rows in args.rows:
+            manager.import_csv_stream(grades_csv(rows, student_ids, exam_ids))
+
+            stats = timed(lambda: manager.get_academic_statistics(BAND_BOUNDS), args.iterations)
+            rebuild = timed(manager.rebuild_summaries, args.iterations)
+            upsert = timed(
+                lambda: manager.import_csv_stream(
+                    grades_csv(100, student_ids, exam_ids, seed=time.time_ns() % 2**32, first_id=rows // 2),
+                    mode='upsert',
+                ),
+                args.iterations,
+            )
+            print(f"{rows:>12,}{stats * 1000:>12.2f}{rebuild * 1000:>12.1f}{upsert * 1000:>12.1f}")
+        manager.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
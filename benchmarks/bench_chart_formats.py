@@ -0,0 +1,66 @@
+"""
+Compare chart output formats by render time and PDF size for both reports.
+
+Report data is fetched once from a database seeded from assets/; only the
+render phase (charts, template and xhtml2pdf) is timed.
+
+Usage:
+    python -m benchmarks.bench_chart_formats [--iterations 5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import config
+from database import DatabaseManager
+from report_generator import ReportGenerator
+
+# name -> (CHART_FORMAT, CHART_DPI, CHART_PNG_COLORS)
+MODES = {
+    'png 100dpi': ('png', 100, 0),
+    'png 72dpi': ('png', 72, 0),
+    'png 100dpi 64c': ('png', 100, 64),
+    'png 72dpi 64c': ('png', 72, 64),
+    'svg': ('svg', 100, 0),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        db_manager = DatabaseManager(db_path=os.path.join(work_dir, 'bench.db'))
+        generator = ReportGenerator(db_manager)
+        student_id = int(db_manager.get_all_students()['StudentID'].iloc[0])
+        reports = {
+            'student profile': ('render_student_profile', generator._student_profile_data(student_id)),
+            'academic performance': ('render_academic_performance', generator._academic_performance_data()),
+        }
+        db_manager.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'report':<22}{'mode':<16}{'ms/report':>10}{'PDF KiB':>10}")
+    for report_name, (task, data) in reports.items():
+        for mode_name, (chart_format, dpi, colors) in MODES.items():
+            config.CHART_FORMAT, config.CHART_DPI, config.CHART_PNG_COLORS = chart_format, dpi, colors
+
+            timings = []
+            for _ in range(args.iterations):
+                task_args = [part.copy() if hasattr(part, 'copy') else part for part in data]
+                start = time.perf_counter()
+                pdf_bytes = getattr(generator, task)(*task_args)
+                timings.append(time.perf_counter() - start)
+
+            print(f"{report_name:<22}{mode_name:<16}{statistics.mean(timings) * 1000:>10.0f}"
+                  f"{len(pdf_bytes) / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare pooled DatabaseManager connections against connect-per-call.
+
+Runs the four queries behind a student profile report for every student in
+the seeded database and reports the mean latency per report.
+
+Usage:
+    python -m benchmarks.bench_connection_pool [--iterations 50]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from database import DatabaseManager
+
+
+class ConnectPerCallManager(DatabaseManager):
+    """DatabaseManager that opens a fresh, unconfigured connection per call."""
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def profile_queries(manager, student_ids):
+    for student_id in student_ids:
+        manager.get_student_data_by_id(student_id)
+        manager.get_subjects_per_student(student_id)
+        manager.get_grades_per_student(student_id)
+        manager.get_university_per_student(student_id)
+
+
+def run(manager, student_ids, iterations):
+    # Warm up once so both variants start with a hot OS page cache
+    profile_queries(manager, student_ids)
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        profile_queries(manager, student_ids)
+        samples.append((time.perf_counter() - start) / len(student_ids))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--csv-dir', default='assets/')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        db_path = os.path.join(work_dir, 'bench.db')
+        pooled = DatabaseManager(db_path=db_path, csv_dir=args.csv_dir)
+        student_ids = pooled.get_all_students()['StudentID'].tolist()
+        per_call = ConnectPerCallManager(db_path=db_path, initialize=False)
+
+        results = {
+            'connect-per-call': run(per_call, student_ids, args.iterations),
+            'pooled': run(pooled, student_ids, args.iterations),
+        }
+        pooled.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'variant':<18}{'mean ms/report':>16}{'p95 ms/report':>16}")
+    for name, samples in results.items():
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(f"{name:<18}{statistics.mean(samples) * 1000:>16.3f}{p95 * 1000:>16.3f}")
+
+    speedup = statistics.mean(results['connect-per-call']) / statistics.mean(results['pooled'])
+    print(f"\npooled is {speedup:.2f}x faster per profile report")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare streaming export against materializing a table through pandas.
+
+For each row count a synthetic Grades table is loaded, then exported by
+both paths in separate child processes so peak memory is measured
+independently:
+
+- pandas:    pd.read_sql(...).to_dict('records') serialized as one JSON array
+- streaming: DatabaseManager.iter_dataset + export.encode_batches (NDJSON)
+
+Usage:
+    python -m benchmarks.bench_export [--rows 1000000 5000000]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_ingest import write_grades_csv
+
+
+def run_worker(mode, db_path):
+    """Export Grades from db_path to /dev/null and print timings and peak RSS as JSON"""
+    import pandas as pd
+    from database import DatabaseManager
+    from export import encode_batches
+
+    manager = DatabaseManager(db_path=db_path, initialize=False)
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    if mode == 'pandas':
+        with manager.connection() as conn:
+            data = json.dumps(pd.read_sql('SELECT * FROM Grades', conn).to_dict('records')).encode()
+        first_byte = time.perf_counter() - start
+        size = len(data)
+    else:
+        for chunk in encode_batches(manager.iter_dataset('Grades'), 'ndjson'):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    seconds = time.perf_counter() - start
+    manager.close()
+
+    print(json.dumps({
+        'first_byte_ms': first_byte * 1000,
+        'seconds': seconds,
+        'megabytes': size / 2**20,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    from database import DatabaseManager
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        print(f"{'rows':>12}{'path':>12}{'first byte ms':>15}{'seconds':>10}{'peak RSS MB':>14}")
+        for rows in args.rows:
+            csv_path = os.path.join(work_dir, 'grades.csv')
+            db_path = os.path.join(work_dir, f'grades_{rows}.db')
+            write_grades_csv(csv_path, rows)
+            manager = DatabaseManager(db_path=db_path, initialize=False)
+            manager.create_table_from_csv(None, 'Grades')
+            with open(csv_path, newline='') as f:
+                manager.import_csv_stream(f)
+            manager.close()
+
+            for mode in ('pandas', 'streaming'):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_export', '--worker', mode, db_path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>12,}{mode:>12}{result['first_byte_ms']:>15.1f}"
+                      f"{result['seconds']:>10.2f}{result['peak_rss_mb']:>14.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare loading grades through SQL against opening the columnar snapshot.
+
+For each row count the seeded database gets a synthetic Grades table of
+that size, then every variant runs in a fresh child process, the way a
+report worker starts:
+
+- sql:      GradeStore.load, the four-way join decoded row by row
+- snapshot: DatabaseManager.get_grade_store, memory-mapping the snapshot
+
+Each worker reports its load time, the time of a first top-N over the
+loaded grades, and its private memory (Private_Clean + Private_Dirty of
+/proc/self/smaps_rollup). Pages of the mapped snapshot are shared through
+the page cache, so they do not count as private. The parent also reports
+how long writing the snapshot takes; imports leave that to a background
+thread.
+
+Usage:
+    python -m benchmarks.bench_grade_snapshot [--rows 1000000 5000000] [--students 100000]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_academic_statistics import grades_csv, students_csv
+
+
+def private_megabytes():
+    with open('/proc/self/smaps_rollup') as f:
+        fields = dict(line.split(':', 1) for line in f if ':' in line)
+    return sum(int(fields[name].split()[0]) for name in ('Private_Clean', 'Private_Dirty')) / 1024
+
+
+def run_worker(mode, db_path):
+    """Load every grade from db_path and print timings and private memory as JSON"""
+    from database import DatabaseManager
+    from grade_store import GradeStore
+
+    manager = DatabaseManager(db_path=db_path, initialize=False)
+    baseline = private_megabytes()
+    start = time.perf_counter()
+    if mode == 'sql':
+        with manager.read_transaction() as conn:
+            store = GradeStore.load(conn)
+    else:
+        store = manager.get_grade_store()
+    loaded = time.perf_counter()
+    store.top_students(3)
+    finished = time.perf_counter()
+
+    print(json.dumps({
+        'load_ms': (loaded - start) * 1000,
+        'top_ms': (finished - loaded) * 1000,
+        'private_mb': private_megabytes() - baseline,
+    }))
+    manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--students', type=int, default=100_000)
+    parser.add_argument('--csv-dir', default='assets/')
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    from database import DatabaseManager
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        manager = DatabaseManager(db_path=os.path.join(work_dir, 'bench.db'), csv_dir=args.csv_dir)
+        with manager.connection() as conn:
+            university_id = conn.execute('SELECT MIN(UniversityID) FROM Universities').fetchone()[0]
+            exam_ids = [row[0] for row in conn.execute('SELECT ExamID FROM Exams')]
+        manager.import_csv_stream(students_csv(args.students, university_id))
+        student_ids = np.arange(1, args.students + 1)
+
+        print(f"{'grades':>12}{'variant':>10}{'load ms':>10}{'top-N ms':>10}{'private MB':>12}{'write ms':>10}")
+        for rows in args.rows:
+            manager.import_csv_stream(grades_csv(rows, student_ids, exam_ids))
+            # Wait for the background write the import scheduled, then time a write of our own
+            manager.close()
+            shutil.rmtree(manager.snapshot_dir)
+            start = time.perf_counter()
+            manager.write_grade_snapshot()
+            write_ms = (time.perf_counter() - start) * 1000
+
+            for mode in ('sql', 'snapshot'):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_grade_snapshot', '--worker', mode, manager.db_path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>12,}{mode:>10}{result['load_ms']:>10.1f}{result['top_ms']:>10.1f}"
+                      f"{result['private_mb']:>12.1f}{write_ms if mode == 'snapshot' else 0:>10.0f}")
+        manager.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the columnar GradeStore against an object-dtype grades DataFrame.
+
+For each row count a synthetic grades frame is built like the one
+get_all_grades returns, converted to a GradeStore, and both are measured:
+
+- memory:   DataFrame.memory_usage(deep=True) against GradeStore.nbytes
+- lookup:   one student's grades, by boolean mask against a store slice
+- top-N:    groupby-mean + nlargest against GradeStore.top_students
+
+Usage:
+    python -m benchmarks.bench_grade_store [--rows 1000000 5000000] [--lookups 200]
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from grade_store import GradeStore
+
+SUBJECTS = [(f'Subject {index}', f'Department {index % 6}') for index in range(20)]
+
+
+def grades_frame(rows, students, seed=42):
+    rng = np.random.default_rng(seed)
+    subjects = rng.integers(0, len(SUBJECTS), rows)
+    dates = np.datetime64('2024-01-01') + rng.integers(0, 365, rows).astype('timedelta64[D]')
+    return pd.DataFrame({
+        'StudentID': rng.integers(1, students + 1, rows),
+        'SubjectName': [SUBJECTS[index][0] for index in subjects],
+        'Department': [SUBJECTS[index][1] for index in subjects],
+        'ExamName': [f'Exam {index}' for index in subjects],
+        'ExamDate': dates.astype(str).astype(object),
+        'StudentMarks': rng.integers(0, 101, rows),
+        'MaxMarks': np.full(rows, 100),
+    })
+
+
+def timed(call, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--students', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}{'variant':>12}{'memory MB':>12}{'lookup us':>12}{'top-N ms':>12}")
+    for rows in args.rows:
+        df = grades_frame(rows, args.students)
+        store = GradeStore.from_frame(df)
+        student_ids = np.random.default_rng(7).integers(1, args.students + 1, args.lookups).tolist()
+
+        def frame_lookups():
+            for student_id in student_ids:
+                df[df['StudentID'] == student_id]
+
+        def store_lookups():
+            for student_id in student_ids:
+                store.student_grades(student_id)
+
+        def frame_top():
+            percentage = df['StudentMarks'] / df['MaxMarks'] * 100
+            percentage.groupby(df['StudentID']).mean().nlargest(3)
+
+        results = {
+            'dataframe': (df.memory_usage(deep=True).sum(), timed(frame_lookups, 3), timed(frame_top, 3)),
+            # Drop the cached percentages so top-N pays for computing them
+            'store': (store.nbytes, timed(store_lookups, 3),
+                      timed(lambda: (setattr(store, '_percentages', None), store.top_students(3)), 3)),
+        }
+        for variant, (nbytes, lookups, top) in results.items():
+            print(f"{rows:>12,}{variant:>12}{nbytes / 2**20:>12.1f}"
+                  f"{lookups / len(student_ids) * 1e6:>12.1f}{top * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare streaming CSV ingestion against the previous pandas upload path.
+
+For each row count a synthetic Grades CSV is written, then imported by
+both paths in separate child processes so peak memory is measured
+independently:
+
+- pandas:    pd.read_csv of the whole file, then DataFrame.to_sql
+- streaming: DatabaseManager.import_csv_stream with batched executemany
+
+Usage:
+    python -m benchmarks.bench_ingest [--rows 1000000 10000000]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def write_grades_csv(path, rows, chunk_size=1_000_000):
+    rng = np.random.default_rng(42)
+    with open(path, 'w') as f:
+        f.write('GradeID,StudentID,ExamID,MarksObtained\n')
+        for start in range(0, rows, chunk_size):
+            count = min(chunk_size, rows - start)
+            chunk = np.column_stack([
+                np.arange(start + 1, start + count + 1),
+                rng.integers(1, 100_000, count),
+                rng.integers(1, 1_000, count),
+                rng.integers(0, 101, count),
+            ])
+            np.savetxt(f, chunk, fmt='%d', delimiter=',')
+
+
+def run_worker(mode, csv_path, db_path):
+    """Import csv_path into a fresh database and print timing and peak RSS as JSON"""
+    import pandas as pd
+    from database import DatabaseManager
+
+    manager = DatabaseManager(db_path=db_path, initialize=False)
+    manager.create_table_from_csv(None, 'Grades')
+
+    start = time.perf_counter()
+    if mode == 'pandas':
+        df = pd.read_csv(csv_path)
+        with manager.connection() as conn:
+            conn.execute('DELETE FROM Grades')
+            df.drop_duplicates().to_sql('Grades', conn, if_exists='append', index=False)
+    else:
+        with open(csv_path, newline='') as f:
+            manager.import_csv_stream(f)
+    seconds = time.perf_counter() - start
+    manager.close()
+
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'CSV', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        print(f"{'rows':>12}{'path':>12}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>14}")
+        for rows in args.rows:
+            csv_path = os.path.join(work_dir, f'grades_{rows}.csv')
+            write_grades_csv(csv_path, rows)
+
+            for mode in ('pandas', 'streaming'):
+                db_path = os.path.join(work_dir, f'{mode}_{rows}.db')
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_ingest', '--worker', mode, csv_path, db_path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>12,}{mode:>12}{result['seconds']:>10.2f}"
+                      f"{rows / result['seconds']:>12,.0f}{result['peak_rss_mb']:>14.1f}")
+                os.remove(db_path)
+
+            os.remove(csv_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
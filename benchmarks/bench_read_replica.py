@@ -0,0 +1,90 @@
+"""
+Compare the hot read paths served from the database file and from the in-memory read replica.
+
+For each row count the seeded database gets --students synthetic students
+and a synthetic Grades table of that size. The same database is then read
+by two managers, one with read_replica off and one with it on, through:
+
+- bundle:  get_student_report_bundle of a random student
+- grades:  get_grades_per_student of a random student
+- page:    a 100-row get_table_page of Grades after a random cursor
+- stats:   get_academic_statistics
+
+It also reports how long a replica refresh (the backup copy made after
+every import) takes. The file is warm in the OS page cache for both
+managers, which is the best case for the file path.
+
+Usage:
+    python -m benchmarks.bench_read_replica [--rows 100000 1000000] [--students 10000]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_academic_statistics import BAND_BOUNDS, grades_csv, students_csv
+from database import DatabaseManager
+
+
+def per_call(call, arguments):
+    """Median seconds of call over arguments, after one warm-up call"""
+    call(arguments[0])
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--csv-dir', default='assets/')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        db_path = os.path.join(work_dir, 'bench.db')
+        writer = DatabaseManager(db_path=db_path, csv_dir=args.csv_dir)
+        with writer.connection() as conn:
+            university_id = conn.execute('SELECT MIN(UniversityID) FROM Universities').fetchone()[0]
+            exam_ids = [row[0] for row in conn.execute('SELECT ExamID FROM Exams')]
+        writer.import_csv_stream(students_csv(args.students, university_id))
+        student_ids = np.arange(1, args.students + 1)
+
+        print(f"{'grades':>12}{'reads from':>12}{'bundle us':>11}{'grades us':>11}{'page us':>9}"
+              f"{'stats ms':>10}{'refresh ms':>12}")
+        for rows in args.rows:
+            writer.import_csv_stream(grades_csv(rows, student_ids, exam_ids))
+            writer.close()
+
+            rng = np.random.default_rng(rows)
+            students = rng.choice(student_ids, args.calls).tolist()
+            cursors = rng.integers(1, rows, args.calls).tolist()
+            for replica in (False, True):
+                manager = DatabaseManager(db_path=db_path, initialize=False, read_replica=replica)
+                start = time.perf_counter()
+                manager.refresh_replica()
+                refresh = time.perf_counter() - start
+
+                bundle = per_call(manager.get_student_report_bundle, students)
+                grades = per_call(manager.get_grades_per_student, students)
+                page = per_call(lambda after: manager.get_table_page('Grades', limit=100, after=after), cursors)
+                stats = per_call(lambda _: manager.get_academic_statistics(BAND_BOUNDS), [None] * 20)
+                manager.close()
+
+                print(f"{rows:>12,}{'replica' if replica else 'file':>12}{bundle * 1e6:>11.0f}{grades * 1e6:>11.0f}"
+                      f"{page * 1e6:>9.0f}{stats * 1000:>10.2f}{refresh * 1000 if replica else 0:>12.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure student profile rendering throughput in-process and in RendererPool.
+
+Report data is fetched once up front, so only rendering (charts, Jinja and
+xhtml2pdf) is timed. The pool is warmed up before timing, as it is when
+the API starts.
+
+Usage:
+    python -m benchmarks.bench_renderer_pool [--reports 40] [--workers 1 2 4]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from database import DatabaseManager
+from renderer import RendererPool
+from report_generator import ReportGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=40)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count()}))
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        db_manager = DatabaseManager(db_path=os.path.join(work_dir, 'bench.db'))
+        generator = ReportGenerator(db_manager)
+        student_ids = db_manager.get_all_students()['StudentID'].tolist()
+        tasks = [generator._student_profile_data(student_ids[i % len(student_ids)]) for i in range(args.reports)]
+        db_manager.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'renderer':<16}{'seconds':>10}{'reports/s':>12}")
+
+    start = time.perf_counter()
+    for grades_df, metadata in tasks:
+        generator.render_student_profile(grades_df.copy(), metadata)
+    seconds = time.perf_counter() - start
+    print(f"{'in-process':<16}{seconds:>10.2f}{args.reports / seconds:>12.2f}")
+
+    for workers in args.workers:
+        pool = RendererPool(workers=workers)
+        pool.warm_up()
+
+        start = time.perf_counter()
+        futures = [pool.submit('render_student_profile', grades_df, metadata) for grades_df, metadata in tasks]
+        for future in futures:
+            future.result()
+        seconds = time.perf_counter() - start
+        pool.shutdown()
+
+        print(f"{f'pool x{workers}':<16}{seconds:>10.2f}{args.reports / seconds:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
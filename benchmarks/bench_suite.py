@@ -0,0 +1,302 @@
+"""
+Time the whole service on a synthetic dataset and write the results as JSON.
+
+A dataset of the requested size is generated with benchmarks.synthetic
+(or read from --data-dir), then the suite times:
+
+- seed:          DatabaseManager seeding a fresh database from the CSVs
+- import.*:      import_csv upserting --import-rows changed grades, and
+                 import_csv_stream replacing the whole Grades table
+- query.*:       every DatabaseManager get_* read, with random students
+- report.*:      both report types rendered by ReportGenerator, uncached
+- api.table.*:   GET /api/v1/table pages through the FastAPI router
+
+Every result holds the median, p95, min and mean in milliseconds of its
+calls. The JSON also records the commit, the environment and the dataset,
+so runs can be compared across commits with --compare.
+
+get_all_grades and get_all_students build a DataFrame of the whole table;
+above --max-full-rows rows they are recorded as skipped.
+
+Usage:
+    python -m benchmarks.bench_suite [--size 10k] [--students N] [--grades N] [--output results.json]
+    python -m benchmarks.bench_suite --compare baseline.json results.json
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+# Bump when results change meaning, e.g. a renamed or re-scoped benchmark
+SUITE_VERSION = 1
+
+BAND_BOUNDS = [50, 60, 70, 80, 90]
+
+# DatabaseManager methods named get_* that are not queries
+NOT_QUERIES = {'get_connection'}
+
+
+def summarize(samples):
+    """Milliseconds statistics of a list of durations in seconds"""
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        'calls': len(ms),
+        'median_ms': statistics.median(ms),
+        'p95_ms': ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))],
+        'min_ms': ms[0],
+        'mean_ms': statistics.fmean(ms),
+    }
+
+
+def timed(call, arguments, warm_up=True):
+    """Time call once per argument, after an untimed warm-up call"""
+    if warm_up:
+        call(arguments[0])
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def git_revision():
+    """(commit, dirty) of the working tree, or (None, None) outside a git checkout"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], check=True, capture_output=True, text=True).stdout
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.strip(), bool(status.strip())
+
+
+def query_benchmarks(manager, rng, calls, ids, max_full_rows):
+    """
+    Name -> (call, arguments) for every DatabaseManager get_* read.
+
+    Raises:
+        RuntimeError: If DatabaseManager has a get_* method without a benchmark,
+            so new queries cannot silently drop out of the suite.
+    """
+    student_ids = rng.choice(ids['Students'], calls).tolist()
+    university_ids = rng.choice(ids['Universities'], calls).tolist()
+    cursors = rng.integers(ids['Grades'].start, ids['Grades'].stop, calls).tolist()
+    # Whole-cohort reads are slow; a few calls are enough
+    few = max(3, calls // 20)
+    cohort_ids = rng.choice(ids['Students'], (few, 100)).tolist()
+
+    benchmarks = {
+        'get_data_version': (lambda student_id: manager.get_data_version(student_id), student_ids),
+        'get_student_data_by_id': (manager.get_student_data_by_id, student_ids),
+        'get_university_per_student': (manager.get_university_per_student, student_ids),
+        'get_subjects_per_student': (manager.get_subjects_per_student, student_ids),
+        'get_grades_per_student': (manager.get_grades_per_student, student_ids),
+        'get_student_report_bundle': (manager.get_student_report_bundle, student_ids),
+        'get_university_details': (manager.get_university_details, university_ids),
+        'get_universities_details': (lambda _: manager.get_universities_details(), [None] * calls),
+        'get_table_page': (lambda after: manager.get_table_page('Grades', limit=100, after=after), cursors),
+        'get_academic_statistics': (lambda _: manager.get_academic_statistics(BAND_BOUNDS), [None] * few),
+        'get_cohort_report_data': (lambda cohort: manager.get_cohort_report_data(student_ids=cohort), cohort_ids),
+        'get_grade_store': (lambda cohort: manager.get_grade_store(student_ids=cohort), cohort_ids),
+        'get_all_students': (lambda _: manager.get_all_students(), [None] * few)
+        if len(ids['Students']) <= max_full_rows else None,
+        'get_all_grades': (lambda _: manager.get_all_grades(), [None] * few)
+        if len(ids['Grades']) <= max_full_rows else None,
+    }
+
+    queries = {
+        name for name, _ in inspect.getmembers(type(manager), inspect.isfunction)
+        if name.startswith('get_') and name not in NOT_QUERIES
+    }
+    missing = queries - set(benchmarks)
+    if missing:
+        raise RuntimeError(f'No benchmark for DatabaseManager.{", ".join(sorted(missing))}.')
+    return benchmarks
+
+
+def run_suite(data_dir, work_dir, calls, reports, import_rows, max_full_rows, seed):
+    """
+    Run every benchmark against a database seeded from data_dir.
+
+    Returns:
+        tuple: (rows per table, benchmark name -> result)
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from database import DatabaseManager
+    from report_generator import ReportGenerator
+
+    results = {}
+    rng = np.random.default_rng(seed)
+    db_path = os.path.join(work_dir, 'bench.db')
+
+    start = time.perf_counter()
+    manager = DatabaseManager(db_path=db_path, csv_dir=data_dir)
+    results['seed'] = summarize([time.perf_counter() - start])
+    # Let the background grade snapshot finish, so it does not compete with what is timed next
+    manager.close()
+
+    # IDs to draw random arguments from, so --data-dir works with any dataset. Grade
+    # cursors only need the GradeID range, which spares listing up to 100M IDs.
+    with manager.connection() as conn:
+        ids = {
+            table: np.array([row[0] for row in conn.execute(f'SELECT {column} FROM {table}')])
+            for table, column in (('Universities', 'UniversityID'), ('Students', 'StudentID'))
+        }
+        grade_count, first_grade, last_grade = conn.execute(
+            'SELECT COUNT(*), MIN(GradeID), MAX(GradeID) FROM Grades').fetchone()
+    ids['Grades'] = range(first_grade, last_grade + 1)
+
+    changed = pd.read_csv(os.path.join(data_dir, 'Grades.csv'), nrows=import_rows)
+    changed['MarksObtained'] = (changed['MarksObtained'] + 1) % 50
+    start = time.perf_counter()
+    manager.import_csv(changed, mode='upsert')
+    results['import.import_csv_upsert'] = summarize([time.perf_counter() - start])
+    manager.close()
+
+    start = time.perf_counter()
+    with open(os.path.join(data_dir, 'Grades.csv'), newline='') as f:
+        manager.import_csv_stream(f, mode='replace')
+    results['import.import_csv_stream_replace'] = summarize([time.perf_counter() - start])
+    manager.close()
+
+    for name, benchmark in query_benchmarks(manager, rng, calls, ids, max_full_rows).items():
+        results[f'query.{name}'] = {'skipped': f'more than {max_full_rows:,} rows'} if benchmark is None \
+            else timed(*benchmark)
+
+    generator = ReportGenerator(manager)
+    report_students = rng.choice(ids['Students'], reports).tolist()
+    results['report.student_profile'] = timed(
+        lambda student_id: generator.generate_student_profile_report(
+            student_id, output_path=os.path.join(work_dir, 'profile.pdf')),
+        report_students,
+    )
+    results['report.academic_performance'] = timed(
+        lambda _: generator.generate_academic_performance_report(
+            output_path=os.path.join(work_dir, 'performance.pdf')),
+        [None] * reports,
+    )
+
+    # The router module serves its own DatabaseManager; point it at the benchmark database
+    from api.v1 import router_v1 as router_module
+    served_manager, router_module.db_manager = router_module.db_manager, manager
+    try:
+        app = FastAPI()
+        app.include_router(router_module.router_v1)
+        client = TestClient(app)
+
+        def get(url):
+            response = client.get(url)
+            response.raise_for_status()
+
+        cursors = rng.integers(ids['Grades'].start, ids['Grades'].stop, calls).tolist()
+        students = rng.choice(ids['Students'], calls).tolist()
+        results['api.table.page'] = timed(get, [f'/api/v1/table/Grades?limit=100&after={after}' for after in cursors])
+        results['api.table.filtered'] = timed(
+            get, [f'/api/v1/table/Grades?limit=100&filter=StudentID:eq:{student_id}' for student_id in students])
+        results['api.table.projected'] = timed(
+            get, [f'/api/v1/table/Students?limit=100&after={student_id}&columns=FirstName,LastName'
+                  for student_id in students])
+    finally:
+        router_module.db_manager = served_manager
+
+    manager.close()
+    rows = {'Universities': len(ids['Universities']), 'Students': len(ids['Students']), 'Grades': grade_count}
+    return rows, results
+
+
+def compare(baseline_path, results_path):
+    """Print the median of every benchmark in two result files and their ratio"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(results_path) as f:
+        results = json.load(f)
+    if baseline['dataset'] != results['dataset']:
+        print(f"Warning: datasets differ: {baseline['dataset']} vs {results['dataset']}")
+
+    print(f"{'benchmark':<42}{'baseline ms':>14}{'ms':>14}{'ratio':>8}")
+    for name, result in results['results'].items():
+        before = baseline['results'].get(name, {})
+        if 'median_ms' not in result or 'median_ms' not in before:
+            continue
+        print(f"{name:<42}{before['median_ms']:>14.2f}{result['median_ms']:>14.2f}"
+              f"{result['median_ms'] / before['median_ms']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    synthetic.size_arguments(parser)
+    parser.add_argument('--data-dir', help='Use the CSVs in this directory instead of generating a dataset')
+    parser.add_argument('--calls', type=int, default=100, help='Calls per query benchmark')
+    parser.add_argument('--reports', type=int, default=5, help='Renders per report type')
+    parser.add_argument('--import-rows', type=int, default=10_000, help='Grades changed by the upsert import')
+    parser.add_argument('--max-full-rows', type=int, default=5_000_000,
+                        help='Skip whole-table DataFrame reads above this many rows')
+    parser.add_argument('--output', help='Write the JSON results here instead of printing them')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'RESULTS'), help='Compare two result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='ars_bench_')
+    try:
+        if args.data_dir:
+            data_dir = args.data_dir
+            dataset = {'data_dir': os.path.abspath(data_dir)}
+        else:
+            data_dir = os.path.join(work_dir, 'csv')
+            students, grades = synthetic.resolve_size(args)
+            start = time.perf_counter()
+            synthetic.generate(data_dir, students, grades, seed=args.seed)
+            dataset = {'students': students, 'grades': grades, 'seed': args.seed}
+            print(f'Generated {students:,} students and {grades:,} grades in {time.perf_counter() - start:.1f} s',
+                  file=sys.stderr)
+
+        dataset['rows'], results = run_suite(data_dir, work_dir, args.calls, args.reports, args.import_rows,
+                                             args.max_full_rows, args.seed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit, dirty = git_revision()
+    document = {
+        'suite_version': SUITE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'dataset': dataset,
+        'results': results,
+    }
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
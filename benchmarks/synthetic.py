@@ -0,0 +1,221 @@
+"""
+Deterministic synthetic datasets in the layout of assets/*.csv.
+
+generate writes Universities, Subjects, Students, Exams and Grades CSVs
+of any size into a directory that DatabaseManager can seed from
+(csv_dir). The same seed and sizes always produce byte-identical files,
+and every table draws from its own random stream, so growing the Grades
+table leaves the other four unchanged.
+
+Grades are written in chunks of GRADE_CHUNK rows, so 100M grades need no
+more memory than one chunk. Each student has an ability drawn once, and
+their marks scatter around it, so averages, bands and top students look
+like real cohorts rather than uniform noise. Photos cycle through the
+bundled static/imgs/students pictures and logos are left empty, so
+reports render without network access.
+
+Usage:
+    python -m benchmarks.synthetic OUT_DIR [--size 10k] [--students N] [--grades N] [--seed 0]
+"""
+import argparse
+import csv
+import math
+import os
+import time
+
+import numpy as np
+
+# Named sizes: students -> (students, grades)
+SIZES = {
+    '1k': (1_000, 20_000),
+    '10k': (10_000, 300_000),
+    '100k': (100_000, 5_000_000),
+    '1m': (1_000_000, 100_000_000),
+}
+
+GRADE_CHUNK = 1_000_000
+STUDENTS_PER_UNIVERSITY = 50_000
+
+DEPARTMENTS = {
+    'Economics': ['Microeconomics', 'Macroeconomics', 'Econometrics', 'Public Finance', 'Game Theory'],
+    'Biology': ['Genetics', 'Cell Biology', 'Ecology', 'Microbiology', 'Evolution'],
+    'Engineering': ['Fluid Dynamics', 'Thermodynamics', 'Statics', 'Control Systems', 'Materials Science'],
+    'Computer Science': ['Algorithms', 'Databases', 'Operating Systems', 'Networks', 'Compilers'],
+    'Mathematics': ['Linear Algebra', 'Calculus', 'Probability', 'Number Theory', 'Topology'],
+    'Physics': ['Mechanics', 'Electromagnetism', 'Quantum Physics', 'Optics', 'Astrophysics'],
+    'Chemistry': ['Organic Chemistry', 'Inorganic Chemistry', 'Biochemistry', 'Physical Chemistry', 'Spectroscopy'],
+    'Law': ['Civil Law', 'Criminal Law', 'Constitutional Law', 'Contract Law', 'International Law'],
+}
+EXAM_KINDS = ['Midterm', 'Final', 'Quiz', 'Project', 'Retake', 'Lab']
+# Exams are spread over one academic year, so monthly summaries have something to show
+EXAM_DAYS = (np.datetime64('2024-10-01'), np.datetime64('2025-06-30'))
+
+FIRST_NAMES = {
+    'ms': ['Adam', 'Rustam', 'James', 'Piotr', 'Luca', 'Omar', 'Kenji', 'Mateo', 'Noah', 'Ivan'],
+    'ws': ['Sarah', 'Anna', 'Maria', 'Aiko', 'Zofia', 'Elena', 'Fatima', 'Chloe', 'Priya', 'Lena'],
+}
+LAST_NAMES = ['Karimov', 'Johnson', 'Nowak', 'Rossi', 'Haddad', 'Tanaka', 'Garcia', 'Smith', 'Petrov',
+              'Kowalski', 'Muller', 'Silva', 'Chen', 'Dubois', 'Novak', 'Ahmed', 'Larsen', 'Costa']
+# Bundled photos in static/imgs/students
+PHOTOS = {'ms': 7, 'ws': 10}
+
+# Table -> index of its random stream
+_STREAMS = {'Universities': 0, 'Subjects': 1, 'Students': 2, 'Exams': 3, 'Grades': 4, 'Ability': 5}
+
+
+def _rng(seed, table, *extra):
+    return np.random.default_rng([seed, _STREAMS[table], *extra])
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _universities(seed, count):
+    rng = _rng(seed, 'Universities')
+    cities = rng.choice(['Wroclaw', 'Krakow', 'Lyon', 'Porto', 'Leeds', 'Austin', 'Osaka', 'Graz'], count)
+    for university_id, city in enumerate(cities, start=1):
+        yield (university_id, f'University of {city} {university_id}', '',
+               f'{university_id} College Road, {city}', f'office@u{university_id}.example.edu')
+
+
+def _subjects(count):
+    names = [(name, department) for department, subjects in DEPARTMENTS.items() for name in subjects]
+    for index in range(count):
+        name, department = names[index % len(names)]
+        # Past the named subjects, number them so names stay unique
+        cycle = index // len(names)
+        yield index + 1, f'{name} {cycle + 1}' if cycle else name, department
+
+
+def _exams(seed, count, subject_names):
+    rng = _rng(seed, 'Exams')
+    first_day, last_day = EXAM_DAYS
+    days = first_day + rng.integers(0, (last_day - first_day).astype(int) + 1, count)
+    maximum_marks = rng.choice([100, 100, 100, 50], count)
+    for index in range(count):
+        subject_id = index % len(subject_names) + 1
+        sitting = index // len(subject_names)
+        kind = EXAM_KINDS[sitting % len(EXAM_KINDS)]
+        number = sitting // len(EXAM_KINDS)
+        name = f'{kind} {subject_names[subject_id - 1]}' + (f' {number + 1}' if number else '')
+        yield index + 1, subject_id, name, str(days[index]), int(maximum_marks[index])
+
+
+def _students(seed, count, universities, chunk=100_000):
+    rng = _rng(seed, 'Students')
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        kinds = rng.choice(['ms', 'ws'], size)
+        first = rng.integers(0, len(FIRST_NAMES['ms']), size)
+        last = rng.integers(0, len(LAST_NAMES), size)
+        photos = rng.integers(1, 1 + max(PHOTOS.values()), size)
+        years = rng.integers(2022, 2026, size)
+        births = np.datetime64('1995-01-01') + rng.integers(0, 12 * 365, size)
+        university_ids = rng.integers(1, universities + 1, size)
+        for offset in range(size):
+            student_id = start + offset + 1
+            kind = kinds[offset]
+            first_name = FIRST_NAMES[kind][first[offset]]
+            last_name = LAST_NAMES[last[offset]]
+            photo = (photos[offset] - 1) % PHOTOS[kind] + 1
+            yield (student_id, first_name, last_name, int(years[offset]), str(births[offset]),
+                   f'{first_name}.{last_name}.{student_id}@student.u{university_ids[offset]}.example.edu'.lower(),
+                   f'{kind}-{photo}.jpg', int(university_ids[offset]))
+
+
+def _write_grades(path, seed, count, students, exams_maximum):
+    # One ability per student, drawn up front: 8 bytes per student
+    ability = _rng(seed, 'Ability').normal(68, 12, students)
+    with open(path, 'w') as f:
+        f.write('GradeID,StudentID,ExamID,MarksObtained\n')
+        for chunk_index, start in enumerate(range(0, count, GRADE_CHUNK)):
+            # A stream per chunk, so a chunk's rows do not depend on how many came before
+            rng = _rng(seed, 'Grades', chunk_index)
+            size = min(GRADE_CHUNK, count - start)
+            student_ids = rng.integers(1, students + 1, size)
+            exam_ids = rng.integers(1, len(exams_maximum) + 1, size)
+            percentage = np.clip(ability[student_ids - 1] + rng.normal(0, 10, size), 0, 100)
+            marks = np.rint(percentage * exams_maximum[exam_ids - 1] / 100).astype(np.int64)
+            # About three times faster than np.savetxt, which formats value by value
+            columns = (np.arange(start + 1, start + size + 1), student_ids, exam_ids, marks)
+            f.writelines(line + '\n' for line in map(','.join, zip(*(map(str, c.tolist()) for c in columns))))
+
+
+def generate(out_dir, students, grades, seed=0, universities=None, subjects=None, exams=None):
+    """
+    Write a synthetic dataset of the five seeded tables as CSVs.
+
+    Args:
+        out_dir (str): Directory for Universities.csv ... Grades.csv; created if missing.
+        students (int): Number of students.
+        grades (int): Number of grades, spread over random students and exams.
+        seed (int): Random seed; equal arguments give identical files.
+        universities (int): Defaults to one per STUDENTS_PER_UNIVERSITY students, at least two.
+        subjects (int): Defaults to the 40 named subjects of DEPARTMENTS.
+        exams (int): Defaults to three sittings per subject.
+
+    Returns:
+        dict: Rows written per table.
+
+    Raises:
+        ValueError: If a size is not positive.
+    """
+    universities = universities or max(2, math.ceil(students / STUDENTS_PER_UNIVERSITY))
+    subjects = subjects or sum(len(names) for names in DEPARTMENTS.values())
+    exams = exams or 3 * subjects
+    counts = {'Universities': universities, 'Subjects': subjects, 'Students': students,
+              'Exams': exams, 'Grades': grades}
+    if any(count < 1 for count in counts.values()):
+        raise ValueError(f'Every table needs at least one row, got {counts}.')
+
+    os.makedirs(out_dir, exist_ok=True)
+    _write_csv(os.path.join(out_dir, 'Universities.csv'),
+               ['UniversityID', 'UniversityName', 'LogoURL', 'Address', 'ContactDetails'],
+               _universities(seed, universities))
+    subject_rows = list(_subjects(subjects))
+    _write_csv(os.path.join(out_dir, 'Subjects.csv'), ['SubjectID', 'SubjectName', 'Department'], subject_rows)
+    exam_rows = list(_exams(seed, exams, [row[1] for row in subject_rows]))
+    _write_csv(os.path.join(out_dir, 'Exams.csv'),
+               ['ExamID', 'SubjectID', 'ExamName', 'ExamDate', 'MaximumMarks'], exam_rows)
+    _write_csv(os.path.join(out_dir, 'Students.csv'),
+               ['StudentID', 'FirstName', 'LastName', 'AcademicYear', 'DateOfBirth', 'Email', 'ImageURL',
+                'UniversityID'],
+               _students(seed, students, universities))
+    _write_grades(os.path.join(out_dir, 'Grades.csv'), seed, grades, students,
+                  np.array([row[4] for row in exam_rows], dtype=np.float64))
+    return counts
+
+
+def size_arguments(parser):
+    """Add --size, --students, --grades and --seed to an argument parser"""
+    parser.add_argument('--size', choices=SIZES, default='10k', help='Named dataset size')
+    parser.add_argument('--students', type=int, help='Override the number of students of --size')
+    parser.add_argument('--grades', type=int, help='Override the number of grades of --size')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def resolve_size(args):
+    """(students, grades) from the arguments added by size_arguments"""
+    students, grades = SIZES[args.size]
+    return args.students or students, args.grades or grades
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('out_dir')
+    size_arguments(parser)
+    args = parser.parse_args()
+
+    students, grades = resolve_size(args)
+    start = time.perf_counter()
+    counts = generate(args.out_dir, students, grades, seed=args.seed)
+    print(', '.join(f'{count:,} {table}' for table, count in counts.items()),
+          f'written to {args.out_dir} in {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
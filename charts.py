@@ -0,0 +1,325 @@
+"""
+Report charts built on matplotlib's object-oriented API.
+
+Figures are created directly with matplotlib.figure.Figure and an Agg
+canvas instead of pyplot, so they are never registered in pyplot's global
+figure manager. A figure lives exactly as long as the render_* call that
+draws it, which keeps long-running servers from accumulating figures and
+makes chart rendering independent of any process-wide "current figure".
+"""
+import base64
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from matplotlib import rc_context
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from PIL import Image
+
+import config
+import metrics
+
+
+class FigureTemplate:
+    """
+    Reusable figure layout: size and a grid of subplots.
+
+    Args:
+        figsize (tuple): Figure size in inches.
+        rows (int): Subplot grid rows.
+        cols (int): Subplot grid columns.
+        projections (dict): Subplot index (0-based) -> projection name, e.g. {2: 'polar'}.
+    """
+
+    def __init__(self, figsize, rows, cols, projections=None):
+        self.figsize = figsize
+        self.rows = rows
+        self.cols = cols
+        self.projections = projections or {}
+
+    def create(self):
+        """
+        Returns:
+            tuple: (Figure attached to an Agg canvas, list of its axes in grid order)
+        """
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        axes = [
+            fig.add_subplot(self.rows, self.cols, index + 1, projection=self.projections.get(index))
+            for index in range(self.rows * self.cols)
+        ]
+        return fig, axes
+
+
+CHART_FORMATS = ('png', 'svg')
+
+STUDENT_ACHIEVEMENTS = FigureTemplate(figsize=(15, 10), rows=2, cols=2, projections={2: 'polar'})
+ACADEMIC_PERFORMANCE = FigureTemplate(figsize=(15, 10), rows=2, cols=2)
+
+
+def figure_to_png(fig, dpi=None, colors=None):
+    """
+    Encode a figure as PNG.
+
+    Args:
+        fig (Figure): Figure to encode.
+        dpi (int): Output resolution, defaults to config.CHART_DPI.
+        colors (int): Quantize to a palette of this many colours, defaults to
+            config.CHART_PNG_COLORS; 0 keeps full RGBA.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    colors = config.CHART_PNG_COLORS if colors is None else colors
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi or config.CHART_DPI)
+    if not colors:
+        return buffer.getvalue()
+
+    # Charts use a handful of flat colours, so a small palette is visually lossless
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        palette = image.convert('RGB').quantize(colors, method=Image.Quantize.FASTOCTREE)
+    quantized = BytesIO()
+    palette.save(quantized, format='PNG')
+    return quantized.getvalue()
+
+
+def figure_to_svg(fig):
+    """
+    Encode a figure as SVG.
+
+    Text is kept as <text> elements instead of glyph outlines, which makes
+    the SVG about half the size and much cheaper for svglib to convert. The
+    creation date is omitted so identical charts encode to identical bytes.
+
+    Returns:
+        bytes: The SVG document.
+    """
+    buffer = BytesIO()
+    with rc_context({'svg.fonttype': 'none'}):
+        fig.savefig(buffer, format='svg', metadata={'Date': None})
+    return buffer.getvalue()
+
+
+def _render(draw, args, encode):
+    with metrics.stage('chart_draw'):
+        fig = draw(*args)
+    try:
+        with metrics.stage('chart_encode'):
+            data = encode(fig)
+        metrics.BYTES_PRODUCED.labels(kind='chart').inc(len(data))
+        return data
+    finally:
+        # Break the figure <-> artists reference cycles so memory is freed without waiting for the GC
+        fig.clear()
+
+
+def render_png(draw, *args, dpi=None, colors=None):
+    """
+    Draw a figure, encode it as PNG and release it.
+
+    Args:
+        draw (callable): Chart function such as student_achievements, returning a Figure.
+        *args: Arguments for draw.
+        dpi (int): Output resolution, defaults to config.CHART_DPI.
+        colors (int): Palette size, see figure_to_png.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    return _render(draw, args, lambda fig: figure_to_png(fig, dpi, colors))
+
+
+def render_data_uri(draw, *args, chart_format=None):
+    """
+    Draw a figure and return it as a data: URI for a report template.
+
+    Args:
+        draw (callable): Chart function such as student_achievements, returning a Figure.
+        *args: Arguments for draw.
+        chart_format (str): One of CHART_FORMATS, defaults to config.CHART_FORMAT.
+            'svg' embeds a vector chart that xhtml2pdf draws through svglib;
+            'png' embeds a raster at config.CHART_DPI.
+
+    Returns:
+        str: The data: URI.
+    """
+    chart_format = chart_format or config.CHART_FORMAT
+    if chart_format == 'svg':
+        data = _render(draw, args, figure_to_svg)
+        # xhtml2pdf's data URI parser rejects "svg+xml"; it detects SVG from the content
+        mime = 'image/svg'
+    elif chart_format == 'png':
+        data = _render(draw, args, figure_to_png)
+        mime = 'image/png'
+    else:
+        raise ValueError(f'Unknown chart format {chart_format!r}, expected one of {", ".join(CHART_FORMATS)}.')
+
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def settings_key():
+    """Chart output settings that change report bytes, for cache keys"""
+    return f'{config.CHART_FORMAT}:{config.CHART_DPI}:{config.CHART_PNG_COLORS}'
+
+
+def student_achievements(grades_df: pd.DataFrame):
+    """
+    Four-panel overview of one student's grades.
+
+    - Bar chart comparing obtained and maximum marks by subject.
+    - Line plot showing performance trend over time.
+    - Radar chart displaying average marks distribution across subjects.
+    - Pie chart representing overall achievement percentage.
+
+    Args:
+        grades_df (pd.DataFrame): Grades with SubjectName, StudentMarks, MaxMarks
+            and ExamDate; sorted by ExamDate in place.
+
+    Returns:
+        Figure: The chart figure.
+    """
+    fig, (ax1, ax2, ax3, ax4) = STUDENT_ACHIEVEMENTS.create()
+
+    # Plot 1: Bar Chart
+    subjects = sorted(grades_df["SubjectName"].unique())
+    x = np.arange(len(subjects))
+    width = 0.35
+    ax1.bar(x - width/2, grades_df.groupby('SubjectName')['StudentMarks'].mean(), width, label='Obtained')
+    ax1.bar(x + width/2, grades_df.groupby('SubjectName')['MaxMarks'].mean(), width, label='Maximum')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(subjects, rotation=45)
+    ax1.set_title('Grades by Subject')
+    ax1.legend()
+
+    # Plot 2: Performance Trend
+    grades_df['ExamDate'] = pd.to_datetime(grades_df['ExamDate'])
+    grades_df.sort_values('ExamDate', inplace=True)
+    ax2.plot(grades_df['ExamDate'], grades_df['StudentMarks']/grades_df['MaxMarks']*100, marker='o')
+    ax2.set_title('Grade Performance Trend')
+    ax2.set_ylabel('Achievement (%)')
+    ax2.tick_params(axis='x', labelrotation=45)
+
+    # Plot 3: Radar Chart
+    avg_marks = grades_df.groupby('SubjectName')['StudentMarks'].mean()
+    angles = np.linspace(0, 2*np.pi, len(subjects), endpoint=False)
+    values = avg_marks.values
+    values = np.concatenate((values, [values[0]]))
+    angles = np.concatenate((angles, [angles[0]]))
+    ax3.plot(angles, values)
+    ax3.fill(angles, values, alpha=0.25)
+    ax3.set_xticks(angles[:-1])
+    ax3.set_xticklabels(subjects)
+    ax3.set_title('Subject Performance Distribution', pad=40)
+
+    # Plot 4: Achievement Percentage
+    achievement = (grades_df['StudentMarks']/grades_df['MaxMarks']*100).mean()
+    colors = ['#ff9999' if achievement < 60 else '#66b3ff' if achievement < 80 else '#99ff99']
+    ax4.pie([achievement, 100-achievement], colors=colors + ['#f0f0f0'],
+            labels=[f'{achievement:.1f}%', ''], startangle=90)
+    ax4.set_title('Overall Exam Achievement')
+
+    fig.tight_layout()
+    return fig
+
+
+def performance_trend(ax, monthly_avg):
+    """
+    Monthly average percentage with a ±1 standard deviation band.
+
+    Args:
+        ax (matplotlib.axes.Axes): The subplot axis to plot on.
+        monthly_avg (pd.DataFrame): Columns date, mean and std, sorted by date.
+
+    Returns:
+        matplotlib.axes.Axes: ax.
+    """
+    ax.fill_between(range(len(monthly_avg)),
+                    monthly_avg['mean'] - monthly_avg['std'],
+                    monthly_avg['mean'] + monthly_avg['std'],
+                    alpha=0.2, color='#1f77b4',
+                    label='±1 Standard Deviation')
+
+    ax.set_xticks(range(len(monthly_avg)))
+    date_labels = monthly_avg["date"].dt.strftime("%b\n%Y")
+    ax.set_xticklabels(date_labels, fontsize=8)
+
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+    ax.set_ylabel('Average Percentage', fontsize=10)
+    ax.set_ylim(0, 100)
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f'{int(x)}%'))
+
+    ax.set_title('Average Performance Trend Over Time',
+                 fontsize=12, pad=15, fontweight='bold')
+
+    ax.legend(loc='upper right', fontsize=8)
+
+    for i, value in enumerate(monthly_avg['mean']):
+        ax.annotate(f'{value:.1f}%',
+                    (i, value),
+                    textcoords="offset points",
+                    xytext=(0, 10),
+                    ha='center',
+                    fontsize=8)
+
+    ax.margins(x=0.05)
+
+    return ax
+
+
+def academic_performance(chart_data, grade_labels, failing_label):
+    """
+    Four-panel overview of all grades.
+
+    Args:
+        chart_data (dict): grade_counts, monthly_avg, subject_avg and dept_avg
+            as computed by ReportGenerator._academic_performance_data.
+        grade_labels (list): Labels of the grade_counts bars.
+        failing_label (str): The label drawn in red.
+
+    Returns:
+        Figure: The chart figure.
+    """
+    fig, (ax1, ax2, ax3, ax4) = ACADEMIC_PERFORMANCE.create()
+
+    # Plot 1: Overall Grade Distribution
+    colors = ["red" if label == failing_label else "skyblue" for label in grade_labels]
+    bars = ax1.bar(grade_labels, chart_data["grade_counts"], color=colors, edgecolor="black")
+    ax1.set_title('Grade Distribution', fontsize=12, pad=15)
+    ax1.set_xlabel('Grade Ranges', fontsize=10)
+    ax1.set_ylabel('Number of Students', fontsize=10)
+
+    # Add value labels on top of each bar
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{int(height)}',
+                 ha='center', va='bottom')
+
+    # Rotate x-labels for better readability
+    setp(ax1.get_xticklabels(), rotation=45, ha='right')
+
+    # Plot 2: Performance Trend Over Time
+    performance_trend(ax2, chart_data["monthly_avg"])
+
+    # Plot 3: Subject-wise Performance
+    subject_avg = chart_data["subject_avg"]
+    ax3.bar(range(len(subject_avg)), subject_avg.values, width=0.5)
+    ax3.set_xticks(range(len(subject_avg)))
+    ax3.set_xticklabels(subject_avg.index, rotation=45)
+    ax3.set_title('Subject-wise Average Performance')
+    ax3.set_ylabel('Average Percentage')
+
+    # Plot 4: Department-wise Performance
+    dept_avg = chart_data["dept_avg"]
+    ax4.pie(dept_avg.values, labels=dept_avg.index, autopct='%1.1f%%')
+    ax4.set_ylabel(dept_avg.name or '')
+    ax4.set_title('Department-wise Performance Distribution')
+
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,58 @@
+"""
+Runtime settings for the reporting service.
+
+Every value can be overridden with the environment variable of the same
+name prefixed with ARS_, e.g. ARS_REPORT_JOB_WORKERS=4.
+"""
+import os
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(f'ARS_{name}')
+    return default if value is None else cast(value)
+
+
+# Report jobs (/api/v1/report-jobs)
+REPORT_JOB_WORKERS = _env('REPORT_JOB_WORKERS', 2, int)
+REPORT_JOB_TTL_SECONDS = _env('REPORT_JOB_TTL_SECONDS', 3600, int)
+REPORT_JOB_DIR = _env('REPORT_JOB_DIR', os.path.join('reports', 'jobs'))
+
+# Renderer pool: 0 renders reports in the API process, N uses N worker processes
+RENDER_POOL_WORKERS = _env('RENDER_POOL_WORKERS', 0, int)
+RENDER_POOL_START_METHOD = _env('RENDER_POOL_START_METHOD', 'spawn')
+
+# Rendered report cache; ARS_REPORT_CACHE_MAX_BYTES=0 disables it
+REPORT_CACHE_DIR = _env('REPORT_CACHE_DIR', os.path.join('reports', 'cache'))
+REPORT_CACHE_MAX_BYTES = _env('REPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024, int)
+REPORT_CACHE_MAX_AGE_SECONDS = _env('REPORT_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600, int)
+
+# Student photo thumbnails shared by reports and /api/v1/image
+THUMBNAIL_CACHE_DIR = _env('THUMBNAIL_CACHE_DIR', os.path.join('cache', 'thumbnails'))
+THUMBNAIL_CACHE_ITEMS = _env('THUMBNAIL_CACHE_ITEMS', 512, int)
+THUMBNAIL_CACHE_MAX_BYTES = _env('THUMBNAIL_CACHE_MAX_BYTES', 64 * 1024 * 1024, int)
+
+# Remote report assets (university logos, photo URLs) stored locally by AssetResolver
+ASSET_CACHE_DIR = _env('ASSET_CACHE_DIR', os.path.join('cache', 'assets'))
+ASSET_CONNECT_TIMEOUT = _env('ASSET_CONNECT_TIMEOUT', 3.0, float)
+ASSET_READ_TIMEOUT = _env('ASSET_READ_TIMEOUT', 10.0, float)
+ASSET_REVALIDATE_SECONDS = _env('ASSET_REVALIDATE_SECONDS', 24 * 3600, int)
+ASSET_RETRY_SECONDS = _env('ASSET_RETRY_SECONDS', 300, int)
+ASSET_MAX_BYTES = _env('ASSET_MAX_BYTES', 10 * 1024 * 1024, int)
+
+# Charts embedded in reports: 'png' rasters at CHART_DPI, optionally quantized
+# to CHART_PNG_COLORS colours (0 = full colour), or 'svg' vector drawings
+CHART_FORMAT = _env('CHART_FORMAT', 'png')
+CHART_DPI = _env('CHART_DPI', 100, int)
+CHART_PNG_COLORS = _env('CHART_PNG_COLORS', 0, int)
+
+# 1 serves reads from an in-memory copy of the database, refreshed after every
+# import; writes still go to the file. A copy is freed once no read uses it, so
+# memory holds the current copy plus one per older copy a read is still running on.
+READ_REPLICA = _env('READ_REPLICA', 0, int)
+
+# 1 lets report requests ask to be profiled with ?profile=cprofile|sample or an
+# X-Profile header; profiles are stored in PROFILE_DIR, the newest PROFILE_KEEP kept
+PROFILING = _env('PROFILING', 0, int)
+PROFILE_DIR = _env('PROFILE_DIR', os.path.join('reports', 'profiles'))
+PROFILE_KEEP = _env('PROFILE_KEEP', 100, int)
+PROFILE_SAMPLE_INTERVAL_MS = _env('PROFILE_SAMPLE_INTERVAL_MS', 1.0, float)
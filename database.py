@@ -1,36 +1,449 @@
 import sqlite3
+import numpy as np
 import pandas as pd
 import os
+import csv
+import time
+import hashlib
+import json
+import threading
+import functools
+import itertools
+import logging
+import shutil
+from itertools import islice
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from utils import ID_TO_TABLE, TABLE_TO_ID
+from grade_store import GradeStore
+import metrics
+from schema import (
+    SCHEMA_VERSION, TABLE_SCHEMAS, INDEXES, LOAD_MANIFEST_SQL, DATA_VERSIONS_SQL, SUMMARY_TABLES_SQL,
+    create_table_sql, create_index_sql, column_names, indexed_columns,
+)
+
+
+# Connection-level settings applied once to every pooled connection.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers never block behind import_csv writes
+    'synchronous': 'NORMAL',      # durable enough with WAL, far fewer fsyncs
+    'cache_size': -65536,         # page cache size in KiB (64 MiB)
+    'mmap_size': 268435456,       # 256 MiB memory-mapped I/O
+    'busy_timeout': 5000,
+}
+
+# Number of prepared statements kept per connection by the sqlite3 module.
+STATEMENT_CACHE_SIZE = 256
+
+# Rows per executemany batch and seconds between progress reports during imports
+IMPORT_BATCH_SIZE = 5000
+PROGRESS_INTERVAL = 1.0
+
+IMPORT_MODES = ('replace', 'upsert')
+
+# Grades files may identify students and exams by name instead of by ID
+GRADE_NAME_COLUMNS = ('FirstName', 'LastName', 'SubjectName', 'ExamName', 'MarksObtained')
+REJECTS_DIR = os.path.join('uploads', 'rejects')
+
+# Students whose report data depends on the IDs listed in temp._import_changes,
+# evaluated before an upsert is applied
+AFFECTED_STUDENTS_SQL = {
+    'Students': 'SELECT ID FROM temp._import_changes',
+    'Grades': '''
+        SELECT StudentID FROM main.Grades WHERE GradeID IN (SELECT ID FROM temp._import_changes)
+        UNION
+        SELECT StudentID FROM temp._import_stage WHERE GradeID IN (SELECT ID FROM temp._import_changes)
+    ''',
+    'Exams': '''
+        SELECT DISTINCT StudentID FROM main.Grades WHERE ExamID IN (SELECT ID FROM temp._import_changes)
+    ''',
+    'Subjects': '''
+        SELECT DISTINCT g.StudentID FROM main.Exams e
+        JOIN main.Grades g ON g.ExamID = e.ExamID
+        WHERE e.SubjectID IN (SELECT ID FROM temp._import_changes)
+    ''',
+    'Universities': '''
+        SELECT StudentID FROM main.Students WHERE UniversityID IN (SELECT ID FROM temp._import_changes)
+    ''',
+}
+
+# Rows sampled per index by ANALYZE, keeps post-load analysis cheap on big tables
+ANALYSIS_LIMIT = 1000
+
+# Every grade with its exam, subject and department, as returned by get_all_grades
+ALL_GRADES_SQL = """
+SELECT 
+    g.StudentID,
+    s.SubjectName,
+    s.Department,
+    g.MarksObtained as StudentMarks,
+    e.MaximumMarks as MaxMarks,
+    e.ExamDate,
+    e.ExamName
+FROM Grades g
+JOIN Exams e ON g.ExamID = e.ExamID
+JOIN Subjects s ON e.SubjectID = s.SubjectID
+ORDER BY e.ExamDate ASC
+"""
+
+# Joined datasets that iter_dataset exports besides the plain tables
+EXPORT_DATASETS = {
+    'all-grades': ALL_GRADES_SQL,
+}
+
+# Rows per batch read by iter_dataset
+EXPORT_BATCH_SIZE = 1000
+
+# Page size bounds of get_table_page
+MAX_PAGE_SIZE = 1000
+
+# Filter operators accepted by get_table_page
+FILTER_OPERATORS = {'eq': '=', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>='}
+
+# Case-insensitive table names accepted by get_table_page
+TABLE_NAMES = {table_name.lower(): table_name for table_name in TABLE_TO_ID}
+
+# Grades whose summary contribution may change with the IDs listed in temp._import_changes
+AFFECTED_GRADES_SQL = {
+    'Grades': 'SELECT ID FROM temp._import_changes',
+    'Exams': 'SELECT GradeID FROM main.Grades WHERE ExamID IN (SELECT ID FROM temp._import_changes)',
+    'Subjects': '''
+        SELECT g.GradeID FROM main.Exams e
+        JOIN main.Grades g ON g.ExamID = e.ExamID
+        WHERE e.SubjectID IN (SELECT ID FROM temp._import_changes)
+    ''',
+}
+
+# Percentage of every grade that counts towards the summary tables, restricted by {where}.
+# The division happens before the scaling, as in pandas, so band edges classify identically.
+SUMMARY_SOURCE_SQL = """
+SELECT * FROM (
+    SELECT
+        g.GradeID,
+        g.StudentID,
+        e.SubjectID,
+        sb.SubjectName,
+        e.ExamDate,
+        COALESCE(strftime('%Y-%m', e.ExamDate), '') AS Month,
+        (CAST(g.MarksObtained AS REAL) / e.MaximumMarks) * 100 AS p
+    FROM main.Grades g
+    JOIN main.Exams e ON e.ExamID = g.ExamID
+    JOIN main.Subjects sb ON sb.SubjectID = e.SubjectID
+    {where}
+)
+WHERE p IS NOT NULL
+"""
+
+# Recompute StudentSummary rows from a SUMMARY_SOURCE_SQL {source}. Ties for the best
+# grade go to the earliest exam, the same order in which the report lists grades.
+STUDENT_SUMMARY_SQL = """
+INSERT INTO StudentSummary (StudentID, Grades, Total, Lowest, Highest, Subjects, BestSubjectID)
+SELECT
+    StudentID,
+    COUNT(*),
+    SUM(p),
+    MIN(p),
+    MAX(p),
+    COUNT(DISTINCT SubjectName),
+    MAX(CASE WHEN Rank = 1 THEN SubjectID END)
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY StudentID ORDER BY p DESC, ExamDate, GradeID) AS Rank
+    FROM ({source})
+)
+WHERE StudentID IS NOT NULL
+GROUP BY StudentID
+"""
+
+# Tables GradeStore.load joins; the grade snapshot is written once all of them exist
+GRADE_STORE_TABLES = ('Students', 'Grades', 'Exams', 'Subjects')
+
+# Read replicas are shared-cache in-memory databases under names unique to this process.
+# (The memdb VFS cannot open a backup of a WAL database, whose header still says WAL.)
+_REPLICA_IDS = itertools.count(1)
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_read(method):
+    """Record the latency of a DatabaseManager read in metrics.DB_CALL_SECONDS"""
+    timer = metrics.DB_CALL_SECONDS.labels(method=method.__name__)
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        with timer.time():
+            return method(*args, **kwargs)
+    return timed
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that can be tracked through weak references."""
+
+
+class _ReplicaReader:
+    """A thread's read-only connection to one replica, and how many reads are using it"""
+
+    __slots__ = ('uri', 'conn', 'pid', 'depth')
+
+    def __init__(self, uri, conn):
+        self.uri = uri
+        self.conn = conn
+        self.pid = os.getpid()
+        self.depth = 0
 
 
 class DatabaseManager:
-    def __init__(self, db_path='academic_database.db', csv_dir='assets/', initialize=True):
+    def __init__(self, db_path='academic_database.db', csv_dir='assets/', initialize=True, snapshot_dir=None,
+                 read_replica=False):
         self.db_path = db_path
         self.csv_dir = csv_dir
+        # Serve reads from an in-memory copy of the database, refreshed after every import
+        self.read_replica = read_replica
+        self._replica = None  # (uri, anchor connection, pid) of the current copy
+        # Every thread's _ReplicaReader, so a refresh can close the idle ones still on an old copy
+        self._replica_readers = set()
+        self._replica_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # Columnar grade snapshots, next to the database like its -wal and -shm files
+        self.snapshot_dir = snapshot_dir or f'{db_path}-grades'
+        self._snapshot = None  # (key, GradeStore) of the last snapshot opened
+        self._snapshot_writer = None
+        self._snapshot_write = None
         self.data_type_map = {
             'ExamDate': 'DATE',
             'DateOfBirth': 'DATE',
             'Date': 'DATE',
 
         }
+        # One long-lived connection per thread, created lazily
+        self._local = threading.local()
+        self._pool = weakref.WeakSet()
+        self._pool_lock = threading.Lock()
+
         if initialize:
-            self.initialize_database()
+            self.seed()
+
+    def _connect(self, factory=sqlite3.Connection):
+        """Open a new connection configured with SQLITE_PRAGMAS."""
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=factory,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+        )
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
     def get_connection(self):
         """
         Returns a database connection that remains open.
         Caller is responsible for closing the connection.
         """
-        return sqlite3.connect(self.db_path)
+        return self._connect()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow the long-lived connection owned by the current thread.
+
+        The connection is opened on first use and reused by every later call
+        from the same thread. Pending writes are committed when the outermost
+        block exits and rolled back if it raises. Do not close the yielded
+        connection; use close() to release the whole pool.
+
+        Yields:
+            sqlite3.Connection: The pooled connection for this thread.
+        """
+        conn = getattr(self._local, 'conn', None)
+
+        # Connections must not be shared with a forked child process
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect(factory=PooledConnection)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.depth = 0
+            with self._pool_lock:
+                self._pool.add(conn)
+
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            if self._local.depth == 1 and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if self._local.depth == 1 and conn.in_transaction:
+                conn.commit()
+        finally:
+            self._local.depth -= 1
+
+    @contextmanager
+    def _read_connection(self):
+        """
+        Borrow the current thread's connection for reads.
+
+        With read_replica on, this is a read-only connection to the current
+        in-memory replica; otherwise it is the pooled connection of connection().
+        A thread moves to a newer replica at its next outermost read, so a read
+        in progress keeps the copy it started on.
+
+        Yields:
+            sqlite3.Connection: A connection to read from.
+        """
+        if not self.read_replica:
+            with self.connection() as conn:
+                yield conn
+            return
+
+        replica = self._replica
+        if replica is None or replica[2] != os.getpid():
+            self.refresh_replica()
+
+        reader = getattr(self._local, 'replica', None)
+        # Choose the copy and count the read under the lock: refresh_replica closes
+        # readers of a swapped-out copy that no read is using
+        with self._replica_lock:
+            if reader is None or reader.pid != os.getpid() or (reader.depth == 0 and reader.uri != self._replica[0]):
+                # Once the anchor of a swapped-out copy is closed, opening its name
+                # would silently create an empty database
+                conn = sqlite3.connect(
+                    self._replica[0],
+                    uri=True,
+                    factory=PooledConnection,
+                    cached_statements=STATEMENT_CACHE_SIZE,
+                    check_same_thread=False,
+                )
+                conn.execute('PRAGMA query_only = 1')
+                if reader is not None and reader in self._replica_readers:
+                    self._replica_readers.discard(reader)
+                    if reader.pid == os.getpid():
+                        reader.conn.close()
+                reader = self._local.replica = _ReplicaReader(self._replica[0], conn)
+                self._replica_readers.add(reader)
+                with self._pool_lock:
+                    self._pool.add(conn)
+            reader.depth += 1
+
+        try:
+            yield reader.conn
+        finally:
+            if reader.depth == 1 and reader.conn.in_transaction:
+                # Nothing to keep; this only releases the read snapshot
+                reader.conn.rollback()
+            with self._replica_lock:
+                reader.depth -= 1
+                if reader.depth == 0 and reader in self._replica_readers and reader.uri != self._replica[0]:
+                    # The last read of a swapped-out copy frees it
+                    self._replica_readers.discard(reader)
+                    reader.conn.close()
+
+    def refresh_replica(self):
+        """
+        Copy the database into a new in-memory replica and move reads to it.
+
+        The copy is taken with the SQLite backup API, so it is one consistent
+        snapshot. Imports, seeding and rebuild_summaries refresh the replica
+        once they commit; call this after writing to the database by other
+        means. Does nothing unless read_replica is on.
+
+        Readers of older copies that are not inside a read are closed; the
+        rest close when their read finishes, so an old copy is freed as soon
+        as no read uses it, even if its threads stay idle.
+        """
+        if not self.read_replica:
+            return
+
+        with self._refresh_lock:
+            uri = f'file:ars-replica-{os.getpid()}-{next(_REPLICA_IDS)}?mode=memory&cache=shared'
+            # The anchor keeps the copy alive until it is swapped out
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            with self.connection() as source:
+                source.backup(anchor)
+            with self._replica_lock:
+                previous, self._replica = self._replica, (uri, anchor, os.getpid())
+                # Idle readers would keep their old copy alive until their thread reads again
+                outdated = [
+                    reader for reader in self._replica_readers if reader.depth == 0 or reader.pid != os.getpid()
+                ]
+                for reader in outdated:
+                    self._replica_readers.discard(reader)
+                    if reader.pid == os.getpid():
+                        reader.conn.close()
+
+        if previous is not None and previous[2] == os.getpid():
+            previous[1].close()
+
+    @contextmanager
+    def read_transaction(self):
+        """
+        Run several reads against one consistent snapshot of the database.
+
+        Opens a deferred transaction on the pooled connection so every query
+        in the block sees the same committed state, even if an import
+        commits in the meantime.
+
+        Yields:
+            sqlite3.Connection: The connection for this thread, see _read_connection.
+        """
+        with self._read_connection() as conn:
+            began = not conn.in_transaction
+            if began:
+                conn.execute('BEGIN')
+            try:
+                yield conn
+            finally:
+                # Release the snapshot so WAL checkpoints can progress
+                if began and conn.in_transaction:
+                    conn.commit()
+
+    def close(self):
+        """Close every pooled connection opened by this manager, after any pending snapshot write."""
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.shutdown(wait=True)
+            self._snapshot_writer = None
+        with self._replica_lock:
+            replica, self._replica = self._replica, None
+            # Pooled like every other connection, and closed with them below
+            self._replica_readers.clear()
+        if replica is not None:
+            replica[1].close()
+        with self._pool_lock:
+            connections = list(self._pool)
+            self._pool = weakref.WeakSet()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def infer_data_type(self, column):
         """Infer SQLite data type from pandas data type"""
         return self.data_type_map.get(column, 'TEXT')
 
+    def _has_declared_schema(self, conn, table_name):
+        """Check whether an existing table matches its declared schema"""
+        existing = [(row[1], row[2], row[5]) for row in conn.execute(f'PRAGMA table_info({table_name})')]
+        declared = [
+            (name, definition.split()[0], 1 if 'PRIMARY KEY' in definition else 0)
+            for name, definition in TABLE_SCHEMAS[table_name]
+        ]
+        return existing == declared
+
     def create_table_from_csv(self, csv_path, table_name):
-        """Create a table dynamically from the structure of a CSV file with foreign keys"""
-        df = pd.read_csv(csv_path)
-        columns = df.columns
+        """Create a table from its declared schema, or from the structure of a CSV file for undeclared tables"""
+        if table_name in TABLE_SCHEMAS:
+            with self.connection() as conn:
+                # Tables written by older versions have no primary key or indexes
+                if not self._has_declared_schema(conn, table_name):
+                    conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+                conn.execute(create_table_sql(table_name))
+
+                for index_name, (index_table, _) in INDEXES.items():
+                    if index_table == table_name:
+                        conn.execute(create_index_sql(index_name))
+            return
+
+        columns = pd.read_csv(csv_path, nrows=0).columns
 
         # Build the CREATE TABLE statement
         create_statement = f"CREATE TABLE IF NOT EXISTS {table_name} ("
@@ -42,7 +455,7 @@ class DatabaseManager:
 
         create_statement = create_statement.rstrip(', ') + ')'
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(create_statement)
             conn.commit()
@@ -50,69 +463,865 @@ class DatabaseManager:
     def import_data_from_csv(self, csv_path, table_name):
         """Import data into the table from the CSV file"""
         df = pd.read_csv(csv_path)
-        with sqlite3.connect(self.db_path) as conn:
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
+        with self.connection() as conn:
+            if table_name in TABLE_SCHEMAS:
+                # Keep the declared table (keys, affinities, indexes) and only swap its rows
+                conn.execute(f'DELETE FROM {table_name}')
+                df.to_sql(table_name, conn, if_exists='append', index=False)
+            else:
+                df.to_sql(table_name, conn, if_exists='replace', index=False)
+
+    def analyze(self):
+        """Refresh the query planner statistics after a bulk load"""
+        with self.connection() as conn:
+            conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+            conn.execute('ANALYZE')
 
     def initialize_database(self):
-        """Initialize database by creating tables and importing data"""
-        for file_name in os.listdir(self.csv_dir):
-            if file_name.endswith('.csv'):
-                table_name = os.path.splitext(file_name)[0]  # Use file name (without extension) as table name
-                csv_path = os.path.join(self.csv_dir, file_name)
+        """Initialize database by creating tables and importing data from every CSV"""
+        return self.reseed()
+
+    @staticmethod
+    def _file_sha256(path):
+        """Hash a file in chunks so large CSVs are never loaded whole"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def seed(self, force=False):
+        """
+        Load the CSV files in csv_dir, skipping files that have not changed.
+
+        Every loaded file is fingerprinted (size, mtime and SHA-256) in the
+        LoadManifest table. A file is reloaded only when its fingerprint
+        differs from the manifest, so reseeding does not re-ingest unchanged
+        seeds or wipe data imported through import_csv. A database of an
+        older schema version is upgraded in place first, see migrate.
+
+        The service never seeds by itself; run `python -m database seed`.
+        Only DatabaseManager(initialize=True), the default for scripts and
+        tests, seeds on construction.
+
+        Args:
+            force (bool): Reload every CSV regardless of the manifest.
+
+        Returns:
+            list: Names of the tables that were (re)loaded.
+        """
+        self.migrate()
+        with self.connection() as conn:
+            conn.execute(LOAD_MANIFEST_SQL)
+            manifest = {
+                row[0]: row[1:]
+                for row in conn.execute('SELECT FileName, Sha256, MTimeNs, Size FROM LoadManifest')
+            }
+            existing_tables = {
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+
+        loaded_tables = []
+        for file_name in sorted(os.listdir(self.csv_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+
+            table_name = os.path.splitext(file_name)[0]  # Use file name (without extension) as table name
+            csv_path = os.path.join(self.csv_dir, file_name)
+            stat = os.stat(csv_path)
+            recorded = manifest.get(file_name) if table_name in existing_tables else None
+
+            # Cheap check first: same size and mtime means the file is untouched
+            if not force and recorded and recorded[1:] == (stat.st_mtime_ns, stat.st_size):
+                continue
+
+            sha256 = self._file_sha256(csv_path)
+            if not force and recorded and recorded[0] == sha256:
+                self._record_manifest(file_name, table_name, sha256, stat)
+                continue
+
+            self.create_table_from_csv(csv_path, table_name)
+            self.import_data_from_csv(csv_path, table_name)
+            self._record_manifest(file_name, table_name, sha256, stat)
+            loaded_tables.append(table_name)
 
-                self.create_table_from_csv(csv_path, table_name)
-                self.import_data_from_csv(csv_path, table_name)
+        with self.connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] == 0:
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            if loaded_tables:
+                self._bump_data_versions(conn, None)
+            if any(table_name in AFFECTED_GRADES_SQL for table_name in loaded_tables):
+                self._rebuild_summaries(conn)
+
+        if loaded_tables:
+            self.analyze()
+            self.refresh_replica()
+            self._schedule_grade_snapshot()
+        return loaded_tables
+
+    def reseed(self):
+        """Reload every CSV in csv_dir, replacing the rows of the seeded tables"""
+        return self.seed(force=True)
+
+    def migrate(self):
+        """
+        Upgrade the schema of a seeded database to SCHEMA_VERSION in place.
+
+        Runs the _migrate_to_<version> step of every version after the
+        database's PRAGMA user_version, in order and in one transaction.
+        Steps only add what their version declares, so rows loaded through
+        seed or import_csv are kept; versions without a step need no change.
+        A database without a recorded version has not been seeded yet and
+        is left to seed.
+
+        Returns:
+            list: Versions the database was upgraded through.
+        """
+        with self.connection() as conn:
+            current = conn.execute('PRAGMA user_version').fetchone()[0]
+            versions = list(range(current + 1, SCHEMA_VERSION + 1)) if current else []
+            for version in versions:
+                step = getattr(self, f'_migrate_to_{version}', None)
+                if step is not None:
+                    step(conn)
+            if versions:
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+        if versions:
+            self.refresh_replica()
+        return versions
+
+    def check_schema(self):
+        """
+        Report what keeps the database from serving, without changing it.
+
+        Returns:
+            list: One message per problem: seeded tables that do not exist, or a
+                schema older than SCHEMA_VERSION. Empty when the database is ready.
+        """
+        with self.connection() as conn:
+            missing = [table_name for table_name in TABLE_SCHEMAS if not self._tables_exist(conn, [table_name])]
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        problems = []
+        if missing:
+            problems.append(f'Tables {", ".join(missing)} do not exist.')
+        if version < SCHEMA_VERSION:
+            problems.append(f'Schema version {version} is older than {SCHEMA_VERSION}.')
+        return problems
+
+    def _migrate_to_2(self, conn):
+        """Add the name indexes that resolve name-keyed Grades imports"""
+        for index_name in ('idx_students_name', 'idx_exams_name'):
+            if self._tables_exist(conn, [INDEXES[index_name][0]]):
+                conn.execute(create_index_sql(index_name))
+
+    def _migrate_to_3(self, conn):
+        """Build the summary tables now rather than in the first report after the upgrade"""
+        if self._summary_sources_exist(conn):
+            self._ensure_summaries(conn)
+
+    def _record_manifest(self, file_name, table_name, sha256, stat):
+        """Store the fingerprint of a seeded CSV"""
+        with self.connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO LoadManifest (FileName, TableName, Sha256, MTimeNs, Size, LoadedAt)
+                VALUES (?, ?, ?, ?, ?, datetime('now'))
+                """,
+                (file_name, table_name, sha256, stat.st_mtime_ns, stat.st_size),
+            )
+
+    @staticmethod
+    def _bump_data_versions(conn, student_ids):
+        """
+        Record a data change so reports rendered from the old data go stale.
+
+        Args:
+            conn (sqlite3.Connection): Connection of the transaction making the change.
+            student_ids (list[int]): Students the change is limited to, or None
+                when it may affect every student.
+        """
+        conn.execute(DATA_VERSIONS_SQL)
+        # Random per-database epoch, so a recreated database never matches an old grade snapshot
+        conn.execute("INSERT OR IGNORE INTO DataVersions (Scope, Version) VALUES ('epoch', random() & 9223372036854775807)")
+        bump_sql = '''
+        INSERT INTO DataVersions (Scope, Version) VALUES (?, 1)
+        ON CONFLICT (Scope) DO UPDATE SET Version = Version + 1
+        '''
+        conn.execute(bump_sql, ('all',))
+        if student_ids is None:
+            conn.execute(bump_sql, ('students',))
+        else:
+            conn.executemany(bump_sql, ((f'student:{student_id}',) for student_id in student_ids))
+
+    @_timed_read
+    def get_data_version(self, student_id=None) -> str:
+        """
+        Return a token that changes whenever the data behind a report changes.
+
+        Only loads made through seed and import_csv are tracked.
+
+        Args:
+            student_id (int): Scope the token to one student's profile data;
+                by default it covers the whole database.
+
+        Returns:
+            str: Opaque version token.
+        """
+        scopes = ('all',) if student_id is None else ('students', f'student:{student_id}')
+        placeholders = ', '.join('?' * len(scopes))
+
+        with self._read_connection() as conn:
+            try:
+                versions = dict(conn.execute(
+                    f'SELECT Scope, Version FROM DataVersions WHERE Scope IN ({placeholders})', scopes
+                ).fetchall())
+            except sqlite3.OperationalError:
+                # Nothing was ever loaded through seed or import_csv
+                versions = {}
+
+        return '.'.join(str(versions.get(scope, 0)) for scope in scopes)
+
+    def rebuild_summaries(self):
+        """
+        Recompute the summary tables from scratch.
+
+        Imports keep the summaries current on their own; a rebuild is only
+        needed after Grades, Exams or Subjects were written by other means.
+
+        Returns:
+            dict: Row count of every summary table.
+        """
+        with self.connection() as conn:
+            self._rebuild_summaries(conn)
+            counts = {
+                table_name: conn.execute(f'SELECT COUNT(*) FROM {table_name}').fetchone()[0]
+                for table_name in SUMMARY_TABLES_SQL
+            }
+        self.refresh_replica()
+        return counts
+
+    @staticmethod
+    def _tables_exist(conn, table_names):
+        """Whether every one of table_names exists"""
+        return conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+            f"AND name IN ({', '.join('?' * len(table_names))})",
+            list(table_names),
+        ).fetchone()[0] == len(table_names)
+
+    @classmethod
+    def _summary_sources_exist(cls, conn):
+        """Whether Grades, Exams and Subjects all exist, so the summaries can be computed"""
+        return cls._tables_exist(conn, list(AFFECTED_GRADES_SQL))
+
+    def _rebuild_summaries(self, conn):
+        """Recompute every summary table from the full Grades table"""
+        for table_name, create_sql in SUMMARY_TABLES_SQL.items():
+            conn.execute(create_sql)
+            conn.execute(f'DELETE FROM {table_name}')
+        if not self._summary_sources_exist(conn):
+            return
+
+        source = SUMMARY_SOURCE_SQL.format(where='')
+        conn.execute(STUDENT_SUMMARY_SQL.format(source=source))
+        conn.execute(f"""
+            INSERT INTO SubjectMonthSummary (SubjectID, Month, Grades, Total, Squares)
+            SELECT SubjectID, Month, COUNT(*), SUM(p), SUM(p * p) FROM ({source})
+            GROUP BY SubjectID, Month
+        """)
+        conn.execute(f"""
+            INSERT INTO GradeHistogram (Bucket, Grades)
+            SELECT CAST(p AS INTEGER) AS bucket, COUNT(*) FROM ({source})
+            GROUP BY bucket
+        """)
+
+    def _ensure_summaries(self, conn):
+        """Build the summary tables of a database that predates them, returning whether they were built"""
+        if self._tables_exist(conn, list(SUMMARY_TABLES_SQL)):
+            return False
+        self._rebuild_summaries(conn)
+        return True
+
+    @staticmethod
+    def _apply_summary_delta(conn, sign):
+        """
+        Add (sign=1) or subtract (sign=-1) the contribution of the grades listed in temp._summary_grades.
+
+        Subtracting before an upsert and adding after it moves the summaries
+        from the old to the new state of just those grades. Students touched
+        in either state are collected in temp._summary_students, since their
+        minimum and maximum cannot be updated by difference.
+        """
+        source = SUMMARY_SOURCE_SQL.format(where='WHERE g.GradeID IN (SELECT GradeID FROM temp._summary_grades)')
+        conn.execute(f"""
+            INSERT INTO SubjectMonthSummary (SubjectID, Month, Grades, Total, Squares)
+            SELECT SubjectID, Month, {sign} * COUNT(*), {sign} * SUM(p), {sign} * SUM(p * p) FROM ({source})
+            GROUP BY SubjectID, Month
+            ON CONFLICT (SubjectID, Month) DO UPDATE SET
+                Grades = Grades + excluded.Grades,
+                Total = Total + excluded.Total,
+                Squares = Squares + excluded.Squares
+        """)
+        conn.execute(f"""
+            INSERT INTO GradeHistogram (Bucket, Grades)
+            SELECT CAST(p AS INTEGER) AS bucket, {sign} * COUNT(*) FROM ({source})
+            GROUP BY bucket
+            ON CONFLICT (Bucket) DO UPDATE SET Grades = Grades + excluded.Grades
+        """)
+        conn.execute(f"""
+            INSERT OR IGNORE INTO temp._summary_students (StudentID)
+            SELECT StudentID FROM main.Grades
+            WHERE GradeID IN (SELECT GradeID FROM temp._summary_grades) AND StudentID IS NOT NULL
+        """)
+
+        if sign < 0:
+            return
+        conn.execute('DELETE FROM SubjectMonthSummary WHERE Grades = 0')
+        conn.execute('DELETE FROM GradeHistogram WHERE Grades = 0')
+
+        # Min and max are not invertible, so touched students are recomputed from their own grades
+        student_source = SUMMARY_SOURCE_SQL.format(
+            where='WHERE g.StudentID IN (SELECT StudentID FROM temp._summary_students)'
+        )
+        conn.execute('DELETE FROM StudentSummary WHERE StudentID IN (SELECT StudentID FROM temp._summary_students)')
+        conn.execute(STUDENT_SUMMARY_SQL.format(source=student_source))
 
     def _get_table_data(self, table_name: str, limit = 100, id = None):
         """Retrieve data from specified table"""
+        filters = [(TABLE_TO_ID[TABLE_NAMES[table_name.lower()]], 'eq', int(id))] if id else []
+        return self.get_table_page(table_name, limit=int(limit), filters=filters)['rows']
+
+    @_timed_read
+    def get_table_page(self, table_name, limit=100, after=None, columns=None, filters=(), with_total=False) -> dict:
+        """
+        Read one page of a table in primary key order.
+
+        Pages are keyset-paginated: the next page starts after the last key of
+        this one, so every page is an index range seek and page N costs the
+        same as page 1. That also holds with equality filters, whose indexes
+        are ordered by key within a value; a range filter on another column
+        may make SQLite sort the matching range instead. All values are bound
+        as parameters.
+
+        Args:
+            table_name (str): One of the ID_TO_TABLE tables, in any letter case.
+            limit (int): Rows per page, 1 to MAX_PAGE_SIZE.
+            after (int): Cursor from a previous page; only rows with a larger key are returned.
+            columns (list[str]): Columns to return, all by default. The primary key is always included.
+            filters (list[tuple]): (column, operator, value) conditions, ANDed. Columns must
+                lead an index (see schema.indexed_columns); operators are FILTER_OPERATORS keys.
+            with_total (bool): Also count the rows matching filters, which costs a scan of them.
+
+        Returns:
+            dict:
+                - table: Canonical table name
+                - rows: List of row dicts
+                - next_cursor: Cursor of the next page, None on the last page
+                - total: Number of matching rows, None unless with_total
+
+        Raises:
+            LookupError: If the table is unknown.
+            ValueError: If limit, a column or a filter is invalid.
+        """
+        canonical_name = TABLE_NAMES.get(str(table_name).lower())
+        if canonical_name is None:
+            raise LookupError(f'Unknown table {table_name!r}.')
+        table_name = canonical_name
+        id_column = TABLE_TO_ID[table_name]
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}.')
+
+        table_columns = {name.lower(): name for name in column_names(table_name)}
+
+        def resolve_column(name, allowed):
+            column = allowed.get(str(name).lower())
+            if column is None:
+                raise ValueError(f'Unknown column {name!r} for {table_name}, expected one of {", ".join(allowed.values())}.')
+            return column
+
+        selected = [id_column]
+        for name in columns or table_columns.values():
+            column = resolve_column(name, table_columns)
+            if column not in selected:
+                selected.append(column)
+
+        filterable = {name.lower(): name for name in indexed_columns(table_name)}
+        conditions, params = [], []
+        for name, operator, value in filters:
+            column = resolve_column(name, filterable)
+            if operator not in FILTER_OPERATORS:
+                raise ValueError(f'Unknown filter operator {operator!r}, expected one of {", ".join(FILTER_OPERATORS)}.')
+            conditions.append(f'{column} {FILTER_OPERATORS[operator]} ?')
+            params.append(value)
+
+        page_conditions = conditions + ([f'{id_column} > ?'] if after is not None else [])
+        page_params = params + ([int(after)] if after is not None else [])
+        page_sql = f"""
+        SELECT {", ".join(selected)} FROM {table_name}
+        WHERE {" AND ".join(page_conditions) or 1}
+        ORDER BY {id_column}
+        LIMIT ?
+        """
+
+        with self.read_transaction() as conn:
+            # One extra row tells whether there is a next page without a second query
+            rows = conn.execute(page_sql, page_params + [limit + 1]).fetchall()
+            total = None
+            if with_total:
+                total = conn.execute(
+                    f'SELECT COUNT(*) FROM {table_name} WHERE {" AND ".join(conditions) or 1}', params
+                ).fetchone()[0]
+
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'table': table_name,
+            'rows': [dict(zip(selected, row)) for row in rows],
+            'next_cursor': rows[-1][0] if has_next else None,
+            'total': total,
+        }
+
+    def iter_dataset(self, dataset, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Read a table or joined dataset in fixed-size batches for export.
+
+        Rows come straight from a cursor on a connection of their own, inside
+        one read transaction, so the export sees a consistent snapshot, holds
+        one batch in memory at a time and can be consumed from any thread.
+        The dataset name is checked immediately; the query only runs once
+        iteration starts.
+
+        Args:
+            dataset (str): A table name in any letter case (rows in primary key
+                order) or a key of EXPORT_DATASETS.
+            batch_size (int): Rows per batch.
+
+        Returns:
+            iterator: (column names, list of row tuples) per batch. An empty
+                dataset yields one batch without rows, so the columns are still known.
+
+        Raises:
+            LookupError: If the dataset is unknown.
+        """
+        if dataset in EXPORT_DATASETS:
+            sql = EXPORT_DATASETS[dataset]
+        elif str(dataset).lower() in TABLE_NAMES:
+            table_name = TABLE_NAMES[str(dataset).lower()]
+            sql = f'SELECT * FROM {table_name} ORDER BY {TABLE_TO_ID[table_name]}'
+        else:
+            raise LookupError(
+                f'Unknown dataset {dataset!r}, expected a table or one of {", ".join(EXPORT_DATASETS)}.'
+            )
+        return self._iter_batches(sql, batch_size)
+
+    def _iter_batches(self, sql, batch_size):
+        conn = self._connect()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                if id:
-                    query = f'select * from {table_name} where {TABLE_TO_ID[table_name]} = {int(id)}  LIMIT {limit}'
-                else:
-                    query = f'select * from {table_name} LIMIT {limit}'
-                return pd.read_sql(query, conn).to_dict('records')
-        except Exception as e:
-            raise e
+            conn.execute('BEGIN')
+            cursor = conn.execute(sql)
+            columns = tuple(description[0] for description in cursor.description)
+            rows = cursor.fetchmany(batch_size)
+            yield columns, rows
+            while rows:
+                rows = cursor.fetchmany(batch_size)
+                if rows:
+                    yield columns, rows
+        finally:
+            conn.close()
 
-    def import_csv(self, df: pd.DataFrame):
-        """Import data from CSV file with enhanced structure"""
+    def import_csv(self, df: pd.DataFrame, mode='replace', delete_missing=False,
+                   batch_size=IMPORT_BATCH_SIZE, progress=None, reject_path=None):
+        """
+        Import a DataFrame into the table identified by its first column (see ID_TO_TABLE).
 
-        with sqlite3.connect(self.db_path) as conn:
-            # Clear existing data before importing
-            table_to_clear = ID_TO_TABLE.get(df.columns[0], None)
+        Returns:
+            dict: Import summary, see import_csv_stream.
+        """
+        # NaN -> NULL and numpy scalars -> plain Python values for sqlite3. Rows are
+        # numbered as the lines of a CSV of the frame, the header being line 1.
+        rows = enumerate(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None), start=2)
+        return self._import_rows(list(df.columns), rows, mode, delete_missing, batch_size, progress, reject_path)
 
-            if table_to_clear:
-                conn.execute(f'DELETE FROM {table_to_clear}')
+    def import_csv_stream(self, stream, mode='replace', delete_missing=False,
+                          batch_size=IMPORT_BATCH_SIZE, progress=None, reject_path=None):
+        """
+        Import a CSV read incrementally from a text stream.
 
-            existing_table_columns = self._get_table_data(table_to_clear, limit=1)[0].keys() if table_to_clear else []
-            importing_table_columns = df.columns
+        Rows are parsed one at a time and inserted in batches of batch_size
+        with executemany inside a single transaction, so memory use stays
+        constant regardless of the file size. Readers keep seeing the old
+        rows until the transaction commits.
 
-            assert set(existing_table_columns) == set(importing_table_columns), 'Columns do not match. Please review the input CSV once again.'
+        In 'replace' mode the table is emptied and reloaded. In 'upsert' mode
+        the rows are staged in a temporary table and merged on the table's
+        ID column: new IDs are inserted, rows whose values differ are
+        updated and, with delete_missing, rows absent from the file are
+        deleted. Only the delta is written to the table.
 
-            # Import Grades
-            if 'GradeID' in df.columns:
-                grades_df = df[['FirstName', 'LastName', 'SubjectName', 'ExamName', 'MarksObtained']]
+        Grades may also be imported by name, with the columns FirstName,
+        LastName, SubjectName, ExamName, MarksObtained and an optional
+        GradeID. Names are resolved to IDs in SQL; unresolved rows are
+        written to reject_path (default: a new file in REJECTS_DIR).
 
-                # Join to get StudentID and ExamID
-                grades_df = grades_df.merge(
-                    conn.execute('SELECT StudentID, FirstName, LastName FROM Students').fetchdf(), 
-                    on=['FirstName', 'LastName']
-                )
-                grades_df = grades_df.merge(
-                    conn.execute('SELECT ExamID, SubjectName, ExamName FROM Exams').fetchdf(), 
-                    on=['SubjectName', 'ExamName']
+        Args:
+            stream (TextIO): Text stream positioned at the CSV header.
+            mode (str): 'replace' or 'upsert'.
+            delete_missing (bool): In upsert mode, delete rows missing from the file.
+            batch_size (int): Rows per executemany call.
+            progress (callable): Optional progress(rows_done, rows_per_second),
+                called at most every PROGRESS_INTERVAL seconds and once at the end.
+            reject_path (str): Where to write unresolved rows of a name-keyed Grades import.
+
+        Returns:
+            dict: Import summary with keys table, mode, rows, inserted, updated,
+                deleted, rejected, reject_path, student_ids, seconds and
+                rows_per_second. student_ids lists the students whose data
+                changed, or is None when the whole table was replaced.
+
+        Raises:
+            ValueError: If the header does not match a known table, the mode is
+                unknown, or a row has the wrong number of fields or repeats an ID.
+                The message names the line; nothing is imported.
+        """
+        reader = csv.reader(stream)
+        columns = next(reader, None)
+        if not columns:
+            raise ValueError('The CSV file is empty.')
+
+        # Empty fields are turned into NULL by the INSERT statement itself.
+        # Every row carries its line number for error messages.
+        rows = ((reader.line_num, row) for row in reader if row)
+        return self._import_rows(columns, rows, mode, delete_missing, batch_size, progress, reject_path)
+
+    def _import_rows(self, columns, rows, mode, delete_missing, batch_size, progress, reject_path):
+        """Import (line number, row) pairs into the table identified by columns[0] in one transaction"""
+        if mode not in IMPORT_MODES:
+            raise ValueError(f'Unknown import mode {mode!r}, expected one of {", ".join(IMPORT_MODES)}.')
+
+        named_grades = set(GRADE_NAME_COLUMNS) <= set(columns) <= set(GRADE_NAME_COLUMNS) | {'GradeID'}
+        table_name = 'Grades' if named_grades else ID_TO_TABLE.get(columns[0], None)
+        if table_name is None:
+            raise ValueError(f'Unknown table for first column {columns[0]!r}. Please review the input CSV once again.')
+
+        start = time.perf_counter()
+
+        with self.connection() as conn:
+            existing_table_columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table_name})')]
+            if not named_grades and set(existing_table_columns) != set(columns):
+                raise ValueError('Columns do not match. Please review the input CSV once again.')
+
+            if named_grades:
+                summary = self._import_named_grades(
+                    conn, columns, rows, mode, delete_missing, batch_size, progress, start, reject_path
                 )
+            elif mode == 'replace':
+                summary = self._replace_rows(conn, table_name, columns, rows, batch_size, progress, start)
+            else:
+                summary = self._upsert_rows(conn, table_name, columns, rows, delete_missing, batch_size, progress, start)
 
-                grades_df.to_sql('Grades', conn, if_exists='append', index=False)
+            if mode == 'replace' and table_name in AFFECTED_GRADES_SQL:
+                self._rebuild_summaries(conn)
+            self._bump_data_versions(conn, summary['student_ids'])
 
-            elif 'ID' in df.columns[0]:
-                importing_df = df[importing_table_columns].drop_duplicates()
-                importing_df.to_sql(table_to_clear, conn, if_exists='append', index=False)
+        self.analyze()
+        self.refresh_replica()
+        self._schedule_grade_snapshot()
 
-            conn.commit()
+        seconds = time.perf_counter() - start
+        rows_per_second = summary['rows'] / seconds if seconds else 0.0
+        if progress:
+            progress(summary['rows'], rows_per_second)
+
+        return {
+            'table': table_name,
+            'mode': mode,
+            'rejected': 0,
+            'reject_path': None,
+            **summary,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows_per_second, 1),
+        }
+
+    @staticmethod
+    def _insert_batches(conn, table_name, columns, rows, batch_size, progress, start):
+        """
+        executemany (line number, row) pairs into a table in batches, returning the number of rows written.
+
+        Raises:
+            ValueError: If a row has the wrong number of fields or violates a
+                constraint of the table, such as a repeated ID.
+        """
+        placeholders = ', '.join(["NULLIF(?, '')"] * len(columns))
+        insert_sql = f'INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({placeholders})'
+
+        rows_done = 0
+        last_report = start
+        for batch in iter(lambda: list(islice(rows, batch_size)), []):
+            for line, row in batch:
+                if len(row) != len(columns):
+                    raise ValueError(f'Line {line} has {len(row)} fields, expected {len(columns)}.')
+
+            changes = conn.total_changes
+            try:
+                conn.executemany(insert_sql, [row for _, row in batch])
+            except sqlite3.IntegrityError as e:
+                # executemany stops at the failing row, after inserting every row before it
+                line, row = batch[conn.total_changes - changes]
+                if str(e).startswith('UNIQUE'):
+                    raise ValueError(f'Line {line} repeats {columns[0]} {row[0]}.') from e
+                raise ValueError(f'Line {line} was rejected: {e}.') from e
+            rows_done += len(batch)
+
+            now = time.perf_counter()
+            if progress and now - last_report >= PROGRESS_INTERVAL:
+                progress(rows_done, rows_done / (now - start))
+                last_report = now
+
+        return rows_done
+
+    def _replace_rows(self, conn, table_name, columns, rows, batch_size, progress, start):
+        """Empty a table and load rows into it"""
+        deleted = conn.execute(f'SELECT COUNT(*) FROM {table_name}').fetchone()[0]
+
+        # Secondary indexes are rebuilt once after the load instead of being updated per row
+        table_indexes = [name for name, (table, _) in INDEXES.items() if table == table_name]
+        for index_name in table_indexes:
+            conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+        # Clear existing data before importing
+        conn.execute(f'DELETE FROM {table_name}')
+        rows_done = self._insert_batches(conn, table_name, columns, rows, batch_size, progress, start)
+
+        for index_name in table_indexes:
+            conn.execute(create_index_sql(index_name))
+
+        return {
+            'rows': rows_done,
+            'inserted': rows_done,
+            'updated': 0,
+            'deleted': deleted,
+            'student_ids': None,
+        }
+
+    @staticmethod
+    def _create_stage(conn, table_name):
+        """Create the temp tables used to merge rows into table_name"""
+        id_column = TABLE_TO_ID[table_name]
+
+        conn.execute('DROP TABLE IF EXISTS temp._import_stage')
+        conn.execute('DROP TABLE IF EXISTS temp._import_changes')
+        # Same column affinities as the target, so '91' and 91 compare equal
+        conn.execute(f'CREATE TEMP TABLE _import_stage AS SELECT * FROM main.{table_name} WHERE 0')
+        conn.execute(f'CREATE UNIQUE INDEX temp._import_stage_id ON _import_stage ({id_column})')
+        conn.execute('CREATE TEMP TABLE _import_changes (ID INTEGER PRIMARY KEY, Kind TEXT)')
+
+    def _upsert_rows(self, conn, table_name, columns, rows, delete_missing, batch_size, progress, start):
+        """Merge rows into a table through a staging table, writing only the delta"""
+        self._create_stage(conn, table_name)
+        rows_done = self._insert_batches(conn, 'temp._import_stage', columns, rows, batch_size, progress, start)
+
+        return {'rows': rows_done, **self._merge_stage(conn, table_name, columns, delete_missing)}
+
+    def _merge_stage(self, conn, table_name, columns, delete_missing):
+        """
+        Apply the difference between temp._import_stage and table_name.
+
+        Raises:
+            ValueError: If staged rows have no ID; the caller's transaction is rolled back.
+        """
+        id_column = TABLE_TO_ID[table_name]
+        value_columns = [column for column in columns if column != id_column]
+
+        # _import_changes would give a NULL ID a rowid that may match an unrelated row
+        missing_ids = conn.execute(
+            f'SELECT COUNT(*) FROM temp._import_stage WHERE {id_column} IS NULL'
+        ).fetchone()[0]
+        if missing_ids:
+            raise ValueError(f'{missing_ids} rows have no {id_column}; an upsert needs the ID of every row.')
+
+        differs = ' OR '.join(f't.{column} IS NOT s.{column}' for column in value_columns) or '0'
+        conn.execute(f"""
+            INSERT INTO _import_changes (ID, Kind)
+            SELECT s.{id_column}, CASE WHEN t.{id_column} IS NULL THEN 'insert' ELSE 'update' END
+            FROM temp._import_stage s
+            LEFT JOIN main.{table_name} t ON t.{id_column} = s.{id_column}
+            WHERE t.{id_column} IS NULL OR {differs}
+        """)
+        if delete_missing:
+            conn.execute(f"""
+                INSERT INTO _import_changes (ID, Kind)
+                SELECT t.{id_column}, 'delete' FROM main.{table_name} t
+                WHERE NOT EXISTS (SELECT 1 FROM temp._import_stage s WHERE s.{id_column} = t.{id_column})
+            """)
+
+        # Resolve affected students before the old rows are overwritten
+        student_ids = sorted(
+            row[0] for row in conn.execute(AFFECTED_STUDENTS_SQL[table_name]) if row[0] is not None
+        )
+
+        summarized = table_name in AFFECTED_GRADES_SQL and self._summary_sources_exist(conn)
+        if summarized:
+            self._ensure_summaries(conn)
+            conn.execute('DROP TABLE IF EXISTS temp._summary_grades')
+            conn.execute('DROP TABLE IF EXISTS temp._summary_students')
+            conn.execute('CREATE TEMP TABLE _summary_grades (GradeID INTEGER PRIMARY KEY)')
+            conn.execute(f'INSERT OR IGNORE INTO temp._summary_grades (GradeID) {AFFECTED_GRADES_SQL[table_name]}')
+            conn.execute('CREATE TEMP TABLE _summary_students (StudentID INTEGER PRIMARY KEY)')
+            self._apply_summary_delta(conn, -1)
+
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in value_columns)
+        conflict_action = f'DO UPDATE SET {assignments}' if assignments else 'DO NOTHING'
+        conn.execute(f"""
+            INSERT INTO main.{table_name} ({", ".join(columns)})
+            SELECT {", ".join(columns)} FROM temp._import_stage
+            WHERE {id_column} IN (SELECT ID FROM _import_changes WHERE Kind != 'delete')
+            ON CONFLICT ({id_column}) {conflict_action}
+        """)
+        conn.execute(f"""
+            DELETE FROM main.{table_name}
+            WHERE {id_column} IN (SELECT ID FROM _import_changes WHERE Kind = 'delete')
+        """)
+
+        if summarized:
+            self._apply_summary_delta(conn, 1)
+            conn.execute('DROP TABLE temp._summary_grades')
+            conn.execute('DROP TABLE temp._summary_students')
+
+        counts = dict(conn.execute('SELECT Kind, COUNT(*) FROM _import_changes GROUP BY Kind').fetchall())
+        conn.execute('DROP TABLE temp._import_stage')
+        conn.execute('DROP TABLE temp._import_changes')
+
+        return {
+            'inserted': counts.get('insert', 0),
+            'updated': counts.get('update', 0),
+            'deleted': counts.get('delete', 0),
+            'student_ids': student_ids,
+        }
+
+    def _import_named_grades(self, conn, columns, rows, mode, delete_missing, batch_size, progress, start, reject_path):
+        """
+        Import Grades identified by student and exam names instead of IDs.
+
+        Rows are staged in a temp table and resolved to StudentID/ExamID with
+        one set-based join against the name indexes. Rows matching no student
+        or exam, or more than one, are written to a reject CSV instead of
+        being dropped. A missing GradeID is taken from the existing grade of
+        the same student and exam, so re-importing a file updates in place;
+        grades of a new student/exam pair get new GradeIDs.
+        """
+        conn.execute('DROP TABLE IF EXISTS temp._grade_names')
+        conn.execute('DROP TABLE IF EXISTS temp._grade_resolved')
+        conn.execute("""
+            CREATE TEMP TABLE _grade_names (
+                RowNumber INTEGER PRIMARY KEY, GradeID INTEGER, FirstName TEXT, LastName TEXT,
+                SubjectName TEXT, ExamName TEXT, MarksObtained INTEGER
+            )
+        """)
+        rows_done = self._insert_batches(conn, 'temp._grade_names', columns, rows, batch_size, progress, start)
+
+        conn.execute("""
+            CREATE TEMP TABLE _grade_resolved AS
+            SELECT
+                st.RowNumber,
+                st.GradeID,
+                MIN(s.StudentID) AS StudentID,
+                MIN(e.ExamID) AS ExamID,
+                st.MarksObtained
+            FROM temp._grade_names st
+            JOIN main.Students s ON s.LastName = st.LastName AND s.FirstName = st.FirstName
+            JOIN main.Exams e ON e.ExamName = st.ExamName
+            JOIN main.Subjects sub ON sub.SubjectID = e.SubjectID AND sub.SubjectName = st.SubjectName
+            GROUP BY st.RowNumber
+            HAVING COUNT(*) = 1
+        """)
+        conn.execute("""
+            UPDATE temp._grade_resolved SET GradeID = (
+                SELECT g.GradeID FROM main.Grades g
+                WHERE g.StudentID = _grade_resolved.StudentID AND g.ExamID = _grade_resolved.ExamID
+            )
+            WHERE GradeID IS NULL
+        """)
+        # Grades of new student/exam pairs get IDs after every existing and staged one
+        conn.execute("""
+            WITH numbered AS (
+                SELECT RowNumber, ROW_NUMBER() OVER (ORDER BY RowNumber) AS Number
+                FROM temp._grade_resolved WHERE GradeID IS NULL
+            ), base AS (
+                SELECT MAX(
+                    COALESCE((SELECT MAX(GradeID) FROM main.Grades), 0),
+                    COALESCE((SELECT MAX(GradeID) FROM temp._grade_resolved), 0)
+                ) AS LastID
+            )
+            UPDATE temp._grade_resolved SET GradeID = base.LastID + numbered.Number
+            FROM numbered, base
+            WHERE numbered.RowNumber = _grade_resolved.RowNumber
+        """)
+
+        rejected, reject_path = self._write_grade_rejects(conn, reject_path)
+
+        grade_columns = TABLE_TO_ID['Grades'], 'StudentID', 'ExamID', 'MarksObtained'
+        resolved_sql = f'SELECT {", ".join(grade_columns)} FROM temp._grade_resolved ORDER BY RowNumber'
+
+        if mode == 'replace':
+            deleted = conn.execute('SELECT COUNT(*) FROM main.Grades').fetchone()[0]
+            conn.execute('DELETE FROM main.Grades')
+            inserted = conn.execute(f'INSERT OR REPLACE INTO main.Grades ({", ".join(grade_columns)}) {resolved_sql}').rowcount
+            summary = {'inserted': inserted, 'updated': 0, 'deleted': deleted, 'student_ids': None}
+        else:
+            self._create_stage(conn, 'Grades')
+            conn.execute(f'INSERT OR REPLACE INTO temp._import_stage ({", ".join(grade_columns)}) {resolved_sql}')
+            summary = self._merge_stage(conn, 'Grades', list(grade_columns), delete_missing)
+
+        conn.execute('DROP TABLE temp._grade_names')
+        conn.execute('DROP TABLE temp._grade_resolved')
+
+        return {'rows': rows_done, **summary, 'rejected': rejected, 'reject_path': reject_path}
+
+    @staticmethod
+    def _write_grade_rejects(conn, reject_path):
+        """Write staged grade rows that could not be resolved to a CSV, returning (count, path)"""
+        cursor = conn.execute("""
+            SELECT
+                st.RowNumber, st.GradeID, st.FirstName, st.LastName, st.SubjectName, st.ExamName, st.MarksObtained,
+                CASE
+                    WHEN NOT EXISTS (
+                        SELECT 1 FROM main.Students s WHERE s.LastName = st.LastName AND s.FirstName = st.FirstName
+                    ) THEN 'unknown student'
+                    WHEN NOT EXISTS (
+                        SELECT 1 FROM main.Exams e
+                        JOIN main.Subjects sub ON sub.SubjectID = e.SubjectID
+                        WHERE e.ExamName = st.ExamName AND sub.SubjectName = st.SubjectName
+                    ) THEN 'unknown exam'
+                    ELSE 'ambiguous match'
+                END AS Reason
+            FROM temp._grade_names st
+            WHERE st.RowNumber NOT IN (SELECT RowNumber FROM temp._grade_resolved)
+            ORDER BY st.RowNumber
+        """)
+
+        first = cursor.fetchone()
+        if first is None:
+            return 0, None
+
+        if reject_path is None:
+            reject_path = os.path.join(REJECTS_DIR, f'grades_rejects_{time.strftime("%Y%m%d_%H%M%S")}.csv')
+        os.makedirs(os.path.dirname(reject_path) or '.', exist_ok=True)
+
+        rejected = 1
+        with open(reject_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([description[0] for description in cursor.description])
+            writer.writerow(first)
+            for row in cursor:
+                writer.writerow(row)
+                rejected += 1
+
+        return rejected, reject_path
 
     # TESTED
+    @_timed_read
     def get_student_data_by_id(self, student_id) -> pd.DataFrame:
         """
         Retrieve student data by ID.
@@ -132,10 +1341,11 @@ class DatabaseManager:
         where s.StudentID = ?
         '''
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(student_data_sql, conn, params=(student_id,)).iloc[0]
 
     # TESTED
+    @_timed_read
     def get_university_per_student(self, student_id) -> pd.Series:
         """
         Retrieve the university details for a given student ID.
@@ -150,19 +1360,16 @@ class DatabaseManager:
             IndexError: If no university details are found for the given student ID.
         """
         university_per_student_sql = '''
-        select * from Universities u
-
-        where u.UniversityID in (
-            select UniversityID 
-            from Students s 
-            where s.StudentID = ?
-        )
+        select u.* from Students s
+        join Universities u on u.UniversityID = s.UniversityID
+        where s.StudentID = ?
         '''
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(university_per_student_sql, conn, params=(student_id,)).iloc[0]
 
     # TESTED
+    @_timed_read
     def get_subjects_per_student(self, student_id) -> pd.DataFrame:
         """
         Retrieve the subjects for a given student ID.
@@ -176,10 +1383,231 @@ class DatabaseManager:
         WHERE s.StudentID = ?
         """
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(subjects_per_student_sql, conn, params=(student_id,))
 
+    @_timed_read
+    def get_student_report_bundle(self, student_id) -> dict:
+        """
+        Retrieve everything a student profile report needs in one read transaction.
+
+        Args:
+            student_id (int): The ID of the student whose report is being built.
+
+        Returns:
+            dict: A consistent snapshot with keys:
+                - student (pd.Series): Same as get_student_data_by_id
+                - university (pd.Series): Same as get_university_per_student
+                - subjects (pd.DataFrame): Same as get_subjects_per_student
+                - grades (pd.DataFrame): Same as get_grades_per_student
+
+        Raises:
+            IndexError: If the student or their university does not exist.
+        """
+        grades_sql = '''
+        SELECT
+            g.StudentID as StudentID,
+            sb.SubjectName as SubjectName,
+            sb.Department as Department,
+            e.ExamName as ExamName,
+            e.ExamDate as ExamDate,
+            g.MarksObtained as StudentMarks,
+            e.MaximumMarks as MaxMarks
+        FROM Grades g
+        JOIN Exams e ON e.ExamID = g.ExamID
+        JOIN Subjects sb ON sb.SubjectID = e.SubjectID
+        WHERE g.StudentID = ?
+        '''
+
+        with self.read_transaction() as conn:
+            student = pd.read_sql(
+                'SELECT * FROM Students WHERE StudentID = ?', conn, params=(student_id,)
+            ).iloc[0]
+            # Joined on the student, so a NULL or dangling UniversityID finds no row
+            university = pd.read_sql(
+                'SELECT u.* FROM Students s JOIN Universities u ON u.UniversityID = s.UniversityID '
+                'WHERE s.StudentID = ?', conn, params=(student_id,)
+            ).iloc[0]
+            grades = pd.read_sql(grades_sql, conn, params=(student_id,))
+
+        return {
+            'student': student,
+            'university': university,
+            'subjects': grades[['StudentID', 'SubjectName', 'Department']],
+            'grades': grades[['SubjectName', 'ExamName', 'ExamDate', 'StudentMarks', 'MaxMarks']],
+        }
+
+    @staticmethod
+    def _cohort_filter(university_id=None, academic_year=None, student_ids=None):
+        """Return (condition on Students aliased as s, params) for the given filters, ANDed"""
+        conditions, params = [], []
+        if university_id is not None:
+            conditions.append('s.UniversityID = ?')
+            params.append(int(university_id))
+        if academic_year is not None:
+            conditions.append('s.AcademicYear = ?')
+            params.append(int(academic_year))
+        if student_ids is not None:
+            # One JSON parameter instead of one placeholder per ID, so cohorts of any size bind
+            conditions.append('s.StudentID IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([int(student_id) for student_id in student_ids]))
+        return ' AND '.join(conditions) or '1', params
+
+    @_timed_read
+    def get_cohort_report_data(self, university_id=None, academic_year=None, student_ids=None) -> dict:
+        """
+        Retrieve the student profile report data of a whole cohort in one read transaction.
+
+        Filters are combined with AND; at least one is required.
+
+        Args:
+            university_id (int): Only students of this university.
+            academic_year (int): Only students in this academic year.
+            student_ids (list[int]): Only these students.
+
+        Returns:
+            dict: A consistent snapshot with keys:
+                - students (pd.DataFrame): Matching Students rows ordered by StudentID
+                - universities (pd.DataFrame): Their Universities rows indexed by UniversityID
+                - grades (GradeStore): Grades of all matching students
+
+        Raises:
+            ValueError: If no filter is given.
+        """
+        if university_id is None and academic_year is None and student_ids is None:
+            raise ValueError('A cohort needs at least one of university_id, academic_year or student_ids.')
+        where, params = self._cohort_filter(university_id, academic_year, student_ids)
+
+        with self.read_transaction() as conn:
+            students = pd.read_sql(
+                f'SELECT s.* FROM Students s WHERE {where} ORDER BY s.StudentID', conn, params=params
+            )
+            universities = pd.read_sql(
+                f'''SELECT * FROM Universities WHERE UniversityID IN (
+                    SELECT DISTINCT s.UniversityID FROM Students s WHERE {where}
+                )''', conn, params=params
+            )
+            grades = self._load_grade_store(conn, where, params)
+
+        return {
+            'students': students,
+            'universities': universities.set_index('UniversityID', drop=False),
+            'grades': grades,
+        }
+
+    @_timed_read
+    def get_grade_store(self, university_id=None, academic_year=None, student_ids=None) -> GradeStore:
+        """
+        Load grades into a columnar GradeStore for analytics.
+
+        Filters are combined with AND; without any, every student's grades are loaded.
+
+        Args:
+            university_id (int): Only students of this university.
+            academic_year (int): Only students in this academic year.
+            student_ids (list[int]): Only these students.
+
+        Returns:
+            GradeStore: The grades, sorted by student.
+        """
+        where, params = self._cohort_filter(university_id, academic_year, student_ids)
+        with self.read_transaction() as conn:
+            return self._load_grade_store(conn, where, params)
+
+    def _load_grade_store(self, conn, where, params):
+        """Grades of the students matching where, from the snapshot when there is one"""
+        store = self._open_grade_snapshot(conn)
+        if store is None:
+            return GradeStore.load(conn, where, params)
+        if where == '1':
+            return store
+        student_ids = [row[0] for row in conn.execute(f'SELECT s.StudentID FROM Students s WHERE {where}', params)]
+        return store.subset(student_ids)
+
+    def _grade_snapshot_key(self, conn):
+        """Snapshot directory name of the data visible in conn, None if it cannot have a snapshot"""
+        if not self._tables_exist(conn, GRADE_STORE_TABLES + ('DataVersions',)):
+            return None
+        versions = dict(conn.execute("SELECT Scope, Version FROM DataVersions WHERE Scope IN ('epoch', 'all')"))
+        if 'epoch' not in versions:
+            # Written before snapshots existed; the next import adds the epoch
+            return None
+        return f"{versions['epoch']:x}-{versions.get('all', 0)}"
+
+    def write_grade_snapshot(self):
+        """
+        Write the columnar snapshot of every grade, as of the latest import.
+
+        Imports and seeding schedule this on a background thread once they
+        commit, so they do not wait for it; call it directly to wait for an
+        up-to-date snapshot. Readers open the
+        snapshot memory-mapped instead of loading grades through SQL, so
+        processes sharing a database also share the snapshot's pages.
+        Older snapshots of the database are removed.
+
+        Every import rewrites the whole snapshot, even a one-row upsert, so
+        each costs a full load of Grades on the writer thread, proportional
+        to all grades rather than to the rows imported. Until the new
+        snapshot exists, readers load their students' grades through SQL.
+
+        Only data loaded through seed and import_csv is tracked; after
+        writing Students, Grades, Exams or Subjects by other means, reseed
+        or import to refresh the snapshot.
+
+        Returns:
+            str: Path of the snapshot directory, or None if the grade tables do not exist yet.
+        """
+        with self.read_transaction() as conn:
+            key = self._grade_snapshot_key(conn)
+            if key is None:
+                return None
+            path = os.path.join(self.snapshot_dir, key)
+            if not os.path.isdir(path):
+                GradeStore.load(conn).save(path)
+
+        for entry in os.listdir(self.snapshot_dir):
+            # Staging directories belong to writers still in progress
+            if entry != key and not entry.startswith('.staging-'):
+                shutil.rmtree(os.path.join(self.snapshot_dir, entry), ignore_errors=True)
+        return path
+
+    def _schedule_grade_snapshot(self):
+        """Write the grade snapshot on the background writer thread"""
+        with self._pool_lock:
+            if self._snapshot_writer is None:
+                self._snapshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='grade-snapshot')
+            pending = self._snapshot_write
+            # A write still queued has not read the database yet, so it will include this import
+            if pending is None or pending.running() or pending.done():
+                self._snapshot_write = self._snapshot_writer.submit(self._write_grade_snapshot_logged)
+
+    def _write_grade_snapshot_logged(self):
+        try:
+            self.write_grade_snapshot()
+        except Exception as e:
+            # Readers fall back to loading grades through SQL
+            logger.warning("Could not write grade snapshot: %s", e)
+
+    def _open_grade_snapshot(self, conn):
+        """Every grade visible in conn as a memory-mapped GradeStore, None if untracked or not written yet"""
+        key = self._grade_snapshot_key(conn)
+        if key is None:
+            return None
+        if self._snapshot is not None and self._snapshot[0] == key:
+            return self._snapshot[1]
+
+        try:
+            store = GradeStore.open(os.path.join(self.snapshot_dir, key))
+        except OSError:
+            # Not written yet, e.g. the background write after an import is still running. The
+            # caller loads only the grades it needs; the whole snapshot is left to the writer.
+            self._schedule_grade_snapshot()
+            return None
+        self._snapshot = (key, store)
+        return store
+
     # TESTED
+    @_timed_read
     def get_university_details(self, university_id) -> pd.Series:
         """
         Retrieve university details for branding.
@@ -195,10 +1623,11 @@ class DatabaseManager:
         WHERE UniversityID = ?
         '''
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(university_query, conn, params=(university_id,)).iloc[0]
 
     # TESTED
+    @_timed_read
     def get_universities_details(self) -> pd.Series:
         """
         Retrieve university details for report branding.
@@ -222,11 +1651,12 @@ class DatabaseManager:
         LIMIT 1
         """
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             result = pd.read_sql(query, conn)
             return result.iloc[0] if not result.empty else pd.Series()
 
     # TESTED
+    @_timed_read
     def get_grades_per_student(self, student_id) -> pd.DataFrame:
         """
         Retrieve the grades for a given student ID.
@@ -251,10 +1681,11 @@ class DatabaseManager:
         WHERE g.StudentID = ?
         '''
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(grades_per_student_sql, conn, params=(student_id,))
 
     # TESTED
+    @_timed_read
     def get_all_grades(self) -> pd.DataFrame:
         """
         Retrieve all grades data with associated exam, subject, and department information.
@@ -269,25 +1700,11 @@ class DatabaseManager:
                 - ExamDate
                 - ExamName
         """
-        query = """
-        SELECT 
-            g.StudentID,
-            s.SubjectName,
-            s.Department,
-            g.MarksObtained as StudentMarks,
-            e.MaximumMarks as MaxMarks,
-            e.ExamDate,
-            e.ExamName
-        FROM Grades g
-        JOIN Exams e ON g.ExamID = e.ExamID
-        JOIN Subjects s ON e.SubjectID = s.SubjectID
-        ORDER BY e.ExamDate ASC
-        """
-
-        with sqlite3.connect(self.db_path) as conn:
-            return pd.read_sql(query, conn)
+        with self._read_connection() as conn:
+            return pd.read_sql(ALL_GRADES_SQL, conn)
 
     # TESTED
+    @_timed_read
     def get_all_students(self) -> pd.DataFrame:
         """
         Retrieve all student records with basic information.
@@ -305,5 +1722,154 @@ class DatabaseManager:
         """
         query = "SELECT * FROM Students"
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             return pd.read_sql(query, conn)
+
+    @_timed_read
+    def get_academic_statistics(self, band_bounds, pass_mark=50, top_mark=90, top_n=3) -> dict:
+        """
+        Aggregate every grade into the statistics of the academic performance report.
+
+        Reads the summary tables maintained by imports, so the cost depends on
+        the number of students, subjects and months but not on the number of
+        grades. Everything is read from one snapshot.
+
+        Args:
+            band_bounds (list): Ascending lower bounds of every grade band but the
+                first, e.g. [50, 60, 70, 80, 90]. Each band ends where the next begins.
+                Bounds are whole percentages, the resolution of GradeHistogram.
+            pass_mark (float): Students whose every grade is at least this pass.
+            top_mark (float): Students whose every grade is at least this are top performers.
+            top_n (int): Number of best students by average percentage to return.
+
+        Returns:
+            dict:
+                - grade_bands: list of grade counts per band, len(band_bounds) + 1
+                - total_students: number of students
+                - average_performance: mean percentage of all grades, NaN without grades
+                - passing_students, top_performers: student counts
+                - subject_avg, dept_avg: pd.Series of mean percentages by name
+                - monthly_avg: pd.DataFrame with columns date, mean and std (sample), sorted by date
+                - top_students: pd.DataFrame with StudentID, FirstName, LastName,
+                  ImageURL, average, subjects and top_subject, best first
+
+        Raises:
+            ValueError: If a band bound is not a whole number.
+        """
+        if any(bound != int(bound) for bound in band_bounds):
+            raise ValueError('Grade band bounds must be whole percentages.')
+
+        # A whole bound b splits truncated percentages exactly where it splits the percentages
+        band_case = ' '.join(f'WHEN Bucket < ? THEN {band}' for band, _ in enumerate(band_bounds))
+        bands_sql = f"""
+        SELECT CASE {band_case} ELSE {len(band_bounds)} END AS band, SUM(Grades) AS grades
+        FROM GradeHistogram
+        GROUP BY band
+        """
+
+        # Sums per subject and month, from which subject, department and monthly figures are derived
+        groups_sql = """
+        SELECT
+            sb.SubjectName,
+            sb.Department,
+            NULLIF(m.Month, '') AS month,
+            SUM(m.Grades) AS n,
+            SUM(m.Total) AS total,
+            SUM(m.Squares) AS squares
+        FROM SubjectMonthSummary m
+        JOIN Subjects sb ON sb.SubjectID = m.SubjectID
+        GROUP BY sb.SubjectName, sb.Department, month
+        """
+
+        students_sql = """
+        SELECT
+            (SELECT COUNT(*) FROM Students) AS total_students,
+            COALESCE(SUM(Lowest >= ?), 0) AS passing_students,
+            COALESCE(SUM(Lowest >= ?), 0) AS top_performers
+        FROM StudentSummary
+        """
+
+        top_students_sql = """
+        SELECT
+            s.StudentID,
+            s.FirstName,
+            s.LastName,
+            s.ImageURL,
+            best.average,
+            best.Subjects AS subjects,
+            sb.SubjectName AS top_subject
+        FROM (
+            SELECT StudentID, Total / Grades AS average, Subjects, BestSubjectID
+            FROM StudentSummary
+            ORDER BY average DESC, StudentID
+            LIMIT ?
+        ) best
+        JOIN Students s ON s.StudentID = best.StudentID
+        LEFT JOIN Subjects sb ON sb.SubjectID = best.BestSubjectID
+        ORDER BY best.average DESC, best.StudentID
+        """
+
+        with self.connection() as conn:
+            built = self._ensure_summaries(conn)
+        if built:
+            self.refresh_replica()
+
+        with self.read_transaction() as conn:
+            band_rows = dict(conn.execute(bands_sql, list(band_bounds)).fetchall())
+            groups = pd.read_sql(groups_sql, conn)
+            total_students, passing, top = conn.execute(students_sql, (pass_mark, top_mark)).fetchone()
+            top_students = pd.read_sql(top_students_sql, conn, params=(top_n,))
+
+        grades = groups['n'].sum()
+        subject_sums = groups.groupby('SubjectName')[['total', 'n']].sum()
+        dept_sums = groups.groupby('Department')[['total', 'n']].sum()
+
+        months = groups.dropna(subset=['month']).groupby('month')[['n', 'total', 'squares']].sum()
+        monthly_avg = pd.DataFrame({
+            'date': pd.to_datetime(months.index + '-01'),
+            'mean': (months['total'] / months['n']).values,
+            # Sample standard deviation from the running sums; undefined for a single grade
+            'std': np.sqrt(
+                ((months['squares'] - months['total'] ** 2 / months['n']) / (months['n'] - 1))
+                .where(months['n'] > 1).clip(lower=0)
+            ).values,
+        }).sort_values('date', ignore_index=True)
+
+        return {
+            'grade_bands': [int(band_rows.get(band, 0)) for band in range(len(band_bounds) + 1)],
+            'total_students': int(total_students),
+            'average_performance': groups['total'].sum() / grades if grades else float('nan'),
+            'passing_students': int(passing),
+            'top_performers': int(top),
+            'subject_avg': (subject_sums['total'] / subject_sums['n']).rename('percentage'),
+            'dept_avg': (dept_sums['total'] / dept_sums['n']).rename('percentage'),
+            'monthly_avg': monthly_avg,
+            'top_students': top_students,
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Seed the academic database from CSV files')
+    parser.add_argument('command', choices=['seed', 'reseed', 'migrate', 'rebuild-summaries'],
+                        help='seed loads new or changed CSVs only, reseed reloads all of them, '
+                             'migrate upgrades the schema in place without loading any CSV, '
+                             'rebuild-summaries recomputes the report summary tables')
+    parser.add_argument('--db-path', default='academic_database.db')
+    parser.add_argument('--csv-dir', default='assets/')
+    args = parser.parse_args()
+
+    manager = DatabaseManager(db_path=args.db_path, csv_dir=args.csv_dir, initialize=False)
+    if args.command == 'rebuild-summaries':
+        counts = manager.rebuild_summaries()
+        manager.close()
+        print('Rebuilt: ' + ', '.join(f'{table_name} ({rows} rows)' for table_name, rows in counts.items()))
+    elif args.command == 'migrate':
+        versions = manager.migrate()
+        manager.close()
+        print(f'Migrated to schema version {versions[-1]}' if versions else 'Nothing to migrate')
+    else:
+        tables = manager.seed(force=args.command == 'reseed')
+        manager.close()
+        print(f"Loaded: {', '.join(tables)}" if tables else 'Nothing to load, all seeds are up to date')
@@ -0,0 +1,80 @@
+"""
+Encoding of exported datasets as CSV or NDJSON byte streams.
+
+Rows arrive in batches from DatabaseManager.iter_dataset and leave as one
+chunk per batch, so an export of any size holds a single batch in memory
+and its first bytes can be sent as soon as the first batch is read.
+"""
+import csv
+import io
+import json
+import zlib
+
+import metrics
+
+# Format -> media type of the uncompressed stream
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    header_written = False
+    for columns, rows in batches:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _ndjson_chunks(batches):
+    for columns, rows in batches:
+        lines = [json.dumps(dict(zip(columns, row)), separators=(',', ':'), default=str) for row in rows]
+        yield ''.join(line + '\n' for line in lines).encode('utf-8')
+
+
+def _gzip_chunks(chunks):
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        # A sync flush per batch keeps the download moving instead of waiting for deflate's window
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _counted(chunks):
+    counter = metrics.BYTES_PRODUCED.labels(kind='export')
+    for chunk in chunks:
+        counter.inc(len(chunk))
+        yield chunk
+
+
+def encode_batches(batches, export_format, compress=False):
+    """
+    Encode (columns, rows) batches as a stream of bytes.
+
+    Args:
+        batches (iterable): (column names, list of row tuples) pairs, see DatabaseManager.iter_dataset.
+        export_format (str): One of EXPORT_FORMATS.
+        compress (bool): gzip the stream.
+
+    Returns:
+        iterator: Byte chunks, one per batch.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if export_format == 'csv':
+        chunks = _csv_chunks(batches)
+    elif export_format == 'ndjson':
+        chunks = _ndjson_chunks(batches)
+    else:
+        raise ValueError(f'Unknown export format {export_format!r}, expected one of {", ".join(EXPORT_FORMATS)}.')
+
+    return _counted(_gzip_chunks(chunks) if compress else chunks)
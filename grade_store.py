@@ -0,0 +1,446 @@
+"""
+Columnar in-memory store of grades for analytics.
+
+Grades are held as parallel NumPy arrays instead of an object-dtype
+DataFrame: int32 student and exam ids, int16 marks and dictionary-encoded
+subject and department codes. Rows are sorted by student, and an offsets
+array marks where every student's grades start, so one student's grades
+are a contiguous slice and per-student aggregates are single vectorized
+reduceat passes. Strings are kept once per distinct value and only decoded
+for the rows a caller asks for.
+
+A store can be saved as a snapshot directory of .npy files and reopened
+memory-mapped, so processes opening the same snapshot share its pages
+through the OS page cache instead of each decoding the grades from SQL.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Rows fetched from SQLite per chunk while loading a store
+LOAD_CHUNK_ROWS = 100_000
+
+# Exam day of grades whose exam has no date
+MISSING_DAY = np.iinfo(np.int32).min
+
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+_LOAD_DTYPE = np.dtype([
+    ('student_id', np.int64),
+    ('exam_id', np.int64),
+    # Floats, so fractional marks reach the integer check instead of being truncated
+    ('marks', np.float64),
+    ('max_marks', np.float64),
+    ('subject_id', np.int64),
+    ('exam_day', np.int64),
+])
+
+# Arrays written to a snapshot directory as <name>.npy
+SNAPSHOT_ARRAYS = (
+    'student_ids', 'exam_ids', 'marks', 'max_marks', 'exam_days', 'subject_codes', 'department_codes',
+    'students', 'offsets', '_exam_name_ids',
+)
+SNAPSHOT_STRINGS = 'strings.json'
+
+
+def _narrow(values, dtype, name):
+    """
+    Cast values to a narrower integer dtype, refusing values it cannot hold exactly.
+
+    Raises:
+        ValueError: If a value is fractional or outside the range of dtype.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'f' and not np.array_equal(values, np.trunc(values)):
+        raise ValueError(f'{name} must be whole numbers, got {values[values != np.trunc(values)][0]}.')
+    limits = np.iinfo(dtype)
+    if len(values) and (values.min() < limits.min or values.max() > limits.max):
+        outside = values[(values < limits.min) | (values > limits.max)][0]
+        raise ValueError(f'{name} must be between {limits.min} and {limits.max}, got {outside}.')
+    return values.astype(dtype)
+
+
+def _factorize(values):
+    """Dictionary-encode values, keeping missing values as a category of their own"""
+    codes, names = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return codes, np.asarray(names, dtype=object)
+
+
+class GradeStore:
+    """
+    Grades sorted by student, as NumPy columns.
+
+    Attributes:
+        student_ids (np.ndarray): int32 student of every grade, ascending.
+        exam_ids (np.ndarray): int32 exam of every grade.
+        marks (np.ndarray): int16 marks obtained.
+        max_marks (np.ndarray): int16 maximum marks of the exam.
+        exam_days (np.ndarray): int32 exam date as days since 1970-01-01, MISSING_DAY if unknown.
+        subject_codes (np.ndarray): int16 index into subject_names.
+        department_codes (np.ndarray): int16 index into department_names.
+        students (np.ndarray): int32 distinct students, ascending.
+        offsets (np.ndarray): Grades of students[i] are rows offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, student_ids, exam_ids, marks, max_marks, exam_days,
+                 subject_codes, department_codes, subject_names, department_names, exam_names=None):
+        """
+        Args:
+            student_ids, exam_ids, marks, max_marks, exam_days, subject_codes,
+                department_codes (array-like): One value per grade, in any order;
+                rows are stably sorted by student.
+            subject_names (array-like): Subject name of every subject code.
+            department_names (array-like): Department of every department code.
+            exam_names (dict): ExamID -> ExamName, used to decode exam_ids.
+
+        Raises:
+            ValueError: If an id does not fit int32, or marks are fractional or do not fit int16.
+        """
+        order = np.argsort(np.asarray(student_ids), kind='stable')
+        exam_names = exam_names or {}
+        exam_name_ids = np.array(sorted(exam_names), dtype=np.int64)
+        self._assign(
+            _narrow(student_ids, np.int32, 'StudentID')[order],
+            _narrow(exam_ids, np.int32, 'ExamID')[order],
+            _narrow(marks, np.int16, 'MarksObtained')[order],
+            _narrow(max_marks, np.int16, 'MaximumMarks')[order],
+            np.asarray(exam_days, dtype=np.int32)[order],
+            np.asarray(subject_codes, dtype=np.int16)[order],
+            np.asarray(department_codes, dtype=np.int16)[order],
+            subject_names, department_names,
+            exam_name_ids, [exam_names[exam_id] for exam_id in exam_name_ids.tolist()],
+        )
+
+    def _assign(self, student_ids, exam_ids, marks, max_marks, exam_days, subject_codes, department_codes,
+                subject_names, department_names, exam_name_ids, exam_names, students=None, offsets=None):
+        """Set the columns of rows already sorted by student, deriving students and offsets if not given"""
+        self.student_ids = student_ids
+        self.exam_ids = exam_ids
+        self.marks = marks
+        self.max_marks = max_marks
+        self.exam_days = exam_days
+        self.subject_codes = subject_codes
+        self.department_codes = department_codes
+        self.subject_names = np.asarray(subject_names, dtype=object)
+        self.department_names = np.asarray(department_names, dtype=object)
+
+        self._exam_name_ids = exam_name_ids
+        # Unknown exams decode to the trailing None
+        self._exam_names = np.array(list(exam_names) + [None], dtype=object)
+
+        if students is None:
+            students, starts = np.unique(student_ids, return_index=True)
+            offsets = np.append(starts, len(student_ids)).astype(np.int64)
+        self.students = students
+        self.offsets = offsets
+        self._percentages = None
+
+    @classmethod
+    def load(cls, conn, where='1', params=()):
+        """
+        Load grades from the database without materialising a DataFrame.
+
+        Grades without marks or without a maximum cannot be aggregated and are skipped.
+
+        Args:
+            conn (sqlite3.Connection): Connection, ideally inside a read transaction.
+            where (str): Condition on Students aliased as s, e.g. 's.UniversityID = ?'.
+            params (tuple): Parameters of where.
+
+        Returns:
+            GradeStore: The grades of the matching students.
+
+        Raises:
+            ValueError: If a grade holds a value the store's columns cannot represent exactly.
+        """
+        grades_sql = f"""
+        SELECT
+            g.StudentID,
+            g.ExamID,
+            g.MarksObtained,
+            e.MaximumMarks,
+            e.SubjectID,
+            COALESCE(CAST(julianday(e.ExamDate) - {_UNIX_EPOCH_JULIAN_DAY} AS INTEGER), {MISSING_DAY})
+        FROM Students s
+        JOIN Grades g ON g.StudentID = s.StudentID
+        JOIN Exams e ON e.ExamID = g.ExamID
+        JOIN Subjects sb ON sb.SubjectID = e.SubjectID
+        WHERE ({where}) AND g.MarksObtained IS NOT NULL AND e.MaximumMarks IS NOT NULL
+        ORDER BY g.StudentID, g.GradeID
+        """
+        cursor = conn.execute(grades_sql, params)
+        chunks = [np.array(rows, dtype=_LOAD_DTYPE) for rows in iter(lambda: cursor.fetchmany(LOAD_CHUNK_ROWS), [])]
+        rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=_LOAD_DTYPE)
+
+        subjects = conn.execute('SELECT SubjectID, SubjectName, Department FROM Subjects ORDER BY SubjectID').fetchall()
+        subject_ids = np.array([row[0] for row in subjects], dtype=np.int64)
+        subject_codes, subject_names = _factorize([row[1] for row in subjects])
+        department_codes, department_names = _factorize([row[2] for row in subjects])
+
+        # Every grade joined Subjects, so its subject is present in subject_ids
+        subject_index = np.searchsorted(subject_ids, rows['subject_id'])
+        # Exams is small; narrowing it to the loaded grades costs another join over Grades
+        exam_names = dict(conn.execute('SELECT ExamID, ExamName FROM Exams').fetchall())
+
+        return cls(
+            rows['student_id'], rows['exam_id'], rows['marks'], rows['max_marks'], rows['exam_day'],
+            subject_codes[subject_index], department_codes[subject_index], subject_names, department_names,
+            exam_names,
+        )
+
+    @classmethod
+    def from_frame(cls, grades_df: pd.DataFrame):
+        """
+        Build a store from a grades DataFrame.
+
+        Args:
+            grades_df (pd.DataFrame): Columns StudentID, SubjectName, Department,
+                ExamDate and StudentMarks, MaxMarks; ExamID and ExamName are optional.
+
+        Returns:
+            GradeStore: The same grades.
+        """
+        subject_codes, subject_names = _factorize(grades_df['SubjectName'])
+        department_codes, department_names = _factorize(grades_df['Department'])
+        exam_dates = pd.to_datetime(grades_df['ExamDate'])
+        exam_days = np.where(
+            exam_dates.isna(), MISSING_DAY, exam_dates.values.astype('datetime64[D]').astype(np.int64)
+        )
+
+        names = grades_df['ExamName'] if 'ExamName' in grades_df else pd.Series([None] * len(grades_df))
+        if 'ExamID' in grades_df:
+            exam_ids = grades_df['ExamID'].to_numpy()
+            exam_names = dict(zip(exam_ids.tolist(), names))
+        else:
+            # Number the distinct exam names so they still round-trip
+            exam_ids, distinct_names = _factorize(names)
+            exam_names = dict(enumerate(distinct_names))
+
+        return cls(
+            grades_df['StudentID'], exam_ids, grades_df['StudentMarks'], grades_df['MaxMarks'], exam_days,
+            subject_codes, department_codes, subject_names, department_names, exam_names,
+        )
+
+    def save(self, path):
+        """
+        Write the store as a snapshot directory that open can memory-map.
+
+        The directory is written under a temporary name and renamed into
+        place, so readers never see a partial snapshot. If path already
+        exists, it is kept and nothing is written.
+
+        Args:
+            path (str): Snapshot directory to create.
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+        try:
+            for name in SNAPSHOT_ARRAYS:
+                np.save(os.path.join(staging, f'{name.lstrip("_")}.npy'), np.ascontiguousarray(getattr(self, name)))
+            with open(os.path.join(staging, SNAPSHOT_STRINGS), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'subject_names': self.subject_names.tolist(),
+                    'department_names': self.department_names.tolist(),
+                    'exam_names': self._exam_names[:-1].tolist(),
+                }, f)
+            os.rename(staging, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+            # Another writer renamed the same snapshot into place first
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @classmethod
+    def open(cls, path, mmap_mode='r'):
+        """
+        Open a snapshot written by save.
+
+        Args:
+            path (str): Snapshot directory.
+            mmap_mode (str): Passed to np.load; 'r' maps the arrays read-only
+                without copying them, None reads them into memory.
+
+        Returns:
+            GradeStore: The saved grades.
+
+        Raises:
+            OSError: If the snapshot is missing or incomplete.
+        """
+        arrays = {
+            name: np.load(os.path.join(path, f'{name.lstrip("_")}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in SNAPSHOT_ARRAYS
+        }
+        with open(os.path.join(path, SNAPSHOT_STRINGS), encoding='utf-8') as f:
+            strings = json.load(f)
+
+        store = cls.__new__(cls)
+        store._assign(
+            arrays['student_ids'], arrays['exam_ids'], arrays['marks'], arrays['max_marks'], arrays['exam_days'],
+            arrays['subject_codes'], arrays['department_codes'], strings['subject_names'], strings['department_names'],
+            arrays['_exam_name_ids'], strings['exam_names'], arrays['students'], arrays['offsets'],
+        )
+        return store
+
+    def subset(self, student_ids):
+        """
+        The grades of some students, as a new store.
+
+        Args:
+            student_ids (iterable): Students to keep; those without grades are ignored.
+
+        Returns:
+            GradeStore: A store sharing this store's string dictionaries.
+        """
+        wanted = np.unique(np.asarray(list(student_ids), dtype=np.int64))
+        positions = np.searchsorted(self.students, wanted)
+        found = positions < len(self.students)
+        found[found] = self.students[positions[found]] == wanted[found]
+        positions = positions[found]
+
+        starts = self.offsets[positions]
+        counts = self.offsets[positions + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        # Row numbers of every kept slice, without a Python loop over students
+        rows = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+
+        store = GradeStore.__new__(GradeStore)
+        store._assign(
+            self.student_ids[rows], self.exam_ids[rows], self.marks[rows], self.max_marks[rows], self.exam_days[rows],
+            self.subject_codes[rows], self.department_codes[rows], self.subject_names, self.department_names,
+            self._exam_name_ids, self._exam_names[:-1], self.students[positions], offsets,
+        )
+        return store
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the per-grade and per-student arrays"""
+        return sum(array.nbytes for array in (
+            self.student_ids, self.exam_ids, self.marks, self.max_marks, self.exam_days,
+            self.subject_codes, self.department_codes, self.students, self.offsets,
+        ))
+
+    @property
+    def percentages(self):
+        """Percentage of every grade as float64, computed once"""
+        if self._percentages is None:
+            self._percentages = self.marks / self.max_marks.astype(np.float64) * 100
+        return self._percentages
+
+    def student_slice(self, student_id):
+        """
+        Rows of one student's grades.
+
+        Returns:
+            slice: A contiguous row range, empty if the student has no grades.
+        """
+        position = np.searchsorted(self.students, student_id)
+        if position == len(self.students) or self.students[position] != student_id:
+            return slice(0, 0)
+        return slice(int(self.offsets[position]), int(self.offsets[position + 1]))
+
+    def _exam_dates(self, rows):
+        days = self.exam_days[rows]
+        dates = days.astype('datetime64[D]').astype(str).astype(object)
+        dates[days == MISSING_DAY] = None
+        return dates
+
+    def student_grades(self, student_id) -> pd.DataFrame:
+        """
+        Decode one student's grades.
+
+        Returns:
+            pd.DataFrame: Columns SubjectName, ExamName, ExamDate, StudentMarks and
+                MaxMarks, as returned by DatabaseManager.get_grades_per_student.
+        """
+        rows = self.student_slice(student_id)
+        exam_ids = self.exam_ids[rows]
+        exam_index = np.searchsorted(self._exam_name_ids, exam_ids)
+        found = exam_index < len(self._exam_name_ids)
+        found[found] = self._exam_name_ids[exam_index[found]] == exam_ids[found]
+        # Unknown exams point at the trailing None
+        exam_index[~found] = len(self._exam_name_ids)
+
+        return pd.DataFrame({
+            'SubjectName': self.subject_names[self.subject_codes[rows]],
+            'ExamName': self._exam_names[exam_index],
+            'ExamDate': self._exam_dates(rows),
+            'StudentMarks': self.marks[rows].astype(np.int64),
+            'MaxMarks': self.max_marks[rows].astype(np.int64),
+        })
+
+    def student_subjects(self, student_id) -> pd.DataFrame:
+        """
+        Subject and department of every grade of one student.
+
+        Returns:
+            pd.DataFrame: Columns StudentID, SubjectName and Department, as returned
+                by DatabaseManager.get_subjects_per_student.
+        """
+        rows = self.student_slice(student_id)
+        return pd.DataFrame({
+            'StudentID': self.student_ids[rows].astype(np.int64),
+            'SubjectName': self.subject_names[self.subject_codes[rows]],
+            'Department': self.department_names[self.department_codes[rows]],
+        })
+
+    def student_aggregates(self) -> pd.DataFrame:
+        """
+        Per-student percentage aggregates in one vectorized pass.
+
+        Returns:
+            pd.DataFrame: Columns grades, mean, min and max, indexed by StudentID.
+        """
+        if not len(self):
+            return pd.DataFrame(columns=['grades', 'mean', 'min', 'max'], index=pd.Index([], name='StudentID'))
+
+        starts = self.offsets[:-1]
+        counts = np.diff(self.offsets)
+        percentages = self.percentages
+        return pd.DataFrame({
+            'grades': counts,
+            'mean': np.add.reduceat(percentages, starts) / counts,
+            'min': np.minimum.reduceat(percentages, starts),
+            'max': np.maximum.reduceat(percentages, starts),
+        }, index=pd.Index(self.students.astype(np.int64), name='StudentID'))
+
+    def top_students(self, n) -> pd.DataFrame:
+        """
+        The n students with the highest mean percentage, best first.
+
+        Ties are broken by StudentID. Only the candidates are sorted, so this
+        stays linear in the number of students.
+
+        Returns:
+            pd.DataFrame: Rows of student_aggregates.
+        """
+        aggregates = self.student_aggregates()
+        means = aggregates['mean'].to_numpy()
+        if n < len(means):
+            threshold = np.partition(means, len(means) - n)[len(means) - n]
+            aggregates = aggregates[means >= threshold]
+        ranked = aggregates.reset_index().sort_values(['mean', 'StudentID'], ascending=[False, True])
+        return ranked.head(n).set_index('StudentID')
+
+    def _group_means(self, codes, names):
+        counts = np.bincount(codes, minlength=len(names))
+        totals = np.bincount(codes, weights=self.percentages, minlength=len(names))
+        present = counts > 0
+        means = pd.Series(totals[present] / counts[present], index=pd.Index(names[present]), name='percentage')
+        return means.sort_index()
+
+    def subject_averages(self) -> pd.Series:
+        """Mean percentage per subject name, sorted by name"""
+        return self._group_means(self.subject_codes, self.subject_names)
+
+    def department_averages(self) -> pd.Series:
+        """Mean percentage per department, sorted by name"""
+        return self._group_means(self.department_codes, self.department_names)
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+import config
+import metrics
+
+# Bounding box of the photos embedded in reports and served by /api/v1/image
+THUMBNAIL_SIZE = (300, 300)
+THUMBNAIL_QUALITY = 85
+
+
+def make_thumbnail(image, size=THUMBNAIL_SIZE):
+    """
+    Resize an image to fit size and encode it as JPEG.
+
+    Args:
+        image (PIL.Image.Image): Source image, modified in place.
+        size (tuple): Bounding box (width, height).
+
+    Returns:
+        bytes: The JPEG-encoded thumbnail.
+    """
+    image.thumbnail(size)
+
+    # JPEG has no alpha channel, flatten transparent images onto white
+    if image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thumbnails of local images, cached in memory and on disk.
+
+    Entries are keyed on the source path, its mtime and size and the target
+    size, so replacing a photo produces a new thumbnail without any explicit
+    invalidation. The in-memory LRU serves repeated reports in the same
+    process; the disk cache survives restarts and is shared by every worker.
+    Writing a thumbnail removes older versions of the same photo and size,
+    then evicts least recently used files while the disk cache is over
+    max_bytes.
+    """
+
+    SUFFIX = '.jpg'
+
+    def __init__(self, directory=None, max_items=None, max_bytes=None):
+        """
+        Args:
+            directory (str): Disk cache location, defaults to config.THUMBNAIL_CACHE_DIR.
+            max_items (int): Thumbnails kept in memory, defaults to config.THUMBNAIL_CACHE_ITEMS.
+            max_bytes (int): Size of the disk cache, defaults to config.THUMBNAIL_CACHE_MAX_BYTES.
+        """
+        self.directory = directory or config.THUMBNAIL_CACHE_DIR
+        self.max_items = config.THUMBNAIL_CACHE_ITEMS if max_items is None else max_items
+        self.max_bytes = config.THUMBNAIL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, size=THUMBNAIL_SIZE):
+        """
+        Return the JPEG thumbnail of a local image, creating it on first use.
+
+        Args:
+            path (str): Path of the source image.
+            size (tuple): Bounding box (width, height).
+
+        Returns:
+            bytes: The JPEG-encoded thumbnail.
+
+        Raises:
+            OSError: If the source image cannot be read or decoded.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(size))
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is not None:
+            metrics.CACHE_REQUESTS.labels(cache='thumbnail', result='hit').inc()
+            return data
+
+        disk_path = self._disk_path(key)
+        try:
+            with open(disk_path, 'rb') as f:
+                data = f.read()
+            # atime tracks recency for eviction
+            os.utime(disk_path)
+            metrics.CACHE_REQUESTS.labels(cache='thumbnail', result='disk_hit').inc()
+        except FileNotFoundError:
+            with Image.open(path) as image:
+                data = make_thumbnail(image, size)
+            self._write(disk_path, data)
+            self.evict(keep=disk_path)
+            metrics.CACHE_REQUESTS.labels(cache='thumbnail', result='miss').inc()
+
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return data
+
+    def _disk_path(self, key):
+        # <source and size>-<version>, so older versions of a photo share the file name prefix
+        path, mtime_ns, file_size, size = key
+        source = hashlib.sha256(repr((path, size)).encode('utf-8')).hexdigest()[:32]
+        version = hashlib.sha256(repr((mtime_ns, file_size)).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f'{source}-{version}{self.SUFFIX}')
+
+    def _write(self, disk_path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, disk_path)
+
+    def evict(self, keep=None):
+        """
+        Trim the disk cache.
+
+        Args:
+            keep (str): A thumbnail just written. Other versions of the same
+                photo and size are removed, and it is evicted last.
+        """
+        stale_prefix = os.path.basename(keep).split('-')[0] + '-' if keep else None
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(self.SUFFIX):
+                        continue
+                    if stale_prefix and entry.name.startswith(stale_prefix) and entry.path != keep:
+                        self._remove(entry.path)
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path == keep, stat.st_atime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return
+
+        total = sum(size for _, _, size, _ in entries)
+        for _, _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Forget the in-memory thumbnails; the disk cache is kept"""
+        with self._lock:
+            self._memory.clear()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_thumbnail(path, size=THUMBNAIL_SIZE):
+    """Return the JPEG thumbnail of a local image from the process-wide ThumbnailCache"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ThumbnailCache()
+    return _default_cache.get(path, size)
@@ -7,12 +7,33 @@ import uvicorn
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
+from fastapi.responses import Response
+
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+
+import logging
 
 # Import the V1 router
-from api.v1.router_v1 import router_v1
+from api.v1.router_v1 import router_v1, renderer_pool, db_manager
+import metrics
 
 
 templates = Jinja2Templates(directory='templates')
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The service does not seed the database; point at the command that does
+    for problem in await run_in_threadpool(db_manager.check_schema):
+        logger.warning("%s Run `python -m database seed` to load and upgrade the database.", problem)
+    # Start renderer workers before the first request instead of during it
+    if renderer_pool is not None:
+        await run_in_threadpool(renderer_pool.warm_up)
+    yield
+    if renderer_pool is not None:
+        renderer_pool.shutdown()
 
 # Create FastAPI application
 app = FastAPI(
@@ -20,7 +41,8 @@ app = FastAPI(
     description="Comprehensive student performance reporting system",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -32,6 +54,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and status counts for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
@@ -47,6 +72,11 @@ async def health_check():
     """Simple health check endpoint"""
     return {"status": "healthy", "message": "Academic Reporting Engine is running"}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Request, report pipeline stage, database, cache and output metrics in the Prometheus text format"""
+    return Response(metrics.REGISTRY.exposition(), media_type=metrics.CONTENT_TYPE)
+
 # Run the application
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,288 @@
+"""
+Low-overhead metrics for the report pipeline, exposed in the Prometheus text format.
+
+Counters and histograms follow the prometheus_client API (labels(),
+inc(), observe(), time()) without the dependency. A labelled child is
+created once per label combination and updates under its own lock, so
+recording a sample costs about a microsecond.
+
+Renderer pool workers record into their own process; RendererPool ships
+their samples back with every result (see drain and merge), so
+/metrics shows the whole pipeline whether reports render in the API
+process or in workers.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Add amount, which must not be negative"""
+        if amount < 0:
+            raise ValueError('Counters can only increase.')
+        with self._lock:
+            self._value += amount
+
+    def _drain(self):
+        with self._lock:
+            value, self._value = self._value, 0
+        return value
+
+    def _merge(self, value):
+        with self._lock:
+            self._value += value
+
+    def _samples(self, name, labels):
+        yield f'{name}{_format_labels(labels)} {_format_value(self._value)}'
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one sample"""
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the block in seconds, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _drain(self):
+        with self._lock:
+            state = (self._counts, self._sum)
+            self._counts, self._sum = [0] * len(self._counts), 0.0
+        return state
+
+    def _merge(self, state):
+        counts, total = state
+        with self._lock:
+            self._counts = [mine + theirs for mine, theirs in zip(self._counts, counts)]
+            self._sum += total
+
+    def _samples(self, name, labels):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float('inf'),), counts):
+            cumulative += count
+            yield f'{name}_bucket{_format_labels(labels + [("le", _format_value(float(bound)))])} {cumulative}'
+        yield f'{name}_count{_format_labels(labels)} {cumulative}'
+        yield f'{name}_sum{_format_labels(labels)} {_format_value(total)}'
+
+
+class _Metric:
+    kind = None
+    suffix = ''
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self.labels()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """
+        The child for one combination of label values.
+
+        Look it up once and keep it when recording in a hot path.
+
+        Raises:
+            ValueError: If the label names differ from the metric's.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {", ".join(self.labelnames) or "(none)"}.')
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _collect(self):
+        name = self.name + self.suffix
+        yield f'# HELP {name} {self.documentation}'
+        yield f'# TYPE {name} {self.kind}'
+        with self._lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            yield from child._samples(name, list(zip(self.labelnames, key)))
+
+
+class Counter(_Metric):
+    """Monotonic count; exposed as <name>_total"""
+    kind = 'counter'
+    suffix = '_total'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._unlabelled.inc(amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, with their count and sum"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._unlabelled.observe(value)
+
+    def time(self):
+        return self._unlabelled.time()
+
+
+class Registry:
+    """The metrics of a process, rendered together by exposition"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered.')
+            self._metrics[metric.name] = metric
+
+    def exposition(self):
+        """
+        Render every metric in the Prometheus text format.
+
+        Returns:
+            str: The document, served with CONTENT_TYPE.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return ''.join(line + '\n' for metric in metrics for line in metric._collect())
+
+    def drain(self):
+        """
+        Take every sample recorded since the last drain, resetting them to zero.
+
+        Returns:
+            dict: Picklable samples for merge in another process.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {key: child._drain() for key, child in list(metric._children.items())}
+            for metric in metrics
+        }
+
+    def merge(self, samples):
+        """Add samples drained from another process's registry"""
+        for name, children in samples.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            for key, state in children.items():
+                metric.labels(**dict(zip(metric.labelnames, key)))._merge(state)
+
+
+REGISTRY = Registry()
+
+# Report pipeline: data (database reads and aggregation), chart_draw (matplotlib),
+# chart_encode (PNG/SVG), template (Jinja) and pdf (xhtml2pdf)
+STAGE_SECONDS = Histogram('ars_report_stage_seconds', 'Time spent in each report pipeline stage.', ['stage'])
+DB_CALL_SECONDS = Histogram(
+    'ars_db_call_seconds', 'Latency of DatabaseManager reads; the count is the number of calls.', ['method']
+)
+CACHE_REQUESTS = Counter('ars_cache_requests', 'Cache lookups by cache and result (hit, disk_hit for the thumbnail disk tier, or miss).', ['cache', 'result'])
+BYTES_PRODUCED = Counter('ars_bytes_produced', 'Bytes produced: pdf documents, chart images and exports.', ['kind'])
+HTTP_REQUEST_SECONDS = Histogram(
+    'ars_http_request_seconds', 'HTTP request latency until the response body is sent.', ['method', 'route']
+)
+HTTP_REQUESTS = Counter('ars_http_requests', 'HTTP requests by response status.', ['method', 'route', 'status'])
+
+
+def stage(name):
+    """Time a report pipeline stage, e.g. with stage('pdf'): ..."""
+    return STAGE_SECONDS.labels(stage=name).time()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and status of every HTTP request.
+
+    Requests are labelled with their route template (e.g. /api/v1/table/{table_name}),
+    not the raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Set by FastAPI once routing matched; static files and 404s have none
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            method = scope['method']
+            HTTP_REQUEST_SECONDS.labels(method=method, route=route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method=method, route=route, status=status).inc()
@@ -0,0 +1,174 @@
+"""
+On-demand profiling of single requests.
+
+With ARS_PROFILING=1, a report request that asks for it, through
+?profile=<mode> or an X-Profile: <mode> header, runs under a profiler.
+The profile is stored in PROFILE_DIR and its id is returned in the
+X-Profile-Id response header. Two modes are supported:
+
+- cprofile: deterministic cProfile of the request thread, stored as a
+  .pstats file (pstats, snakeviz, flameprof)
+- sample:   a sampling profiler that records the request thread's stack
+  every PROFILE_SAMPLE_INTERVAL_MS, stored as .collapsed stacks, one
+  "frame;frame;frame count" line per stack (flamegraph.pl, speedscope)
+
+cprofile counts every call exactly but slows Python-heavy code down
+several times. sample barely slows the request, but it only sees stacks
+that last longer than the interval. A profiled request renders in its own
+thread and skips the report cache, so the profile covers the
+DatabaseManager reads and the ReportGenerator render it would otherwise
+hand to a pool worker or serve from the cache.
+"""
+import collections
+import contextvars
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import config
+
+# Mode -> file extension of its profiles
+PROFILE_MODES = {
+    'cprofile': '.pstats',
+    'sample': '.collapsed',
+}
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9T]+-[a-z0-9-]+-[0-9a-f]{8}$')
+
+# Python 3.12+ allows one cProfile at a time per process
+_CPROFILE_LOCK = threading.Lock()
+
+_active = contextvars.ContextVar('profiling_active', default=False)
+
+
+def active():
+    """True while the current request is being profiled"""
+    return _active.get()
+
+
+class ProfileRun:
+    """A profile being recorded; id and path are set once it is stored"""
+
+    def __init__(self, mode, label):
+        self.mode = mode
+        self.id = f'{time.strftime("%Y%m%dT%H%M%S")}-{label}-{uuid.uuid4().hex[:8]}'
+        self.path = None
+
+    def headers(self):
+        """Response headers pointing at the stored profile"""
+        return {'X-Profile-Id': self.id} if self.path else {}
+
+
+class _StackSampler(threading.Thread):
+    """Counts the stacks of one thread, sampled every interval seconds"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                # Root first, the collapsed-stack convention
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _prune(directory, keep):
+    """Delete all but the keep most recent profiles"""
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(tuple(PROFILE_MODES.values()))),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:max(0, len(profiles) - keep)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def profiled(mode, label, directory=None):
+    """
+    Profile the enclosed block in the current thread and store the profile.
+
+    Args:
+        mode (str): One of PROFILE_MODES, or None to run unprofiled.
+        label (str): Lowercase name of what is profiled, part of the profile id.
+        directory (str): Where to store the profile, defaults to config.PROFILE_DIR.
+
+    Yields:
+        ProfileRun: The profile, stored when the block exits (also when it raises), or None if mode is None.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode is None:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f'Unknown profile mode {mode!r}, expected one of {", ".join(PROFILE_MODES)}.')
+
+    directory = directory or config.PROFILE_DIR
+    run = ProfileRun(mode, label)
+    token = _active.set(True)
+    try:
+        if mode == 'cprofile':
+            with _CPROFILE_LOCK:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield run
+                finally:
+                    profiler.disable()
+        else:
+            sampler = _StackSampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            sampler.start()
+            try:
+                yield run
+            finally:
+                sampler.stop()
+    finally:
+        _active.reset(token)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, run.id + PROFILE_MODES[mode])
+        if mode == 'cprofile':
+            profiler.dump_stats(path)
+        else:
+            with open(path, 'w') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in sampler.stacks.items())
+        run.path = path
+        _prune(directory, config.PROFILE_KEEP)
+
+
+def profile_path(profile_id, directory=None):
+    """
+    Path of a stored profile.
+
+    Raises:
+        LookupError: If there is no profile with this id.
+    """
+    directory = directory or config.PROFILE_DIR
+    if PROFILE_ID_PATTERN.match(profile_id):
+        for extension in PROFILE_MODES.values():
+            path = os.path.join(directory, profile_id + extension)
+            if os.path.exists(path):
+                return path
+    raise LookupError(f'Profile {profile_id} not found.')
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+
+import config
+import metrics
+
+# ReportGenerator methods a worker may run; each takes plain data and returns PDF bytes
+RENDER_TASKS = ('render_student_profile', 'render_academic_performance')
+
+# Per-process ReportGenerator, created once by _init_worker
+_worker_generator = None
+
+
+def _init_worker():
+    """Pay the import, font and template compilation costs once per worker process"""
+    global _worker_generator
+
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    from report_generator import ReportGenerator, STUDENT_PROFILE_TEMPLATE, ACADEMIC_PERFORMANCE_TEMPLATE
+
+    # Loads the font cache and resolves the default font family
+    font_manager.findfont(font_manager.FontProperties())
+
+    _worker_generator = ReportGenerator(None)
+    for template_name in (STUDENT_PROFILE_TEMPLATE, ACADEMIC_PERFORMANCE_TEMPLATE):
+        _worker_generator.template_env.get_template(template_name)
+
+    # A forked worker starts with a copy of the parent's samples; only ship its own
+    metrics.REGISTRY.drain()
+
+
+def _run_task(task, *args):
+    """Run a task and return (result, metric samples it recorded) for the parent to merge"""
+    return getattr(_worker_generator, task)(*args), metrics.REGISTRY.drain()
+
+
+def _merge_samples(outer, inner):
+    """Complete outer with inner's result after merging the worker's metric samples"""
+    if inner.cancelled():
+        outer.cancel()
+        return
+    error = inner.exception()
+    if error is None:
+        result, samples = inner.result()
+        metrics.REGISTRY.merge(samples)
+    try:
+        if error is None:
+            outer.set_result(result)
+        else:
+            outer.set_exception(error)
+    except InvalidStateError:
+        pass  # The caller cancelled while the worker was already rendering
+
+
+def _ping():
+    return os.getpid()
+
+
+class RendererPool:
+    """
+    Pool of long-lived worker processes that render report PDFs.
+
+    matplotlib and xhtml2pdf are CPU-bound and not thread-safe, so each
+    worker is a separate process that imports them, loads fonts and
+    compiles the Jinja templates once, then renders any number of reports.
+    Callers send chart data plus template context and get PDF bytes back.
+    """
+
+    def __init__(self, workers=None, start_method=None):
+        self.workers = workers or os.cpu_count()
+        context = multiprocessing.get_context(start_method or config.RENDER_POOL_START_METHOD)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_init_worker
+        )
+
+    def submit(self, task, *args):
+        """
+        Queue a render task.
+
+        Args:
+            task (str): One of RENDER_TASKS.
+            *args: Arguments for the ReportGenerator method.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the PDF bytes.
+        """
+        if task not in RENDER_TASKS:
+            raise ValueError(f'Unknown render task {task!r}, expected one of {", ".join(RENDER_TASKS)}.')
+        inner = self._executor.submit(_run_task, task, *args)
+        outer = Future()
+        outer.add_done_callback(lambda future: future.cancelled() and inner.cancel())
+        inner.add_done_callback(lambda future: _merge_samples(outer, future))
+        return outer
+
+    def render(self, task, *args):
+        """Render synchronously and return the PDF bytes"""
+        return self.submit(task, *args).result()
+
+    def warm_up(self):
+        """Start every worker now instead of on the first reports"""
+        futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
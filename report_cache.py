@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import config
+import metrics
+
+
+class ReportCache:
+    """
+    Content-addressed on-disk cache of rendered report PDFs.
+
+    Entries are keyed on everything that determines a report's bytes: the
+    report type, its parameters, the version of the data it was built from
+    and a hash of the template. A data change therefore never serves a stale
+    PDF; it simply stops matching the old key, and the old entry ages out or
+    is evicted least-recently-used first once the cache outgrows max_bytes.
+    """
+
+    SUFFIX = '.pdf'
+
+    def __init__(self, directory=None, max_bytes=None, max_age_seconds=None):
+        """
+        Args:
+            directory (str): Where entries are stored, defaults to config.REPORT_CACHE_DIR.
+            max_bytes (int): Total size above which entries are evicted.
+            max_age_seconds (int): Entries older than this are never served.
+        """
+        self.directory = directory or config.REPORT_CACHE_DIR
+        self.max_bytes = config.REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age_seconds = config.REPORT_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(report_type, params, data_version, template_hash):
+        """
+        Build the cache key of a report.
+
+        Args:
+            report_type (str): e.g. 'student-profile'.
+            params (dict): JSON-serialisable report parameters.
+            data_version (str): Token from DatabaseManager.get_data_version.
+            template_hash (str): Hash of the template and rendering code.
+
+        Returns:
+            str: Hex digest identifying the report.
+        """
+        payload = json.dumps([report_type, params, data_version, template_hash], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def lookup(self, key):
+        """
+        Find a fresh entry and mark it as recently used.
+
+        Returns:
+            str: Path of the cached PDF, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            fresh = time.time() - stat.st_mtime <= self.max_age_seconds
+            if fresh:
+                # atime tracks recency for eviction, mtime keeps the creation time for expiry
+                os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            fresh = False
+
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.CACHE_REQUESTS.labels(cache='report', result='hit' if fresh else 'miss').inc()
+        return path if fresh else None
+
+    def put(self, key, pdf_bytes):
+        """Store a rendered PDF, then evict entries until the cache fits its limits"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        # Readers only ever see complete files
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        entries.append((entry.path, entry.stat()))
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones while over max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for path, stat in self._entries():
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(path)
+                else:
+                    entries.append((stat.st_atime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            self.evictions += 1
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            for path, _ in self._entries():
+                self._remove(path)
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_ratio, evictions, entries and bytes.
+        """
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(stat.st_size for _, stat in entries),
+            }
@@ -1,46 +1,92 @@
 import os
-import matplotlib.pyplot as plt
-import matplotlib
+import hashlib
+import shutil
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
 from typing import List
 from jinja2 import Environment, FileSystemLoader
 from xhtml2pdf import pisa
-import io
 import base64
-import requests
 from io import BytesIO
-from PIL import Image
 
 import pandas as pd
 from database import DatabaseManager
+import charts
+import metrics
+import profiling
+from images import get_thumbnail
+from asset_resolver import default_resolver
 from datetime import datetime
-import numpy as np
 
-matplotlib.use('Agg')
+# xhtml2pdf and reportlab keep global state, so only one report renders at a time per process
+_RENDER_LOCK = threading.Lock()
 
-class ReportGenerator:
-    def __init__(self, db_manager):
-        self.db_manager: DatabaseManager = db_manager
-        self.template_env = Environment(loader=FileSystemLoader('templates'))
-        self.static_dir = 'static'
+# Bump when chart or layout code changes so cached reports are re-rendered
+RENDER_REVISION = 3
+
+STUDENT_PROFILE_TEMPLATE = 'student_individual_report.html'
+ACADEMIC_PERFORMANCE_TEMPLATE = 'academic_performance_report.html'
+
+# Grade bands as [low, high) percentage ranges; the last band also holds 100%
+GRADE_RANGES = [(0, 50), (50, 60), (60, 70), (70, 80), (80, 90), (90, 100)]
+GRADE_LABELS = [
+    "F (0 - 49)",
+    "E (50 - 59)",
+    "D (60 - 69)",
+    "C (70 - 79)",
+    "B (80 - 89)",
+    "A (90 - 100)",
+]
+
+# Students with every grade at or above these marks pass / are top performers
+PASS_MARK = 50
+TOP_MARK = 90
+
+class _ZipChunkSink:
+    """
+    Write-only, non-seekable file object for zipfile.
 
-    def _save_plot_to_base64(self, plt=None, image = None):
+    zipfile falls back to data descriptors when it cannot seek, so the
+    archive can be handed out chunk by chunk through drain().
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ReportGenerator:
+    def __init__(self, db_manager, renderer=None, cache=None, assets=None):
         """
-        Save matplotlib plot to base64 encoded image
-        
         Args:
-            plt (matplotlib.pyplot): Current plot
-        
-        Returns:
-            str: Base64 encoded image
+            db_manager (DatabaseManager): Source of report data.
+            renderer (RendererPool): Optional pool of worker processes that
+                render PDFs; without one, reports render in this process.
+            cache (ReportCache): Optional cache of rendered PDFs, reused
+                until the underlying data or template changes.
+            assets (AssetResolver): Local store of remote logos and photos,
+                defaults to the process-wide resolver.
         """
-        if image:
-            return base64.b64encode(image).decode('utf-8')
-
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        return encoded
+        self.db_manager: DatabaseManager = db_manager
+        self.renderer = renderer
+        self.cache = cache
+        self.assets = assets
+        self._template_hashes = {}
+        self.template_env = Environment(loader=FileSystemLoader('templates'))
+        self.static_dir = 'static'
 
     def _get_image_as_base64(
         self, image_path, default_image_path="static/default_student.png"
@@ -58,12 +104,12 @@ class ReportGenerator:
         try:
             # Check if the path is a URL
             if image_path.startswith(("http://", "https://")):
-                response = requests.get(image_path)
-                if response.status_code == 200:
-                    img_data = response.content
-                    img = Image.open(BytesIO(img_data))
-                else:
+                # Downloaded once into the asset store, then thumbnailed like a local file
+                full_path = self._assets().resolve(image_path)
+                if full_path is None:
                     raise Exception("Failed to fetch image from URL")
+
+                thumbnail = get_thumbnail(full_path)
             else:
                 # Handle local file
                 # Construct the full path for local images
@@ -72,23 +118,10 @@ class ReportGenerator:
                 else:
                     full_path = image_path
 
-                # Open local image file
-                img = Image.open(full_path)
-
-            # Resize image to reasonable dimensions for PDF
-            img.thumbnail((300, 300))
-
-            # Convert to RGB if necessary
-            if img.mode in ("RGBA", "LA"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])
-                img = background
+                # Decoded and resized once, then served from the thumbnail cache
+                thumbnail = get_thumbnail(full_path)
 
-            # Save to bytes
-            buffer = BytesIO()
-            img.save(buffer, format="JPEG", quality=85)
-
-            return base64.b64encode(buffer.getvalue()).decode("utf-8")
+            return base64.b64encode(thumbnail).decode("utf-8")
 
         except Exception as e:
             print(f"Error processing image {image_path}: {str(e)}")
@@ -100,155 +133,156 @@ class ReportGenerator:
                 print(f"Error loading default image: {str(e)}")
                 return None
 
-    def _html_to_pdf(self, html_content, output_path):
-        """Convert HTML to PDF"""
-        with open(output_path, "w+b") as result_file:
-            pisa_status = pisa.CreatePDF(html_content, dest=result_file)
-        return pisa_status.err
+    def _assets(self):
+        if self.assets is None:
+            self.assets = default_resolver()
+        return self.assets
+
+    def _html_to_pdf_bytes(self, html_content):
+        """
+        Convert HTML to PDF and return the document bytes.
+
+        Raises:
+            RuntimeError: If xhtml2pdf reports errors, so a broken or empty
+                document is never cached, served or added to a cohort ZIP.
+        """
+        buffer = BytesIO()
+        with metrics.stage('pdf'):
+            pisa_status = pisa.CreatePDF(html_content, dest=buffer)
+        if pisa_status.err:
+            raise RuntimeError(f"PDF conversion failed with {pisa_status.err} xhtml2pdf errors.")
+        metrics.BYTES_PRODUCED.labels(kind='pdf').inc(buffer.tell())
+        return buffer.getvalue()
+
+    def _render(self, task, *args):
+        """
+        Run a render_* method in the renderer pool, or in this process when there is none.
+
+        Returns:
+            bytes: The rendered PDF document.
+        """
+        # Covers the stages below plus waiting for the lock or a pool worker
+        with metrics.stage('render'):
+            # A profiled request renders here, where its profiler can see the render
+            if self.renderer is not None and not profiling.active():
+                return self.renderer.render(task, *args)
+
+            with _RENDER_LOCK:
+                return getattr(self, task)(*args)
+
+    def _write_pdf(self, pdf_bytes, pdf_path):
+        os.makedirs(os.path.dirname(pdf_path) or '.', exist_ok=True)
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+        return pdf_path
 
-    def _create_student_achievements_plots(self, grades_df: pd.DataFrame):
+    def _template_hash(self, template_name):
+        """Hash of a template's source (including its inline CSS), RENDER_REVISION and the chart settings"""
+        if template_name not in self._template_hashes:
+            source, _, _ = self.template_env.loader.get_source(self.template_env, template_name)
+            digest = hashlib.sha256(
+                f'{RENDER_REVISION}\n{charts.settings_key()}\n{source}'.encode('utf-8')
+            ).hexdigest()
+            self._template_hashes[template_name] = digest
+        return self._template_hashes[template_name]
+
+    def _cached_pdf(self, report_type, params, data_version, template_name, build, pdf_path):
         """
-        Generates a figure with multiple plots to visualize student achievements.
-        Parameters:
-        -----------
-        grades_df : pd.DataFrame
-            DataFrame containing student grades with columns 'SubjectName', 'StudentMarks', 'MaxMarks', and 'ExamDate'.
+        Write a report to pdf_path from the cache, or build and cache it on a miss.
+
+        A profiled request always builds, so its profile shows the work a miss does.
+
+        Args:
+            report_type (str): Report name used in the cache key.
+            params (dict): Report parameters used in the cache key.
+            data_version (str): Version of the data the report is built from,
+                read before the data itself so a concurrent import can only
+                make the cached PDF newer than its key, never older.
+            template_name (str): Template whose hash is part of the key.
+            build (callable): Returns the PDF bytes on a miss.
+            pdf_path (str): Where to write the report.
+
         Returns:
-        --------
-        fig : matplotlib.figure.Figure
-            The generated figure containing the following subplots:
-            - Bar chart comparing obtained and maximum marks by subject.
-            - Line plot showing performance trend over time.
-            - Radar chart displaying average marks distribution across subjects.
-            - Pie chart representing overall achievement percentage.
-        """
-        fig = plt.figure(figsize=(15, 10))
-
-        # Plot 1: Bar Chart
-        ax1 = plt.subplot(221)
-        subjects = sorted(grades_df["SubjectName"].unique())
-        x = np.arange(len(subjects))
-        width = 0.35
-        ax1.bar(x - width/2, grades_df.groupby('SubjectName')['StudentMarks'].mean(), width, label='Obtained')
-        ax1.bar(x + width/2, grades_df.groupby('SubjectName')['MaxMarks'].mean(), width, label='Maximum')
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(subjects, rotation=45)
-        ax1.set_title('Grades by Subject')
-        ax1.legend()
-
-        # Plot 2: Performance Trend
-        ax2 = plt.subplot(222)
-        grades_df['ExamDate'] = pd.to_datetime(grades_df['ExamDate'])
-        grades_df.sort_values('ExamDate', inplace=True)
-        ax2.plot(grades_df['ExamDate'], grades_df['StudentMarks']/grades_df['MaxMarks']*100, marker='o')
-        ax2.set_title('Grade Performance Trend')
-        ax2.set_ylabel('Achievement (%)')
-        plt.xticks(rotation=45)
-
-        # Plot 3: Radar Chart
-        ax3 = plt.subplot(223, projection='polar')
-        avg_marks = grades_df.groupby('SubjectName')['StudentMarks'].mean()
-        angles = np.linspace(0, 2*np.pi, len(subjects), endpoint=False)
-        values = avg_marks.values
-        values = np.concatenate((values, [values[0]]))
-        angles = np.concatenate((angles, [angles[0]]))
-        ax3.plot(angles, values)
-        ax3.fill(angles, values, alpha=0.25)
-        ax3.set_xticks(angles[:-1])
-        ax3.set_xticklabels(subjects)
-        ax3.set_title('Subject Performance Distribution', pad=40)
-
-        # Plot 4: Achievement Percentage
-        ax4 = plt.subplot(224)
-        achievement = (grades_df['StudentMarks']/grades_df['MaxMarks']*100).mean()
-        colors = ['#ff9999' if achievement < 60 else '#66b3ff' if achievement < 80 else '#99ff99']
-        ax4.pie([achievement, 100-achievement], colors=colors + ['#f0f0f0'],
-                labels=[f'{achievement:.1f}%', ''], startangle=90)
-        ax4.set_title('Overall Exam Achievement')
-
-        plt.tight_layout()
-        return fig
-
-    def _generate_performance_trend_plot(self, ax2, all_grades_df):
-        """
-        Generate an enhanced performance trend plot with improved readability and styling.
-
-        Parameters:
-        ax2 (matplotlib.axes.Axes): The subplot axis to plot on
-        all_grades_df (pd.DataFrame): DataFrame containing grade data with ExamDate column
-        """
-        all_grades_df['ExamDate'] = pd.to_datetime(all_grades_df['ExamDate'])
-
-        monthly_avg = all_grades_df.groupby(all_grades_df['ExamDate'].dt.strftime('%Y-%m'))['percentage'].agg(['mean', 'std']).reset_index()
-        monthly_avg.columns = ['date', 'mean', 'std']
-
-        monthly_avg['date'] = pd.to_datetime(monthly_avg['date'] + '-01')
-        monthly_avg = monthly_avg.sort_values('date')
-
-        ax2.fill_between(range(len(monthly_avg)),
-                        monthly_avg['mean'] - monthly_avg['std'],
-                        monthly_avg['mean'] + monthly_avg['std'],
-                        alpha=0.2, color='#1f77b4',
-                        label='±1 Standard Deviation')
-
-        ax2.set_xticks(range(len(monthly_avg)))
-        date_labels = monthly_avg["date"].dt.strftime("%b\n%Y")
-        ax2.set_xticklabels(date_labels, fontsize=8)
-
-        ax2.grid(True, linestyle='--', alpha=0.7)
-
-        ax2.set_ylabel('Average Percentage', fontsize=10)
-        ax2.set_ylim(0, 100)
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'{int(x)}%'))
-
-        ax2.set_title('Average Performance Trend Over Time', 
-                    fontsize=12, pad=15, fontweight='bold')
-
-        ax2.legend(loc='upper right', fontsize=8)
-
-        for i, value in enumerate(monthly_avg['mean']):
-            ax2.annotate(f'{value:.1f}%', 
-                        (i, value),
-                        textcoords="offset points",
-                        xytext=(0,10),
-                        ha='center',
-                        fontsize=8)
-
-        ax2.margins(x=0.05)
-
-        return ax2
+            str: pdf_path.
+        """
+        if self.cache is None or profiling.active():
+            return self._write_pdf(build(), pdf_path)
+
+        # The report date is printed on the PDF, so yesterday's render is not reused today
+        key = self.cache.key(
+            report_type,
+            {**params, 'report_date': datetime.now().strftime("%Y-%m-%d")},
+            data_version,
+            self._template_hash(template_name),
+        )
+        cached_path = self.cache.lookup(key)
+        if cached_path is not None:
+            try:
+                os.makedirs(os.path.dirname(pdf_path) or '.', exist_ok=True)
+                shutil.copyfile(cached_path, pdf_path)
+                return pdf_path
+            except FileNotFoundError:
+                pass  # Evicted between lookup and copy
+
+        pdf_bytes = build()
+        self.cache.put(key, pdf_bytes)
+        return self._write_pdf(pdf_bytes, pdf_path)
 
     # Generate Reports - 2 reports
-    def generate_student_profile_report(self, student_id):
+    def generate_student_profile_report(self, student_id, output_path=None):
         """
         Generate a comprehensive student profile report.
         This method retrieves student details, performance data, and university details
         to generate a student profile report in PDF format.
         Args:
             student_id (int): The unique identifier of the student.
+            output_path (str): Where to write the PDF, defaults to reports/student_<id>_profile.pdf.
         Returns:
             str: The file path to the generated PDF report.
         """
+        data_version = self.db_manager.get_data_version(student_id) if self.cache is not None else None
 
-        # Get student details
-        student_details: pd.Series = self.db_manager.get_student_data_by_id(student_id)
+        def build():
+            with metrics.stage('data'):
+                grades_df, metadata = self._student_profile_data(student_id)
+            return self._render('render_student_profile', grades_df, metadata)
 
-        # Get subjects taken by students
-        student_subjects: List = self.db_manager.get_subjects_per_student(student_id).to_dict("records")
+        return self._cached_pdf(
+            'student-profile', {'student_id': int(student_id)}, data_version, STUDENT_PROFILE_TEMPLATE,
+            build, output_path or f'reports/student_{student_id}_profile.pdf',
+        )
 
-        # Generate visualizations in the form of base64 encoded images
-        grades_df: pd.DataFrame = self.db_manager.get_grades_per_student(student_id)
-        general_achievements_base_64 = self._save_plot_to_base64(plt=self._create_student_achievements_plots(grades_df))
+    def _student_profile_data(self, student_id):
+        """
+        Collect everything a student profile report needs from the database.
+
+        Returns:
+            tuple: (grades DataFrame for the charts, template metadata without charts)
+        """
+        # Get student details, subjects, grades and university in one snapshot
+        bundle = self.db_manager.get_student_report_bundle(student_id)
+        metadata = self._student_profile_metadata(
+            student_id, bundle["student"], bundle["university"], bundle["subjects"]
+        )
+
+        return bundle["grades"].copy(), metadata
+
+    def _student_profile_metadata(self, student_id, student_details: pd.Series,
+                                  university_details: pd.Series, subjects_df: pd.DataFrame):
+        """
+        Build the student profile template context, without charts.
 
-        # Get university details for branding
-        university_details: pd.Series = self.db_manager.get_university_per_student(student_id)
+        Returns:
+            dict: Template metadata for render_student_profile.
+        """
+        student_subjects: List = subjects_df.to_dict("records")
 
-        metadata = {
+        return {
             "report_date": datetime.now().strftime("%Y-%m-%d"),
             "academic_year": student_details.AcademicYear,
-            "general_achievements": f"data:image/png;base64,{general_achievements_base_64}",
             "university": {
-                "logo_url": university_details.LogoURL,
+                # Embedded as a data URI so rendering never touches the network
+                "logo_url": self._assets().data_uri(university_details.LogoURL),
                 "name": university_details.UniversityName,
             },
             "student": {
@@ -261,143 +295,247 @@ class ReportGenerator:
             },
         }
 
+    def render_student_profile(self, grades_df, metadata):
+        """
+        Render a student profile report from pre-fetched data.
+
+        Does not touch the database, so it can run in a renderer pool worker.
+
+        Args:
+            grades_df (pd.DataFrame): Grades with SubjectName, StudentMarks, MaxMarks and ExamDate.
+            metadata (dict): Template context from _student_profile_data.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        # Generate visualizations in the form of base64 encoded images
+        general_achievements = charts.render_data_uri(charts.student_achievements, grades_df)
+
         # Render template
-        template = self.template_env.get_template('student_individual_report.html')
-        html_out = template.render(
-            **metadata
-        )
+        template = self.template_env.get_template(STUDENT_PROFILE_TEMPLATE)
+        with metrics.stage('template'):
+            html_out = template.render(
+                **metadata,
+                general_achievements=general_achievements,
+            )
 
-        # Generate PDF
-        pdf_path = f'reports/student_{student_id}_profile.pdf'
-        os.makedirs('reports', exist_ok=True)
-        self._html_to_pdf(html_out, pdf_path)
+        return self._html_to_pdf_bytes(html_out)
 
-        return pdf_path
+    # Cohort reports
+    def iter_cohort_reports(self, university_id=None, academic_year=None, student_ids=None):
+        """
+        Render the student profile reports of a whole cohort.
+
+        The cohort is loaded with one query per table before this returns, so
+        a bad filter fails immediately. Rendering happens as the returned
+        iterator is consumed, spread over the renderer pool when there is one,
+        and reports are yielded in completion order.
+
+        Args:
+            university_id (int): Only students of this university.
+            academic_year (int): Only students in this academic year.
+            student_ids (list[int]): Only these students.
+
+        Returns:
+            Iterator[tuple]: (student_id, PDF bytes, None) per rendered report,
+            or (student_id, None, error message) when a report failed.
+
+        Raises:
+            ValueError: If no filter is given.
+            LookupError: If no student matches the filters.
+        """
+        with metrics.stage('data'):
+            cohort = self.db_manager.get_cohort_report_data(university_id, academic_year, student_ids)
+        if cohort["students"].empty:
+            raise LookupError("No students match the requested cohort.")
+
+        return self._render_cohort(cohort)
+
+    def stream_cohort_zip(self, university_id=None, academic_year=None, student_ids=None):
+        """
+        Render a cohort's student profile reports into a ZIP archive, chunk by chunk.
+
+        Each PDF is written to the archive as soon as it is rendered and the
+        archive is never held in memory as a whole. Reports that fail are
+        listed in an errors.txt entry instead of aborting the run.
+
+        Args:
+            university_id, academic_year, student_ids: See iter_cohort_reports.
+
+        Returns:
+            Iterator[bytes]: Consecutive chunks of the ZIP archive.
+        """
+        return self._zip_reports(self.iter_cohort_reports(university_id, academic_year, student_ids))
+
+    def generate_cohort_reports(self, university_id=None, academic_year=None, student_ids=None, output_path=None):
+        """
+        Generate the student profile reports of a cohort as one ZIP file.
+
+        Args:
+            university_id, academic_year, student_ids: See iter_cohort_reports.
+            output_path (str): Where to write the ZIP, defaults to reports/cohort_profiles.zip.
+
+        Returns:
+            str: The file path to the generated ZIP archive.
+        """
+        output_path = output_path or 'reports/cohort_profiles.zip'
+        chunks = self.stream_cohort_zip(university_id, academic_year, student_ids)
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        with open(output_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return output_path
+
+    def _cohort_profile_data(self, cohort):
+        """
+        Yield (student_id, grades DataFrame, template metadata, error) for every student of a cohort.
+
+        A student whose data cannot be prepared, e.g. one without a known
+        university, gets an error message instead of grades and metadata.
+        """
+        grades = cohort["grades"]
+        universities = cohort["universities"]
+
+        for _, student_details in cohort["students"].iterrows():
+            student_id = int(student_details.StudentID)
+            try:
+                if pd.isna(student_details.UniversityID):
+                    raise LookupError("No university recorded.")
+                if student_details.UniversityID not in universities.index:
+                    raise LookupError(f"University {int(student_details.UniversityID)} not found.")
+                metadata = self._student_profile_metadata(
+                    student_id,
+                    student_details,
+                    universities.loc[student_details.UniversityID],
+                    grades.student_subjects(student_id),
+                )
+                yield student_id, grades.student_grades(student_id), metadata, None
+            except Exception as e:
+                yield student_id, None, None, str(e)
+
+    def _render_cohort(self, cohort):
+        tasks = self._cohort_profile_data(cohort)
+
+        if self.renderer is None:
+            for student_id, grades_df, metadata, error in tasks:
+                if error is not None:
+                    yield student_id, None, error
+                    continue
+                try:
+                    yield student_id, self._render('render_student_profile', grades_df, metadata), None
+                except Exception as e:
+                    yield student_id, None, str(e)
+            return
+
+        # Bound the reports in flight so memory stays flat however large the cohort is
+        max_pending = 2 * self.renderer.workers
+        pending = {}
+        try:
+            for student_id, grades_df, metadata, error in tasks:
+                if error is not None:
+                    yield student_id, None, error
+                    continue
+                pending[self.renderer.submit('render_student_profile', grades_df, metadata)] = student_id
+                if len(pending) >= max_pending:
+                    yield from self._completed_reports(pending)
+            while pending:
+                yield from self._completed_reports(pending)
+        finally:
+            # The consumer went away early, e.g. the client disconnected
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _completed_reports(pending):
+        """Wait for at least one pending render and yield the finished ones"""
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            student_id = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                yield student_id, future.result(), None
+            else:
+                yield student_id, None, str(error)
+
+    @staticmethod
+    def _zip_reports(reports):
+        sink = _ZipChunkSink()
+        failures = []
+
+        # PDFs are already compressed, deflating them again only costs CPU
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            for student_id, pdf_bytes, error in reports:
+                if error is None:
+                    archive.writestr(f'student_{student_id}_profile.pdf', pdf_bytes)
+                else:
+                    failures.append(f'student {student_id}: {error}')
+                yield sink.drain()
+
+            if failures:
+                archive.writestr('errors.txt', '\n'.join(failures) + '\n')
+        yield sink.drain()
 
-    def generate_academic_performance_report(self):
+    def generate_academic_performance_report(self, output_path=None):
         """
         Generate a comprehensive academic performance report across all students.
-        
+
+        Args:
+            output_path (str): Where to write the PDF, defaults to reports/academic_performance_report.pdf.
+
         Returns:
             str: The file path to the generated PDF report.
         """
-        # Get overall academic statistics
-        all_grades_df: pd.DataFrame = self.db_manager.get_all_grades()
-        all_students_df: pd.DataFrame = self.db_manager.get_all_students()
+        data_version = self.db_manager.get_data_version() if self.cache is not None else None
 
-        # Create performance visualizations
-        fig = plt.figure(figsize=(15, 10))
-
-        # Calculate percentages correctly for each exam
-        all_grades_df['percentage'] = (all_grades_df['StudentMarks'] / all_grades_df['MaxMarks'] * 100)
-
-        print(all_grades_df)
-
-        # Plot 1: Improved Overall Grade Distribution
-        ax1 = plt.subplot(221)
-        # Define grade ranges and labels
-        grade_ranges = [(0, 49), (50, 59), (60, 69), (70, 79), (80, 89), (90, 100)]
-        grade_labels = [
-            "F (0 - 49)",
-            "E (50 - 59)",
-            "D (60 - 69)",
-            "C (70 - 79)",
-            "B (80 - 89)",
-            "A (90 - 100)",
-        ]
-
-        # Calculate frequencies for each grade range
-        grade_counts = []
-        for low, high in grade_ranges:
-            count = len(all_grades_df[(all_grades_df['percentage'] >= low) & 
-                                    (all_grades_df['percentage'] < high)])
-            grade_counts.append(count)
-
-        # Create bar plot with improved styling
-        colors = [
-            "red" if (low == 0 and high == 49) else "skyblue"
-            for low, high in grade_ranges
-        ]
-        bars = ax1.bar(grade_labels, grade_counts, color=colors, edgecolor="black")
-        ax1.set_title('Grade Distribution', fontsize=12, pad=15)
-        ax1.set_xlabel('Grade Ranges', fontsize=10)
-        ax1.set_ylabel('Number of Students', fontsize=10)
-
-        # Add value labels on top of each bar
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom')
-
-        # Rotate x-labels for better readability
-        plt.setp(ax1.get_xticklabels(), rotation=45, ha='right')
-
-        # Plot 2: Performance Trend Over Time
-        ax2 = plt.subplot(222)
-        ax2 = self._generate_performance_trend_plot(ax2, all_grades_df)
-
-        # Plot 3: Subject-wise Performance
-        ax3 = plt.subplot(223)
-        subject_avg = all_grades_df.groupby('SubjectName')['percentage'].mean()
-        subject_avg.plot(kind='bar', ax=ax3)
-        ax3.set_title('Subject-wise Average Performance')
-        ax3.set_xticklabels(subject_avg.index, rotation=45)
-        ax3.set_ylabel('Average Percentage')
-
-        # Plot 4: Department-wise Performance
-        ax4 = plt.subplot(224)
-        dept_avg = all_grades_df.groupby('Department')['percentage'].mean()
-        dept_avg.plot(kind='pie', ax=ax4, autopct='%1.1f%%')
-        ax4.set_title('Department-wise Performance Distribution')
-
-        plt.tight_layout()
-        performance_plots_base64 = self._save_plot_to_base64(plt)
-        plt.close()
-
-        # Calculate summary statistics
-        total_students = len(all_students_df)
-        avg_performance = all_grades_df['percentage'].mean()
-
-        # passing students >=45
-        passing_students = (
-            all_grades_df.groupby("StudentID")["percentage"]
-            .apply(lambda mark: all(mark >= 50))
-            .reset_index()
-        )
-        passing_students_len = len(
-            passing_students[passing_students["percentage"] == True]
+        def build():
+            with metrics.stage('data'):
+                chart_data, template_data = self._academic_performance_data()
+            return self._render('render_academic_performance', chart_data, template_data)
+
+        return self._cached_pdf(
+            'academic-performance', {}, data_version, ACADEMIC_PERFORMANCE_TEMPLATE,
+            build, output_path or 'reports/academic_performance_report.pdf',
         )
 
-        # the number of students got >=90
-        top_performers = (
-            all_grades_df.groupby("StudentID")["percentage"]
-            .apply(lambda mark: all(mark >= 90))
-            .reset_index()
+    def _academic_performance_data(self):
+        """
+        Collect and aggregate everything an academic performance report needs.
+
+        Returns:
+            tuple: (chart aggregates, template data without charts)
+        """
+        stats = self.db_manager.get_academic_statistics(
+            [low for low, _ in GRADE_RANGES[1:]], pass_mark=PASS_MARK, top_mark=TOP_MARK, top_n=3,
         )
-        top_performers_len = len(top_performers[top_performers["percentage"] == True])
+        subject_avg = stats["subject_avg"]
+        dept_avg = stats["dept_avg"]
+
+        chart_data = {
+            "grade_counts": stats["grade_bands"],
+            "monthly_avg": stats["monthly_avg"],
+            "subject_avg": subject_avg,
+            "dept_avg": dept_avg,
+        }
 
-        # Get top 3 performing students
-        student_avg = all_grades_df.groupby('StudentID')['percentage'].mean().reset_index()
-        top_3_ids = student_avg.nlargest(3, 'percentage')['StudentID'].tolist()
+        total_students = stats["total_students"]
+        avg_performance = stats["average_performance"]
+        passing_students_len = stats["passing_students"]
+        top_performers_len = stats["top_performers"]
 
         top_3_students = []
-        for student_id in top_3_ids:
-            student_data = all_students_df[all_students_df['StudentID'] == student_id].iloc[0]
-            student_grades = all_grades_df[all_grades_df['StudentID'] == student_id]
-            avg_percentage = student_grades['percentage'].mean()
-
+        for student in stats["top_students"].itertuples(index=False):
             # Get and process student image
             image_base64 = self._get_image_as_base64(
-                student_data["ImageURL"],
+                student.ImageURL,
                 default_image_path="static/default_student.png",
             )
 
             top_3_students.append({
-                'name': f"{student_data['FirstName']} {student_data['LastName']}",
-                'average': f"{avg_percentage:.1f}%",
-                'subjects': len(student_grades['SubjectName'].unique()),
-                'top_subject': student_grades.loc[student_grades['percentage'].idxmax()]['SubjectName'],
+                'name': f"{student.FirstName} {student.LastName}",
+                'average': f"{student.average:.1f}%",
+                'subjects': int(student.subjects),
+                'top_subject': student.top_subject,
                 'image': image_base64  # Add the base64 encoded image
             })
 
@@ -408,9 +546,9 @@ class ReportGenerator:
         template_data = {
             "report_date": datetime.now().strftime("%Y-%m-%d"),
             "academic_year": "2025",
-            "performance_data": f"data:image/png;base64,{performance_plots_base64}",
             "university": {
-                "logo_url": university_details.LogoURL,
+                # Embedded as a data URI so rendering never touches the network
+                "logo_url": self._assets().data_uri(university_details.LogoURL),
                 "name": university_details.UniversityName,
             },
             "statistics": {
@@ -436,13 +574,32 @@ class ReportGenerator:
             },
         }
 
-        # Render template
-        template = self.template_env.get_template('academic_performance_report.html')
-        html_out = template.render(**template_data)
+        return chart_data, template_data
+
+    def render_academic_performance(self, chart_data, template_data):
+        """
+        Render an academic performance report from pre-computed aggregates.
 
-        # Generate PDF
-        pdf_path = 'reports/academic_performance_report.pdf'
-        os.makedirs("reports", exist_ok=True)
-        self._html_to_pdf(html_out, pdf_path)
+        Does not touch the database, so it can run in a renderer pool worker.
 
-        return pdf_path
+        Args:
+            chart_data (dict): Aggregates from _academic_performance_data.
+            template_data (dict): Template context from _academic_performance_data.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        # Create performance visualizations
+        performance_plots = charts.render_data_uri(
+            charts.academic_performance, chart_data, GRADE_LABELS, GRADE_LABELS[0]
+        )
+
+        # Render template
+        template = self.template_env.get_template(ACADEMIC_PERFORMANCE_TEMPLATE)
+        with metrics.stage('template'):
+            html_out = template.render(
+                **template_data,
+                performance_data=performance_plots,
+            )
+
+        return self._html_to_pdf_bytes(html_out)
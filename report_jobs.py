@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+class ReportJob:
+    """State of one background report rendering"""
+
+    def __init__(self, report_type, params, output_path):
+        self.id = uuid.uuid4().hex
+        self.report_type = report_type
+        self.params = params
+        self.output_path = output_path
+        self.status = 'queued'
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'report_type': self.report_type,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ReportJobManager:
+    """
+    Render reports in background threads with bounded concurrency.
+
+    Jobs run on a fixed-size thread pool, so heavy reports never block the
+    event loop and at most `workers` reports render at once; the rest wait
+    in the queue. Finished jobs and their PDFs are kept for `ttl_seconds`
+    and purged lazily on the next submit or lookup.
+    """
+
+    def __init__(self, report_generator, workers=None, ttl_seconds=None, output_dir=None):
+        self.report_generator = report_generator
+        self.ttl_seconds = config.REPORT_JOB_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.output_dir = output_dir or config.REPORT_JOB_DIR
+        self.report_types = {
+            'student-profile': report_generator.generate_student_profile_report,
+            'academic-performance': report_generator.generate_academic_performance_report,
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or config.REPORT_JOB_WORKERS, thread_name_prefix='report-job'
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, report_type, **params):
+        """
+        Queue a report for rendering.
+
+        Args:
+            report_type (str): One of the keys of report_types.
+            **params: Keyword arguments for the report generator method.
+
+        Returns:
+            ReportJob: The queued job.
+
+        Raises:
+            ValueError: If the report type is unknown.
+        """
+        if report_type not in self.report_types:
+            raise ValueError(f'Unknown report type {report_type!r}, expected one of {", ".join(self.report_types)}.')
+
+        self.purge_expired()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        job = ReportJob(report_type, params, output_path=None)
+        job.output_path = os.path.join(self.output_dir, f'{job.id}.pdf')
+        with self._lock:
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """Return the job with the given id, or None if it is unknown or expired"""
+        self.purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purge_expired(self):
+        """Forget finished jobs older than the TTL and delete their PDFs"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+
+        for job in expired:
+            if os.path.exists(job.output_path):
+                os.remove(job.output_path)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            self.report_types[job.report_type](**job.params, output_path=job.output_path)
+            job.status = 'succeeded'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
@@ -0,0 +1,149 @@
+"""
+Declared schema for the academic database.
+
+Tables seeded from assets/*.csv are created from these definitions instead
+of being inferred from the CSV, so primary keys, column affinities and the
+indexes used by the report joins survive every reload.
+"""
+
+# Bump whenever TABLE_SCHEMAS, INDEXES or SUMMARY_TABLES_SQL change, and add a
+# DatabaseManager._migrate_to_<version> step if existing databases need upgrading
+SCHEMA_VERSION = 3
+
+# Column definitions per table, in CSV column order
+TABLE_SCHEMAS = {
+    'Universities': [
+        ('UniversityID', 'INTEGER PRIMARY KEY'),
+        ('UniversityName', 'TEXT'),
+        ('LogoURL', 'TEXT'),
+        ('Address', 'TEXT'),
+        ('ContactDetails', 'TEXT'),
+    ],
+    'Subjects': [
+        ('SubjectID', 'INTEGER PRIMARY KEY'),
+        ('SubjectName', 'TEXT'),
+        ('Department', 'TEXT'),
+    ],
+    'Students': [
+        ('StudentID', 'INTEGER PRIMARY KEY'),
+        ('FirstName', 'TEXT'),
+        ('LastName', 'TEXT'),
+        ('AcademicYear', 'INTEGER'),
+        ('DateOfBirth', 'DATE'),
+        ('Email', 'TEXT'),
+        ('ImageURL', 'TEXT'),
+        ('UniversityID', 'INTEGER REFERENCES Universities(UniversityID)'),
+    ],
+    'Exams': [
+        ('ExamID', 'INTEGER PRIMARY KEY'),
+        ('SubjectID', 'INTEGER REFERENCES Subjects(SubjectID)'),
+        ('ExamName', 'TEXT'),
+        ('ExamDate', 'DATE'),
+        ('MaximumMarks', 'INTEGER'),
+    ],
+    'Grades': [
+        ('GradeID', 'INTEGER PRIMARY KEY'),
+        ('StudentID', 'INTEGER REFERENCES Students(StudentID)'),
+        ('ExamID', 'INTEGER REFERENCES Exams(ExamID)'),
+        ('MarksObtained', 'INTEGER'),
+    ],
+}
+
+# Index name -> (table, columns)
+INDEXES = {
+    'idx_grades_student': ('Grades', ('StudentID',)),
+    'idx_grades_exam': ('Grades', ('ExamID',)),
+    'idx_exams_subject': ('Exams', ('SubjectID',)),
+    'idx_exams_date': ('Exams', ('ExamDate',)),
+    'idx_students_university': ('Students', ('UniversityID',)),
+    # Name lookups used to resolve Grades imports keyed by student and exam names
+    'idx_students_name': ('Students', ('LastName', 'FirstName')),
+    'idx_exams_name': ('Exams', ('ExamName',)),
+}
+
+# Fingerprints of the seeded CSV files, used to skip unchanged reloads
+LOAD_MANIFEST_SQL = """
+CREATE TABLE IF NOT EXISTS LoadManifest (
+    FileName TEXT PRIMARY KEY,
+    TableName TEXT,
+    Sha256 TEXT,
+    MTimeNs INTEGER,
+    Size INTEGER,
+    LoadedAt TEXT
+)
+"""
+
+# Monotonic counters bumped by every data load, used to invalidate cached reports:
+#   'all'          - any change at all
+#   'students'     - a change that may touch every student (seeding, replace imports)
+#   'student:<id>' - a change attributed to one student by an upsert
+DATA_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS DataVersions (
+    Scope TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL
+)
+"""
+
+# Aggregates of grade percentages behind the academic performance report, kept
+# current by every import so the report never scans Grades:
+#   StudentSummary      - count, sum, min and max per student, the number of distinct
+#                         subject names and the subject of the best grade
+#   SubjectMonthSummary - count, sum and sum of squares per subject and exam month
+#                         ('' for exams without a date); subjects, departments
+#                         and months are all rolled up from it
+#   GradeHistogram      - grade count per whole percentage (truncated)
+SUMMARY_TABLES_SQL = {
+    'StudentSummary': """
+        CREATE TABLE IF NOT EXISTS StudentSummary (
+            StudentID INTEGER PRIMARY KEY,
+            Grades INTEGER NOT NULL,
+            Total REAL NOT NULL,
+            Lowest REAL NOT NULL,
+            Highest REAL NOT NULL,
+            Subjects INTEGER NOT NULL,
+            BestSubjectID INTEGER
+        )
+    """,
+    'SubjectMonthSummary': """
+        CREATE TABLE IF NOT EXISTS SubjectMonthSummary (
+            SubjectID INTEGER NOT NULL,
+            Month TEXT NOT NULL,
+            Grades INTEGER NOT NULL,
+            Total REAL NOT NULL,
+            Squares REAL NOT NULL,
+            PRIMARY KEY (SubjectID, Month)
+        ) WITHOUT ROWID
+    """,
+    'GradeHistogram': """
+        CREATE TABLE IF NOT EXISTS GradeHistogram (
+            Bucket INTEGER PRIMARY KEY,
+            Grades INTEGER NOT NULL
+        )
+    """,
+}
+
+
+def create_table_sql(table_name):
+    """Return the CREATE TABLE statement for a declared table."""
+    columns = ', '.join(f'{name} {definition}' for name, definition in TABLE_SCHEMAS[table_name])
+    return f'CREATE TABLE IF NOT EXISTS {table_name} ({columns})'
+
+
+def create_index_sql(index_name):
+    """Return the CREATE INDEX statement for a declared index."""
+    table_name, columns = INDEXES[index_name]
+    return f'CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({", ".join(columns)})'
+
+
+def column_names(table_name):
+    """Return the declared column names of a table."""
+    return [name for name, _ in TABLE_SCHEMAS[table_name]]
+
+
+def indexed_columns(table_name):
+    """Return the columns of a declared table that lead an index: its primary key and every index's first column."""
+    columns = [name for name, definition in TABLE_SCHEMAS[table_name] if 'PRIMARY KEY' in definition]
+    for index_table, index_columns in INDEXES.values():
+        if index_table == table_name and index_columns[0] not in columns:
+            columns.append(index_columns[0])
+    return columns
@@ -85,8 +85,12 @@ function getTableView(tableName, id) {
 }
 
 function fetchTableData(api_endpoint) {
+    let nextCursor = null;
     fetch(api_endpoint)
-        .then(response => response.json())
+        .then(response => {
+            nextCursor = response.headers.get('X-Next-Cursor');
+            return response.json();
+        })
         .then(data => {
             const tableContent = document.getElementById('tableContent');
             const tableContainer = document.getElementById('tableContainer');
@@ -154,6 +158,17 @@ function fetchTableData(api_endpoint) {
             
             tableContent.appendChild(table);
 
+            // Pages are keyset-paginated; the next one starts after the last key shown
+            if (nextCursor) {
+                const nextUrl = new URL(api_endpoint, window.location.origin);
+                nextUrl.searchParams.set('after', nextCursor);
+                const nextButton = document.createElement('button');
+                nextButton.className = 'mt-4 text-blue-500 hover:underline';
+                nextButton.textContent = 'Next page';
+                nextButton.onclick = () => fetchTableData(nextUrl.pathname + nextUrl.search);
+                tableContent.appendChild(nextButton);
+            }
+
             // Load images after table is created
             loadImages();
         })
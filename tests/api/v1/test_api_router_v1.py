@@ -1,8 +1,15 @@
 from fastapi.testclient import TestClient
 from main import app
+import gzip
+import io
+import json
 import os
+import time
+import zipfile
 import pytest
 
+from api.v1.router_v1 import db_manager
+
 CLIENT = TestClient(app)
 STUDENT_ID = 17915
 TABLE_PARAMS = [
@@ -14,6 +21,11 @@ TABLE_PARAMS = [
     ("grades", 4, "GradeID"),
 ]
 
+@pytest.fixture(scope="module", autouse=True)
+def seeded_database():
+    """The service does not seed on startup; seed the way `python -m database seed` does"""
+    db_manager.seed()
+
 def test_api_health_check():
     """
     Test the API health check endpoint.
@@ -26,6 +38,42 @@ def test_api_health_check():
     response = CLIENT.get("/health")
     assert response.status_code == 200
 
+def test_metrics_endpoint_reports_pipeline_stages():
+    CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}")
+    response = CLIENT.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'ars_http_requests_total{method="GET",route="/api/v1/reports/student-profile/{student_id}",status="200"}' \
+        in response.text
+    assert 'ars_db_call_seconds_count{method="get_data_version"}' in response.text
+    # A cached report skips rendering, but either way the report cache was consulted
+    assert 'ars_cache_requests_total{cache="report"' in response.text
+
+def test_profiled_report_request(tmp_path, monkeypatch):
+    import config
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+
+    # Without ARS_PROFILING the parameter is ignored
+    response = CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}?profile=cprofile")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+    monkeypatch.setattr(config, "PROFILING", 1)
+    response = CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}", headers={"X-Profile": "sample"})
+    assert response.status_code == 200
+    profile = CLIENT.get(f"/api/v1/profiles/{response.headers['x-profile-id']}")
+    assert profile.status_code == 200
+    assert "get_student_report_bundle" in profile.text
+    assert "render_student_profile" in profile.text
+
+    response = CLIENT.get("/api/v1/reports/academic-performance?profile=cprofile")
+    assert response.status_code == 200
+    assert os.path.exists(tmp_path / f"{response.headers['x-profile-id']}.pstats")
+
+    assert CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}?profile=perf").status_code == 422
+    assert CLIENT.get("/api/v1/profiles/unknown").status_code == 404
+
 def test_api_connection():
     """
     Test the API connection to the student profile endpoint.
@@ -95,3 +143,126 @@ def test_table_data(table, expected_columns_count, primary_key):
     # The table should have at least one grade and 4 columns
     assert len(data) > 0
     assert len(data[0]) == 4
+
+def test_table_pages_follow_the_cursor():
+    """Walking X-Next-Cursor visits every grade exactly once, in key order"""
+    first = CLIENT.get("/api/v1/table/Grades", params={"limit": 20, "total": "true"})
+    assert first.status_code == 200
+    total = int(first.headers["x-total-count"])
+
+    grade_ids = [row["GradeID"] for row in first.json()]
+    response = first
+    while "x-next-cursor" in response.headers:
+        assert 'rel="next"' in response.headers["link"]
+        response = CLIENT.get("/api/v1/table/grades", params={"limit": 20, "after": response.headers["x-next-cursor"]})
+        grade_ids += [row["GradeID"] for row in response.json()]
+
+    assert grade_ids == sorted(set(grade_ids))
+    assert len(grade_ids) == total
+
+def test_table_projection_and_filters():
+    response = CLIENT.get("/api/v1/table/grades", params={
+        "columns": "MarksObtained", "filter": [f"StudentID:eq:{STUDENT_ID}", "GradeID:gt:1"],
+    })
+    rows = response.json()
+
+    assert response.status_code == 200
+    assert rows and all(set(row) == {"GradeID", "MarksObtained"} for row in rows)
+    assert all(row["GradeID"] > 1 for row in rows)
+
+def test_table_rejects_unknown_tables_and_filters():
+    assert CLIENT.get("/api/v1/table/sqlite_master").status_code == 404
+    assert CLIENT.get("/api/v1/table/grades", params={"filter": "MarksObtained:gt:50"}).status_code == 422
+    assert CLIENT.get("/api/v1/table/grades", params={"filter": "StudentID:like:1"}).status_code == 422
+    assert CLIENT.get("/api/v1/table/grades", params={"columns": "Password"}).status_code == 422
+    assert CLIENT.get("/api/v1/table/grades", params={"limit": 0}).status_code == 422
+
+def test_export_streams_csv_ndjson_and_gzip():
+    response = CLIENT.get("/api/v1/export/Subjects")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    with open("assets/Subjects.csv", newline="") as f:
+        expected_rows = len(f.read().strip().splitlines())
+    assert len(response.text.strip().splitlines()) == expected_rows
+
+    response = CLIENT.get("/api/v1/export/all-grades", params={"format": "ndjson", "compress": "true"})
+    assert response.status_code == 200
+    assert 'filename="all-grades.ndjson.gz"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in gzip.decompress(response.content).decode().splitlines()]
+    assert rows and set(rows[0]) == {"StudentID", "SubjectName", "Department", "StudentMarks", "MaxMarks", "ExamDate", "ExamName"}
+
+    assert CLIENT.get("/api/v1/export/sqlite_master").status_code == 404
+    assert CLIENT.get("/api/v1/export/grades", params={"format": "xml"}).status_code == 422
+
+def test_upload_csv():
+    """
+    Test streaming a seed CSV back through the upload endpoint.
+
+    Re-importing assets/Subjects.csv leaves the data unchanged, so the other
+    API tests are unaffected.
+    """
+    with open("assets/Subjects.csv", "rb") as f:
+        response = CLIENT.post("/api/v1/upload-csv", files={"file": ("Subjects.csv", f, "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json()["tablename"] == "Subjects"
+    assert response.json()["rows"] == 22
+
+def test_upload_csv_rejects_upsert_rows_without_id():
+    csv_text = b"SubjectID,SubjectName,Department\n,Nameless,Nowhere\n"
+    response = CLIENT.post("/api/v1/upload-csv?mode=upsert", files={"file": ("Subjects.csv", csv_text, "text/csv")})
+
+    assert response.status_code == 422
+    assert "no SubjectID" in response.json()["detail"]
+
+def test_upload_csv_rejects_malformed_rows():
+    csv_text = b"SubjectID,SubjectName,Department\n1,Algebra\n"
+    response = CLIENT.post("/api/v1/upload-csv", files={"file": ("Subjects.csv", csv_text, "text/csv")})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Line 2 has 2 fields, expected 3."
+
+def test_report_job_lifecycle():
+    """
+    Test queueing a student profile report job, polling it and downloading the PDF.
+    """
+    response = CLIENT.post("/api/v1/report-jobs", json={"report_type": "student-profile", "student_id": STUDENT_ID})
+    assert response.status_code == 202
+    job = response.json()
+
+    deadline = time.time() + 60
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.1)
+        job = CLIENT.get(job["status_url"]).json()
+
+    assert job["status"] == "succeeded"
+    download = CLIENT.get(job["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+
+def test_report_job_requires_student_id():
+    response = CLIENT.post("/api/v1/report-jobs", json={"report_type": "student-profile"})
+    assert response.status_code == 422
+
+def test_cohort_reports_stream_a_zip():
+    response = CLIENT.get("/api/v1/reports/cohort", params={"student_ids": [17915, 18024]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert sorted(archive.namelist()) == ["student_17915_profile.pdf", "student_18024_profile.pdf"]
+        assert archive.read("student_17915_profile.pdf").startswith(b"%PDF")
+
+def test_cohort_reports_require_a_filter():
+    assert CLIENT.get("/api/v1/reports/cohort").status_code == 422
+    assert CLIENT.get("/api/v1/reports/cohort", params={"academic_year": 1900}).status_code == 404
+
+def test_report_cache_stats():
+    CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}")
+    response = CLIENT.get(f"/api/v1/reports/student-profile/{STUDENT_ID}")
+    assert response.status_code == 200
+
+    stats = CLIENT.get("/api/v1/reports/cache").json()
+    assert stats["enabled"] is True
+    assert stats["hits"] >= 1
+    assert stats["entries"] >= 1
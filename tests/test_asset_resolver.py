@@ -0,0 +1,98 @@
+import base64
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import pytest
+import requests
+from asset_resolver import AssetResolver
+
+LOGO = b"\x89PNG\r\n\x1a\n fake logo"
+
+
+class AssetHandler(BaseHTTPRequestHandler):
+    """Stand-in asset host serving /logo.png with an ETag and /slow.png after a delay"""
+    requests = []
+
+    def do_GET(self):
+        AssetHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/slow.png":
+            time.sleep(1)
+        if self.path not in ("/logo.png", "/slow.png"):
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(LOGO)))
+        self.end_headers()
+        self.wfile.write(LOGO)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), AssetHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clear_requests():
+    AssetHandler.requests.clear()
+
+
+def test_assets_are_fetched_once(tmp_path, server):
+    resolver = AssetResolver(directory=str(tmp_path))
+
+    first = resolver.data_uri(f"{server}/logo.png")
+    second = resolver.data_uri(f"{server}/logo.png")
+
+    assert first == second == "data:image/png;base64," + base64.b64encode(LOGO).decode()
+    assert len(AssetHandler.requests) == 1
+
+
+def test_stale_copies_are_revalidated_with_etag(tmp_path, server):
+    AssetResolver(directory=str(tmp_path)).resolve(f"{server}/logo.png")
+
+    # A new process with an expired copy sends a conditional request and keeps its file
+    path = AssetResolver(directory=str(tmp_path), revalidate_seconds=0).resolve(f"{server}/logo.png")
+
+    assert AssetHandler.requests == [("/logo.png", None), ("/logo.png", '"v1"')]
+    with open(path, "rb") as f:
+        assert f.read() == LOGO
+
+
+def test_unreachable_assets_fail_fast_and_are_not_retried(tmp_path, server):
+    resolver = AssetResolver(directory=str(tmp_path), timeout=(0.5, 0.2))
+
+    start = time.perf_counter()
+    assert resolver.data_uri(f"{server}/slow.png") == ""
+    assert resolver.data_uri(f"{server}/slow.png") == ""
+
+    assert time.perf_counter() - start < 1
+    assert len(AssetHandler.requests) == 1
+
+
+def test_stored_copy_is_served_when_the_host_is_down(tmp_path, server):
+    AssetResolver(directory=str(tmp_path)).resolve(f"{server}/logo.png")
+    resolver = AssetResolver(directory=str(tmp_path), revalidate_seconds=0)
+
+    with patch.object(resolver.session, "get", side_effect=requests.ConnectionError()):
+        assert resolver.data_uri(f"{server}/logo.png").endswith(base64.b64encode(LOGO).decode())
+
+
+def test_local_paths_are_returned_unchanged(tmp_path):
+    resolver = AssetResolver(directory=str(tmp_path))
+
+    assert resolver.data_uri("static/imgs/logo.png") == "static/imgs/logo.png"
+    assert resolver.data_uri(None) == ""
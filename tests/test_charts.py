@@ -0,0 +1,112 @@
+import gc
+import os
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+from io import BytesIO
+from matplotlib.figure import Figure
+from PIL import Image
+import charts
+from report_generator import ReportGenerator
+
+GRADES = pd.DataFrame(
+    {
+        "SubjectName": ["Math", "Physics"] * 2,
+        "StudentMarks": [85, 90, 88, 92],
+        "MaxMarks": [100, 100, 100, 100],
+        "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
+    }
+)
+
+METADATA = {
+    "report_date": "2025-01-01",
+    "academic_year": 2025,
+    "university": {"logo_url": "", "name": "Test University"},
+    "student": {
+        "id": 1,
+        "photo_url": "",
+        "name": "John Doe",
+        "dob": "2000-01-01",
+        "email": "john.doe@example.com",
+        "subjects": [{"SubjectName": "Math", "Department": "Science"}],
+    },
+}
+
+# The full soak from the regression report is ARS_MEMORY_TEST_REPORTS=1000
+MEMORY_TEST_REPORTS = int(os.environ.get("ARS_MEMORY_TEST_REPORTS", 20))
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def live_figures():
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def test_charts_are_not_registered_with_pyplot():
+    before = plt.get_fignums()
+
+    fig = charts.student_achievements(GRADES.copy())
+
+    assert plt.get_fignums() == before
+    assert len(fig.axes) == 4
+
+
+def test_render_png_uses_the_requested_dpi():
+    low = Image.open(BytesIO(charts.render_png(charts.student_achievements, GRADES.copy(), dpi=50)))
+    high = Image.open(BytesIO(charts.render_png(charts.student_achievements, GRADES.copy(), dpi=100)))
+
+    assert low.size == (750, 500)
+    assert high.size == (1500, 1000)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="RSS is read from /proc")
+def test_rendering_reports_does_not_leak():
+    generator = ReportGenerator(None)
+
+    # Warm up fonts, templates and allocator pools before taking the baseline
+    for _ in range(5):
+        generator.render_student_profile(GRADES.copy(), METADATA)
+    figures_before = live_figures()
+    rss_before = rss_bytes()
+
+    for _ in range(MEMORY_TEST_REPORTS):
+        generator.render_student_profile(GRADES.copy(), METADATA)
+
+    assert live_figures() == figures_before
+    # A leaked 15x10in figure holds several MB of Agg buffers, so 20 leaks would blow this budget
+    assert rss_bytes() - rss_before < 32 * 1024 * 1024
+
+
+def test_quantized_png_uses_a_palette():
+    png = charts.render_png(charts.student_achievements, GRADES.copy(), colors=64)
+
+    image = Image.open(BytesIO(png))
+    assert image.mode == "P"
+    assert len(png) < len(charts.render_png(charts.student_achievements, GRADES.copy(), colors=0))
+
+
+def test_render_data_uri_formats():
+    svg = charts.render_data_uri(charts.student_achievements, GRADES.copy(), chart_format="svg")
+    png = charts.render_data_uri(charts.student_achievements, GRADES.copy(), chart_format="png")
+
+    assert svg.startswith("data:image/svg;base64,")
+    assert png.startswith("data:image/png;base64,")
+    with pytest.raises(ValueError, match="Unknown chart format"):
+        charts.render_data_uri(charts.student_achievements, GRADES.copy(), chart_format="gif")
+
+
+def test_svg_charts_are_embedded_as_vectors(monkeypatch):
+    generator = ReportGenerator(None)
+
+    monkeypatch.setattr("config.CHART_FORMAT", "png")
+    png_pdf = generator.render_student_profile(GRADES.copy(), METADATA)
+    monkeypatch.setattr("config.CHART_FORMAT", "svg")
+    svg_pdf = generator.render_student_profile(GRADES.copy(), METADATA)
+
+    assert svg_pdf.startswith(b"%PDF")
+    assert b"/Subtype /Image" in png_pdf
+    assert b"/Subtype /Image" not in svg_pdf
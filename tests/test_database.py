@@ -1,8 +1,16 @@
+import io
 import sqlite3
+import threading
+from unittest.mock import patch
 from database import DatabaseManager
+from grade_store import GradeStore
+from schema import SCHEMA_VERSION, SUMMARY_TABLES_SQL
 import pytest
 import os
+import numpy as np
 import pandas as pd
+import re
+import shutil
 
 @pytest.fixture
 def db_manager():
@@ -38,8 +46,34 @@ def db_manager():
         connection.commit()
 
     yield manager
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    manager.close()
+    for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(f"{db_path}-grades", ignore_errors=True)
+
+@pytest.fixture
+def seeded_manager(tmp_path):
+    """DatabaseManager seeded from assets/ through the declared schema"""
+    manager = DatabaseManager(db_path=str(tmp_path / "seeded.db"), csv_dir="assets/")
+    yield manager
+    manager.close()
+
+def query_plans(manager, call):
+    """Run call() and return the EXPLAIN QUERY PLAN details of every SELECT it issued"""
+    statements = []
+    with manager.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+
+        return {
+            sql: [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            for sql in statements
+            if sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        }
 
 def test_get_connection(db_manager):
     connection = db_manager.get_connection()
@@ -48,6 +82,38 @@ def test_get_connection(db_manager):
     assert isinstance(connection, expected)
     connection.close()
 
+def test_pooled_connection_is_reused_per_thread(db_manager):
+    with db_manager.connection() as first, db_manager.connection() as second:
+        assert first is second
+
+    seen = []
+
+    def borrow():
+        with db_manager.connection() as conn:
+            seen.append(conn)
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    thread.join()
+
+    with db_manager.connection() as conn:
+        assert seen[0] is not conn
+
+def test_pooled_connection_pragmas(db_manager):
+    with db_manager.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+def test_nested_connection_rolls_back_as_one_transaction(db_manager):
+    with pytest.raises(RuntimeError):
+        with db_manager.connection() as conn:
+            conn.execute("DELETE FROM Grades")
+            with db_manager.connection():
+                pass
+            raise RuntimeError("abort import")
+
+    assert len(db_manager.get_all_grades()) == 1
+
 def test_get_university_details(db_manager):
     details: pd.Series = db_manager.get_university_details(1)
     expected = pd.Series({
@@ -140,3 +206,633 @@ def test_get_all_students(db_manager):
     ).sort_index(axis=1)
 
     assert all_students.equals(expected)
+
+def test_get_student_report_bundle(db_manager):
+    bundle = db_manager.get_student_report_bundle(1)
+
+    assert bundle["student"].equals(db_manager.get_student_data_by_id(1))
+    assert bundle["university"].equals(db_manager.get_university_per_student(1))
+    assert bundle["grades"].equals(db_manager.get_grades_per_student(1))
+    assert bundle["subjects"].sort_index(axis=1).equals(
+        db_manager.get_subjects_per_student(1).sort_index(axis=1)
+    )
+
+def test_get_student_report_bundle_raises_index_error_without_a_university(db_manager):
+    with db_manager.connection() as conn:
+        conn.execute("INSERT INTO Students (StudentID, FirstName, LastName, UniversityID) VALUES (2, 'No', 'University', NULL)")
+        conn.execute("INSERT INTO Students (StudentID, FirstName, LastName, UniversityID) VALUES (3, 'Gone', 'University', 9)")
+
+    for student_id in (2, 3, 4):
+        with pytest.raises(IndexError):
+            db_manager.get_student_report_bundle(student_id)
+
+def test_get_cohort_report_data(seeded_manager):
+    cohort = seeded_manager.get_cohort_report_data(university_id=1, student_ids=[17915, 18024, 999999])
+
+    assert cohort["students"]["StudentID"].tolist() == [17915, 18024]
+    assert cohort["universities"].index.tolist() == [1]
+    assert cohort["grades"].students.tolist() == [17915, 18024]
+    assert cohort["grades"].student_grades(17915).equals(seeded_manager.get_grades_per_student(17915))
+
+def test_get_cohort_report_data_requires_a_filter(seeded_manager):
+    with pytest.raises(ValueError, match="at least one"):
+        seeded_manager.get_cohort_report_data()
+
+def test_get_academic_statistics_matches_pandas(seeded_manager):
+    stats = seeded_manager.get_academic_statistics([50, 60, 70, 80, 90], pass_mark=50, top_mark=90, top_n=3)
+
+    grades = seeded_manager.get_all_grades()
+    grades["percentage"] = grades["StudentMarks"] / grades["MaxMarks"] * 100
+    bands = pd.cut(grades["percentage"], [-float("inf"), 50, 60, 70, 80, 90, float("inf")], right=False)
+    assert stats["grade_bands"] == bands.value_counts(sort=False).tolist()
+    assert stats["total_students"] == len(seeded_manager.get_all_students())
+    assert stats["average_performance"] == pytest.approx(grades["percentage"].mean())
+
+    lowest = grades.groupby("StudentID")["percentage"].min()
+    assert stats["passing_students"] == (lowest >= 50).sum()
+    assert stats["top_performers"] == (lowest >= 90).sum()
+
+    pd.testing.assert_series_equal(
+        stats["subject_avg"], grades.groupby("SubjectName")["percentage"].mean(), check_names=False
+    )
+    pd.testing.assert_series_equal(
+        stats["dept_avg"], grades.groupby("Department")["percentage"].mean(), check_names=False
+    )
+
+    months = grades.groupby(pd.to_datetime(grades["ExamDate"]).dt.strftime("%Y-%m"))["percentage"]
+    assert stats["monthly_avg"]["date"].dt.strftime("%Y-%m").tolist() == sorted(months.groups)
+    assert stats["monthly_avg"]["mean"].tolist() == pytest.approx(months.mean().tolist())
+    assert stats["monthly_avg"]["std"].tolist() == pytest.approx(months.std().tolist(), nan_ok=True)
+
+    averages = grades.groupby("StudentID")["percentage"].mean()
+    top = stats["top_students"]
+    assert top["StudentID"].tolist() == averages.nlargest(3).index.tolist()
+    for student in top.itertuples():
+        student_grades = grades[grades["StudentID"] == student.StudentID]
+        assert student.average == pytest.approx(averages[student.StudentID])
+        assert student.subjects == student_grades["SubjectName"].nunique()
+        assert student.top_subject == student_grades.loc[student_grades["percentage"].idxmax(), "SubjectName"]
+
+def test_get_academic_statistics_puts_full_marks_in_the_top_band(db_manager):
+    stats = db_manager.get_academic_statistics([50, 60, 70, 80, 90])
+    assert stats["grade_bands"] == [0, 0, 0, 0, 1, 0]
+
+    with db_manager.connection() as conn:
+        conn.execute("UPDATE Grades SET MarksObtained = 100")
+    db_manager.rebuild_summaries()
+    assert db_manager.get_academic_statistics([50, 60, 70, 80, 90])["grade_bands"] == [0, 0, 0, 0, 0, 1]
+
+def test_get_academic_statistics_never_scans_grades(seeded_manager):
+    plans = query_plans(seeded_manager, lambda: seeded_manager.get_academic_statistics([50, 60, 70, 80, 90]))
+    details = [detail for plan in plans.values() for detail in plan]
+
+    assert any("StudentSummary" in detail or "SCAN m" in detail for detail in details)
+    assert not [detail for detail in details if detail.startswith("SCAN g")]
+
+def summary_rows(manager):
+    with manager.connection() as conn:
+        return {
+            table_name: conn.execute(f"SELECT * FROM {table_name} ORDER BY 1, 2").fetchall()
+            for table_name in ("StudentSummary", "SubjectMonthSummary", "GradeHistogram")
+        }
+
+def test_upserts_maintain_summaries_incrementally(seeded_manager):
+    grades = pd.read_sql("SELECT * FROM Grades ORDER BY GradeID", seeded_manager.get_connection())
+    exams = pd.read_sql("SELECT * FROM Exams ORDER BY ExamID", seeded_manager.get_connection())
+    subjects = pd.read_sql("SELECT * FROM Subjects ORDER BY SubjectID", seeded_manager.get_connection())
+
+    changed_grades = grades.copy()
+    changed_grades.loc[:4, "MarksObtained"] = 100
+    changed_grades.loc[5:9, "StudentID"] = changed_grades["StudentID"].iloc[0]
+    seeded_manager.import_csv(changed_grades.iloc[:-3], mode="upsert", delete_missing=True)
+
+    changed_exams = exams.copy()
+    changed_exams.loc[0, "MaximumMarks"] = changed_exams.loc[0, "MaximumMarks"] * 2
+    changed_exams.loc[1, "ExamDate"] = "2030-06-15"
+    changed_exams.loc[2, "SubjectID"] = changed_exams.loc[3, "SubjectID"]
+    seeded_manager.import_csv(changed_exams, mode="upsert")
+
+    # Exams of a dropped subject stop counting
+    seeded_manager.import_csv(subjects.iloc[1:], mode="upsert", delete_missing=True)
+
+    incremental = summary_rows(seeded_manager)
+    seeded_manager.rebuild_summaries()
+    rebuilt = summary_rows(seeded_manager)
+
+    assert incremental["GradeHistogram"] == rebuilt["GradeHistogram"]
+    assert incremental["StudentSummary"] == rebuilt["StudentSummary"]
+    assert len(incremental["SubjectMonthSummary"]) == len(rebuilt["SubjectMonthSummary"])
+    for row, expected in zip(incremental["SubjectMonthSummary"], rebuilt["SubjectMonthSummary"]):
+        assert row[:3] == expected[:3]
+        assert row[3:] == pytest.approx(expected[3:])
+
+def test_replace_imports_rebuild_summaries(seeded_manager):
+    grades = pd.read_sql("SELECT * FROM Grades ORDER BY GradeID", seeded_manager.get_connection())
+    seeded_manager.import_csv(grades.iloc[:10], mode="replace")
+
+    stats = seeded_manager.get_academic_statistics([50, 60, 70, 80, 90])
+    assert sum(stats["grade_bands"]) == 10
+
+def test_imports_write_a_memory_mapped_grade_snapshot(seeded_manager):
+    # close waits for the background snapshot write
+    seeded_manager.close()
+    first = os.listdir(seeded_manager.snapshot_dir)
+    assert len(first) == 1
+    assert isinstance(seeded_manager.get_grade_store().marks, np.memmap)
+
+    grades = pd.read_sql("SELECT * FROM Grades ORDER BY GradeID", seeded_manager.get_connection())
+    seeded_manager.import_csv(grades.iloc[:10], mode="replace")
+    # Readers never see the grades from before the import, snapshot written or not
+    assert len(seeded_manager.get_grade_store()) == 10
+
+    seeded_manager.close()
+    second = os.listdir(seeded_manager.snapshot_dir)
+    assert len(second) == 1 and second != first
+    assert seeded_manager.write_grade_snapshot() == os.path.join(seeded_manager.snapshot_dir, second[0])
+
+def test_missing_grade_snapshot_is_rebuilt(seeded_manager):
+    seeded_manager.close()
+    shutil.rmtree(seeded_manager.snapshot_dir)
+    fresh = DatabaseManager(db_path=seeded_manager.db_path, initialize=False)
+
+    with patch.object(GradeStore, "load", wraps=GradeStore.load) as load:
+        store = fresh.get_grade_store(student_ids=[17915])
+        # The reader loads only its student; the whole snapshot is written in the background
+        assert "StudentID" in load.call_args_list[0].args[1]
+        fresh.close()
+
+    assert store.students.tolist() == [17915]
+    assert load.call_count == 2
+    assert len(os.listdir(seeded_manager.snapshot_dir)) == 1
+    assert len(fresh.get_grade_store()) == len(seeded_manager.get_all_grades())
+    fresh.close()
+
+@pytest.fixture
+def replica_manager(tmp_path):
+    manager = DatabaseManager(db_path=str(tmp_path / "replica.db"), csv_dir="assets/", read_replica=True)
+    yield manager
+    manager.close()
+
+def test_read_replica_serves_the_same_data_from_memory(replica_manager, seeded_manager):
+    with replica_manager.read_transaction() as conn:
+        # In-memory databases have no file
+        assert conn.execute("PRAGMA database_list").fetchone()[2] == ""
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM Grades")
+
+    pd.testing.assert_frame_equal(replica_manager.get_all_students(), seeded_manager.get_all_students())
+    assert replica_manager.get_student_report_bundle(17915).keys() == seeded_manager.get_student_report_bundle(17915).keys()
+    assert replica_manager.get_academic_statistics([50, 60, 70, 80, 90])["grade_bands"] == \
+        seeded_manager.get_academic_statistics([50, 60, 70, 80, 90])["grade_bands"]
+
+def test_read_replica_is_refreshed_after_imports(replica_manager):
+    grades = replica_manager.get_all_grades()
+    version = replica_manager.get_data_version()
+
+    # Writes by other means show up once the replica is refreshed
+    with replica_manager.connection() as conn:
+        conn.execute("DELETE FROM Grades WHERE GradeID = (SELECT MIN(GradeID) FROM Grades)")
+    assert len(replica_manager.get_all_grades()) == len(grades)
+    replica_manager.refresh_replica()
+    assert len(replica_manager.get_all_grades()) == len(grades) - 1
+
+    students = pd.read_sql("SELECT * FROM Students ORDER BY StudentID", replica_manager.get_connection())
+    replica_manager.import_csv(students.iloc[:5], mode="replace")
+    assert len(replica_manager.get_all_students()) == 5
+    assert replica_manager.get_data_version() != version
+
+def test_read_replica_swap_never_strands_a_reader(replica_manager, monkeypatch):
+    expected = len(replica_manager.get_all_students())
+    replica_manager.refresh_replica()
+    connect = sqlite3.connect
+
+    def connect_during_refresh(database, *args, **kwargs):
+        if "mode=memory" in database and "factory" in kwargs:
+            # Swap the replica between the reader choosing a copy and connecting to it
+            refresh = threading.Thread(target=replica_manager.refresh_replica)
+            refresh.start()
+            refresh.join(timeout=0.5)
+        return connect(database, *args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, "connect", connect_during_refresh)
+    # A copy swapped out before the reader connected would be reopened as a new, empty database
+    assert len(replica_manager.get_all_students()) == expected
+
+def test_read_replica_refresh_frees_copies_of_idle_threads(replica_manager):
+    # Let the background grade snapshot finish its read of the current copy
+    replica_manager.close()
+    read = threading.Event()
+    done = threading.Event()
+    seen = {}
+
+    def read_then_idle():
+        with replica_manager.read_transaction() as conn:
+            seen["conn"] = conn
+        read.set()
+        done.wait()
+
+    idle = threading.Thread(target=read_then_idle)
+    idle.start()
+    read.wait()
+    old_uri = replica_manager._replica[0]
+    replica_manager.refresh_replica()
+
+    try:
+        with pytest.raises(sqlite3.ProgrammingError):
+            seen["conn"].execute("SELECT 1")
+        # Nothing holds the old copy open any more, so its name now opens a new, empty database
+        probe = sqlite3.connect(old_uri, uri=True)
+        assert probe.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+        probe.close()
+    finally:
+        done.set()
+        idle.join()
+
+def test_read_transaction_sees_one_snapshot(db_manager):
+    writer = db_manager.get_connection()
+
+    with db_manager.read_transaction() as conn:
+        before = conn.execute("SELECT COUNT(*) FROM Grades").fetchone()[0]
+
+        writer.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (2, 1, 1, 60)")
+        writer.commit()
+
+        during = conn.execute("SELECT COUNT(*) FROM Grades").fetchone()[0]
+
+    after = len(db_manager.get_all_grades())
+    writer.close()
+
+    assert before == during == 1
+    assert after == 2
+
+def test_declared_schema_keeps_keys_and_integer_marks(seeded_manager):
+    with seeded_manager.connection() as conn:
+        grades_columns = {row[1]: (row[2], row[5]) for row in conn.execute("PRAGMA table_info(Grades)")}
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        marks_types = {row[0] for row in conn.execute("SELECT DISTINCT typeof(MarksObtained) FROM Grades")}
+        analyzed = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+
+    assert grades_columns["GradeID"] == ("INTEGER", 1)
+    assert grades_columns["MarksObtained"] == ("INTEGER", 0)
+    assert marks_types == {"integer"}
+    assert {
+        "idx_grades_student",
+        "idx_grades_exam",
+        "idx_exams_subject",
+        "idx_exams_date",
+        "idx_students_university",
+    } <= indexes
+    assert analyzed > 0
+
+@pytest.mark.parametrize("method", [
+    "get_student_data_by_id",
+    "get_university_per_student",
+    "get_subjects_per_student",
+    "get_grades_per_student",
+    "get_student_report_bundle",
+])
+def test_per_student_queries_only_use_index_lookups(seeded_manager, method):
+    plans = query_plans(seeded_manager, lambda: getattr(seeded_manager, method)(17915))
+
+    assert plans
+    for sql, steps in plans.items():
+        assert all(step.startswith("SEARCH") for step in steps), (sql, steps)
+
+def test_get_all_grades_avoids_full_scans_and_sorts(seeded_manager):
+    plans = query_plans(seeded_manager, seeded_manager.get_all_grades)
+
+    for sql, steps in plans.items():
+        # Every table must be reached through an index, and ORDER BY ExamDate must not sort
+        assert not any(re.fullmatch(r"SCAN \w+", step) for step in steps), (sql, steps)
+        assert not any("TEMP B-TREE" in step for step in steps), (sql, steps)
+
+def test_table_pages_are_index_range_seeks(seeded_manager):
+    def pages():
+        seeded_manager.get_table_page("Grades", limit=10, after=30)
+        seeded_manager.get_table_page("grades", limit=10, after=30, filters=[("StudentID", "eq", 17915)])
+
+    for plan in query_plans(seeded_manager, pages).values():
+        assert all(detail.startswith("SEARCH") for detail in plan), plan
+
+def test_table_page_binds_filter_values(seeded_manager):
+    page = seeded_manager.get_table_page("Students", filters=[("LastName", "eq", "x' OR '1'='1")])
+    assert page["rows"] == []
+
+def test_grades_import_works_before_exams_and_subjects_exist(tmp_path):
+    manager = DatabaseManager(db_path=str(tmp_path / "grades_only.db"), initialize=False)
+    manager.create_table_from_csv(None, "Grades")
+    csv_text = "GradeID,StudentID,ExamID,MarksObtained\n1,1,1,80\n"
+
+    manager.import_csv_stream(io.StringIO(csv_text))
+    manager.import_csv_stream(io.StringIO(csv_text), mode="upsert")
+
+    assert manager.rebuild_summaries()["StudentSummary"] == 0
+    manager.close()
+
+def test_iter_dataset_reads_fixed_size_batches(seeded_manager):
+    batches = list(seeded_manager.iter_dataset("grades", batch_size=10))
+
+    assert all(columns == ("GradeID", "StudentID", "ExamID", "MarksObtained") for columns, _ in batches)
+    assert [len(rows) for _, rows in batches] == [10] * 6 + [7]
+    assert [row[0] for _, rows in batches for row in rows] == sorted(row[0] for _, rows in batches for row in rows)
+
+    all_grades = [row for _, rows in seeded_manager.iter_dataset("all-grades") for row in rows]
+    assert pd.DataFrame(all_grades).values.tolist() == seeded_manager.get_all_grades().values.tolist()
+
+    with pytest.raises(LookupError):
+        seeded_manager.iter_dataset("sqlite_master")
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    """Writable copy of assets/ for seeding tests"""
+    csv_dir = tmp_path / "seeds"
+    shutil.copytree("assets", csv_dir)
+    return csv_dir
+
+def test_seed_skips_unchanged_csvs(tmp_path, seed_dir):
+    db_path = str(tmp_path / "manifest.db")
+    first = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir), initialize=False)
+    assert sorted(first.seed()) == ["Exams", "Grades", "Students", "Subjects", "Universities"]
+
+    # Rows imported after seeding must survive a restart
+    with first.connection() as conn:
+        conn.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (9999, 17915, 20011, 50)")
+    first.close()
+
+    restarted = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir), initialize=False)
+    assert restarted.seed() == []
+    assert restarted._get_table_data("Grades", id=9999)
+
+    # Touching a file without changing its content does not reload it
+    os.utime(seed_dir / "Grades.csv", ns=(0, 0))
+    assert restarted.seed() == []
+
+    with open(seed_dir / "Subjects.csv", "a") as f:
+        f.write("\n99,Astronomy,Physics")
+    assert restarted.seed() == ["Subjects"]
+    assert restarted._get_table_data("Grades", id=9999)
+    restarted.close()
+
+def test_reseed_reloads_everything(tmp_path, seed_dir):
+    manager = DatabaseManager(db_path=str(tmp_path / "manifest.db"), csv_dir=str(seed_dir))
+
+    with manager.connection() as conn:
+        conn.execute("DELETE FROM Students")
+
+    assert len(manager.reseed()) == 5
+    assert len(manager.get_all_students()) == 17
+    manager.close()
+
+def test_check_schema_reports_an_unseeded_database(tmp_path, seed_dir):
+    manager = DatabaseManager(db_path=str(tmp_path / "manifest.db"), csv_dir=str(seed_dir), initialize=False)
+
+    assert manager.check_schema() == [
+        "Tables Universities, Subjects, Students, Exams, Grades do not exist.",
+        f"Schema version 0 is older than {SCHEMA_VERSION}.",
+    ]
+    manager.seed()
+    assert manager.check_schema() == []
+    manager.close()
+
+def test_schema_upgrade_keeps_imported_rows(tmp_path, seed_dir):
+    db_path = str(tmp_path / "manifest.db")
+    manager = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir))
+    with manager.connection() as conn:
+        conn.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (9999, 17915, 20011, 50)")
+        # A version 2 database, from before the summary tables
+        for table_name in SUMMARY_TABLES_SQL:
+            conn.execute(f"DROP TABLE {table_name}")
+        conn.execute("PRAGMA user_version = 2")
+    manager.close()
+
+    upgraded = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir), initialize=False)
+    assert upgraded.seed() == []
+    assert upgraded._get_table_data("Grades", id=9999)
+    with upgraded.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        summarized = conn.execute("SELECT Grades FROM StudentSummary WHERE StudentID = 17915").fetchone()[0]
+    assert summarized == len(upgraded.get_grades_per_student(17915))
+    assert upgraded.migrate() == []
+    upgraded.close()
+
+def test_schema_upgrade_adds_the_name_indexes(tmp_path, seed_dir):
+    db_path = str(tmp_path / "manifest.db")
+    manager = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir))
+    with manager.connection() as conn:
+        conn.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (9999, 17915, 20011, 50)")
+        # A version 1 database, from before name-keyed imports
+        conn.execute("DROP INDEX idx_students_name")
+        conn.execute("DROP INDEX idx_exams_name")
+        conn.execute("PRAGMA user_version = 1")
+    manager.close()
+
+    upgraded = DatabaseManager(db_path=db_path, csv_dir=str(seed_dir), initialize=False)
+    assert upgraded.migrate() == list(range(2, SCHEMA_VERSION + 1))
+    with upgraded.connection() as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_students_name", "idx_exams_name"} <= indexes
+    assert upgraded._get_table_data("Grades", id=9999)
+    upgraded.close()
+
+def test_import_csv_stream_replaces_rows_in_batches(db_manager):
+    stream = io.StringIO(
+        "GradeID,StudentID,ExamID,MarksObtained\n"
+        "10,1,1,95\n"
+        "11,1,1,\n"
+        "12,1,1,40\n"
+    )
+    reports = []
+
+    stats = db_manager.import_csv_stream(stream, batch_size=2, progress=lambda *args: reports.append(args))
+
+    assert stats["table"] == "Grades"
+    assert stats["rows"] == 3
+    assert reports[-1][0] == 3
+    with db_manager.connection() as conn:
+        rows = conn.execute("SELECT GradeID, MarksObtained FROM Grades ORDER BY GradeID").fetchall()
+    assert rows == [(10, 95), (11, None), (12, 40)]
+
+def test_import_csv_rejects_mismatched_columns(db_manager):
+    with pytest.raises(ValueError, match="Columns do not match"):
+        db_manager.import_csv_stream(io.StringIO("GradeID,StudentID,Marks\n1,1,50\n"))
+
+    # The failed import must not have cleared the table
+    assert len(db_manager.get_all_grades()) == 1
+
+@pytest.mark.parametrize("mode", ["replace", "upsert"])
+def test_import_csv_rejects_repeated_ids_with_their_line(db_manager, mode):
+    csv_text = (
+        "GradeID,StudentID,ExamID,MarksObtained\n"
+        "5,1,1,80\n"
+        "6,1,1,70\n"
+        "5,1,1,60\n"
+    )
+
+    with pytest.raises(ValueError, match="Line 4 repeats GradeID 5"):
+        db_manager.import_csv_stream(io.StringIO(csv_text), mode=mode, batch_size=2)
+
+    # The whole import was rolled back
+    with db_manager.connection() as conn:
+        assert conn.execute("SELECT GradeID, MarksObtained FROM Grades").fetchall() == [(1, 80)]
+
+def test_import_csv_rejects_rows_with_the_wrong_number_of_fields(db_manager):
+    with pytest.raises(ValueError, match="Line 3 has 3 fields, expected 4"):
+        db_manager.import_csv_stream(io.StringIO(
+            "GradeID,StudentID,ExamID,MarksObtained\n"
+            "5,1,1,80\n"
+            "6,1,70\n"
+        ))
+
+    assert len(db_manager.get_all_grades()) == 1
+
+def test_import_csv_dataframe(db_manager):
+    stats = db_manager.import_csv(pd.DataFrame({
+        "SubjectID": [1, 2],
+        "SubjectName": ["Test Subject", "Optics"],
+        "Department": ["TestDepartment", None],
+    }))
+
+    assert stats["rows"] == 2
+    assert db_manager._get_table_data("Subjects", id=2) == [
+        {"SubjectID": 2, "SubjectName": "Optics", "Department": None}
+    ]
+
+def test_import_csv_upsert_writes_only_the_delta(db_manager):
+    with db_manager.connection() as conn:
+        conn.execute("INSERT INTO Students (StudentID, FirstName, LastName, UniversityID) VALUES (2, 'Other', 'Student', 1)")
+        conn.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (2, 2, 1, 55)")
+
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "GradeID,StudentID,ExamID,MarksObtained\n"
+        "1,1,1,80\n"    # unchanged
+        "3,2,1,65\n"    # new
+    ), mode="upsert")
+
+    assert (summary["inserted"], summary["updated"], summary["deleted"]) == (1, 0, 0)
+    assert summary["student_ids"] == [2]
+    assert len(db_manager.get_all_grades()) == 3
+
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "GradeID,StudentID,ExamID,MarksObtained\n"
+        "1,1,1,90\n"    # changed
+        "3,2,1,65\n"    # unchanged
+    ), mode="upsert", delete_missing=True)
+
+    assert (summary["inserted"], summary["updated"], summary["deleted"]) == (0, 1, 1)
+    assert summary["student_ids"] == [1, 2]
+    with db_manager.connection() as conn:
+        rows = conn.execute("SELECT GradeID, MarksObtained FROM Grades ORDER BY GradeID").fetchall()
+    assert rows == [(1, 90), (3, 65)]
+
+def test_import_csv_upsert_rejects_rows_without_id(db_manager):
+    with db_manager.connection() as conn:
+        conn.execute("INSERT INTO Grades (GradeID, StudentID, ExamID, MarksObtained) VALUES (2, 1, 1, 55)")
+
+    with pytest.raises(ValueError, match="1 rows have no GradeID"):
+        db_manager.import_csv_stream(io.StringIO(
+            "GradeID,StudentID,ExamID,MarksObtained\n"
+            "3,1,1,65\n"
+            ",1,1,70\n"    # would get rowid 1 in the change list and claim grade 1
+        ), mode="upsert", delete_missing=True)
+
+    # The whole import was rolled back
+    with db_manager.connection() as conn:
+        rows = conn.execute("SELECT GradeID, MarksObtained FROM Grades ORDER BY GradeID").fetchall()
+    assert rows == [(1, 80), (2, 55)]
+
+def test_import_csv_upsert_reports_students_affected_through_joins(db_manager):
+    summary = db_manager.import_csv(pd.DataFrame({
+        "UniversityID": [1],
+        "UniversityName": ["Renamed University"],
+        "Address": ["ABC"],
+    }), mode="upsert")
+
+    assert summary["updated"] == 1
+    assert summary["student_ids"] == [1]
+
+def test_imports_bump_only_the_data_versions_they_affect(db_manager):
+    assert db_manager.get_data_version() == "0"
+    assert db_manager.get_data_version(1) == "0.0"
+
+    db_manager.import_csv_stream(io.StringIO(
+        "StudentID,FirstName,LastName,UniversityID,Email,DateOfBirth,AcademicYear,ImageURL\n"
+        "2,New,Student,1,,,2025,\n"
+    ), mode="upsert")
+
+    assert db_manager.get_data_version() == "1"
+    assert db_manager.get_data_version(1) == "0.0"
+    assert db_manager.get_data_version(2) == "0.1"
+
+    db_manager.import_csv_stream(io.StringIO(
+        "SubjectID,SubjectName,Department\n1,Renamed Subject,TestDepartment\n"
+    ), mode="replace")
+
+    assert db_manager.get_data_version() == "2"
+    assert db_manager.get_data_version(1) == "1.0"
+    assert db_manager.get_data_version(2) == "1.1"
+
+def test_import_csv_rejects_unknown_mode(db_manager):
+    with pytest.raises(ValueError, match="Unknown import mode"):
+        db_manager.import_csv_stream(io.StringIO("GradeID,StudentID,ExamID,MarksObtained\n"), mode="merge")
+
+def test_import_grades_by_name_resolves_ids_and_writes_rejects(db_manager, tmp_path):
+    reject_path = tmp_path / "rejects.csv"
+
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "FirstName,LastName,SubjectName,ExamName,MarksObtained\n"
+        "Test,Student,Test Subject,Test Exam,95\n"
+        "Nobody,Here,Test Subject,Test Exam,50\n"
+        "Test,Student,Other Subject,Test Exam,40\n"
+    ), mode="upsert", reject_path=str(reject_path))
+
+    # The known student/exam pair updates the existing grade in place
+    assert (summary["inserted"], summary["updated"], summary["rejected"]) == (0, 1, 2)
+    assert summary["student_ids"] == [1]
+    with db_manager.connection() as conn:
+        assert conn.execute("SELECT GradeID, StudentID, ExamID, MarksObtained FROM Grades").fetchall() == [(1, 1, 1, 95)]
+
+    rejects = pd.read_csv(reject_path)
+    assert rejects["RowNumber"].tolist() == [2, 3]
+    assert rejects["Reason"].tolist() == ["unknown student", "unknown exam"]
+
+def test_import_new_week_of_grades_by_name(db_manager):
+    with db_manager.connection() as conn:
+        conn.execute("INSERT INTO Students (StudentID, FirstName, LastName, UniversityID) VALUES (2, 'New', 'Student', 1)")
+        conn.execute("INSERT INTO Exams (ExamID, SubjectID, ExamName, ExamDate, MaximumMarks) VALUES (2, 1, 'Next Exam', '1999-01-08', 100)")
+
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "FirstName,LastName,SubjectName,ExamName,MarksObtained\n"
+        "Test,Student,Test Subject,Next Exam,70\n"
+        "New,Student,Test Subject,Next Exam,60\n"
+        "Test,Student,Test Subject,Test Exam,80\n"
+    ), mode="upsert")
+
+    # New student/exam pairs are inserted under fresh GradeIDs; the unchanged grade is left alone
+    assert (summary["inserted"], summary["updated"], summary["rejected"]) == (2, 0, 0)
+    assert summary["student_ids"] == [1, 2]
+    with db_manager.connection() as conn:
+        assert conn.execute("SELECT GradeID, StudentID, ExamID, MarksObtained FROM Grades ORDER BY GradeID").fetchall() == [
+            (1, 1, 1, 80), (2, 1, 2, 70), (3, 2, 2, 60),
+        ]
+
+    # Importing the same file again finds the new grades and changes nothing
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "FirstName,LastName,SubjectName,ExamName,MarksObtained\n"
+        "Test,Student,Test Subject,Next Exam,70\n"
+        "New,Student,Test Subject,Next Exam,60\n"
+    ), mode="upsert")
+    assert (summary["inserted"], summary["updated"]) == (0, 0)
+
+def test_import_grades_by_name_rejects_ambiguous_students(db_manager, tmp_path):
+    with db_manager.connection() as conn:
+        conn.execute("INSERT INTO Students (StudentID, FirstName, LastName, UniversityID) VALUES (2, 'Test', 'Student', 1)")
+
+    summary = db_manager.import_csv_stream(io.StringIO(
+        "GradeID,FirstName,LastName,SubjectName,ExamName,MarksObtained\n"
+        "7,Test,Student,Test Subject,Test Exam,95\n"
+    ), reject_path=str(tmp_path / "rejects.csv"))
+
+    assert summary["rejected"] == 1
+    assert pd.read_csv(summary["reject_path"])["Reason"].tolist() == ["ambiguous match"]
+    # Replace mode still empties the table even though nothing resolved
+    assert db_manager.get_all_grades().empty
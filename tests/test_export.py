@@ -0,0 +1,49 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+import pytest
+from export import encode_batches
+
+BATCHES = [
+    (("ID", "Name"), [(1, "Ada"), (2, "Grace, Hopper")]),
+    (("ID", "Name"), [(3, None)]),
+]
+
+
+def test_csv_writes_the_header_once_and_one_chunk_per_batch():
+    chunks = list(encode_batches(BATCHES, "csv"))
+
+    assert len(chunks) == 2
+    assert list(csv.reader(io.StringIO(b"".join(chunks).decode()))) == [
+        ["ID", "Name"], ["1", "Ada"], ["2", "Grace, Hopper"], ["3", ""],
+    ]
+
+
+def test_empty_dataset_still_has_a_header():
+    assert b"".join(encode_batches([(("ID",), [])], "csv")) == b"ID\n"
+    assert b"".join(encode_batches([(("ID",), [])], "ndjson")) == b""
+
+
+def test_ndjson_writes_one_object_per_line():
+    lines = b"".join(encode_batches(BATCHES, "ndjson")).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"ID": 1, "Name": "Ada"}, {"ID": 2, "Name": "Grace, Hopper"}, {"ID": 3, "Name": None},
+    ]
+
+
+def test_gzip_streams_a_flushed_chunk_per_batch():
+    chunks = list(encode_batches(BATCHES, "ndjson", compress=True))
+
+    # Every batch is decodable before the stream ends
+    assert len(chunks) == 3
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(chunks[0]).decode().count("\n") == 2
+    assert gzip.decompress(b"".join(chunks)) == b"".join(encode_batches(BATCHES, "ndjson"))
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        encode_batches(BATCHES, "xml")
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+from database import DatabaseManager
+from grade_store import GradeStore
+
+
+@pytest.fixture
+def seeded_manager(tmp_path):
+    manager = DatabaseManager(db_path=str(tmp_path / "seeded.db"), csv_dir="assets/")
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def grades():
+    return pd.DataFrame(
+        {
+            "StudentID": [2, 1, 2, 1, 3],
+            "SubjectName": ["Math", "Math", "Physics", "Physics", "Math"],
+            "Department": ["Science"] * 5,
+            "ExamName": ["Midterm", "Midterm", "Final", "Final", "Midterm"],
+            "ExamDate": ["2025-01-01", "2025-01-01", "2025-02-01", "2025-02-01", None],
+            "StudentMarks": [50, 90, 70, 80, 100],
+            "MaxMarks": [100, 100, 100, 100, 100],
+        }
+    )
+
+
+def test_columns_are_compact_and_sorted_by_student(grades):
+    store = GradeStore.from_frame(grades)
+
+    assert store.student_ids.dtype == np.int32
+    assert store.marks.dtype == np.int16
+    assert store.subject_codes.dtype == np.int16
+    assert store.student_ids.tolist() == [1, 1, 2, 2, 3]
+    assert store.offsets.tolist() == [0, 2, 4, 5]
+    assert store.student_slice(2) == slice(2, 4)
+    assert store.student_slice(99) == slice(0, 0)
+
+
+def test_student_grades_decode_one_student(grades):
+    store = GradeStore.from_frame(grades)
+
+    assert store.student_grades(1).to_dict("records") == [
+        {"SubjectName": "Math", "ExamName": "Midterm", "ExamDate": "2025-01-01", "StudentMarks": 90, "MaxMarks": 100},
+        {"SubjectName": "Physics", "ExamName": "Final", "ExamDate": "2025-02-01", "StudentMarks": 80, "MaxMarks": 100},
+    ]
+    assert store.student_grades(3)["ExamDate"].tolist() == [None]
+    assert store.student_grades(99).empty
+
+
+def test_aggregates_match_pandas(grades):
+    store = GradeStore.from_frame(grades)
+    percentage = grades["StudentMarks"] / grades["MaxMarks"] * 100
+
+    expected = percentage.groupby(grades["StudentID"]).agg(["count", "mean", "min", "max"])
+    aggregates = store.student_aggregates()
+    assert aggregates["grades"].tolist() == expected["count"].tolist()
+    assert aggregates[["mean", "min", "max"]].to_numpy().tolist() == expected[["mean", "min", "max"]].to_numpy().tolist()
+
+    assert store.top_students(2).index.tolist() == [3, 1]
+    pd.testing.assert_series_equal(
+        store.subject_averages(), percentage.groupby(grades["SubjectName"]).mean(), check_names=False
+    )
+    pd.testing.assert_series_equal(
+        store.department_averages(), percentage.groupby(grades["Department"]).mean(), check_names=False
+    )
+
+
+def test_load_matches_the_per_student_queries(seeded_manager):
+    store = seeded_manager.get_grade_store()
+
+    assert len(store) == len(seeded_manager.get_all_grades())
+    for student_id in store.students[:5]:
+        student_id = int(student_id)
+        assert store.student_grades(student_id).equals(seeded_manager.get_grades_per_student(student_id))
+        assert store.student_subjects(student_id).equals(seeded_manager.get_subjects_per_student(student_id))
+
+
+def test_load_filters_students(seeded_manager):
+    store = seeded_manager.get_grade_store(student_ids=[17915, 999999])
+
+    assert store.students.tolist() == [17915]
+    assert GradeStore.from_frame(seeded_manager.get_all_grades().iloc[0:0]).student_aggregates().empty
+
+
+@pytest.mark.parametrize(
+    "update, message",
+    [
+        ("UPDATE Grades SET MarksObtained = 12.5 WHERE GradeID = (SELECT MIN(GradeID) FROM Grades)", "whole numbers"),
+        ("UPDATE Grades SET MarksObtained = 40000 WHERE GradeID = (SELECT MIN(GradeID) FROM Grades)", "MarksObtained"),
+        ("UPDATE Grades SET StudentID = 3000000000 WHERE GradeID = (SELECT MIN(GradeID) FROM Grades)", "StudentID"),
+    ],
+)
+def test_load_rejects_values_the_columns_cannot_hold(seeded_manager, update, message):
+    with seeded_manager.connection() as conn:
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute(update)
+        conn.execute("INSERT OR IGNORE INTO Students (StudentID, UniversityID) SELECT 3000000000, UniversityID "
+                     "FROM Students LIMIT 1")
+
+        with pytest.raises(ValueError, match=message):
+            GradeStore.load(conn)
+
+
+def test_snapshot_reopens_memory_mapped(grades, tmp_path):
+    store = GradeStore.from_frame(grades)
+    store.save(str(tmp_path / "snapshot"))
+    opened = GradeStore.open(str(tmp_path / "snapshot"))
+
+    assert isinstance(opened.marks, np.memmap)
+    assert not opened.marks.flags.writeable
+    assert opened.offsets.tolist() == store.offsets.tolist()
+    for student_id in (1, 2, 3):
+        assert opened.student_grades(student_id).equals(store.student_grades(student_id))
+        assert opened.student_subjects(student_id).equals(store.student_subjects(student_id))
+    assert opened.top_students(3).equals(store.top_students(3))
+    # Only the renamed snapshot is left behind
+    assert [path.name for path in tmp_path.iterdir()] == ["snapshot"]
+
+
+def test_subset_keeps_the_requested_students(grades):
+    store = GradeStore.from_frame(grades)
+    subset = store.subset([3, 1, 99, 1])
+
+    assert subset.students.tolist() == [1, 3]
+    assert subset.offsets.tolist() == [0, 2, 3]
+    assert subset.student_grades(1).equals(store.student_grades(1))
+    assert subset.student_grades(2).empty
+    assert len(store.subset([])) == 0
+
+
+def test_snapshot_store_matches_sql_load(seeded_manager):
+    with seeded_manager.read_transaction() as conn:
+        loaded = GradeStore.load(conn, "s.UniversityID = ?", (1,))
+    store = seeded_manager.get_grade_store(university_id=1)
+
+    assert store.students.tolist() == loaded.students.tolist()
+    for student_id in loaded.students[:5].tolist():
+        assert store.student_grades(student_id).equals(loaded.student_grades(student_id))
@@ -0,0 +1,92 @@
+import os
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image
+from images import ThumbnailCache, make_thumbnail
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "photo.png"
+    Image.new("RGBA", (600, 400), (255, 0, 0, 128)).save(path)
+    return str(path)
+
+
+def test_make_thumbnail_fits_the_box_and_flattens_alpha():
+    thumbnail = Image.open(BytesIO(make_thumbnail(Image.new("RGBA", (600, 400)))))
+
+    assert thumbnail.format == "JPEG"
+    assert thumbnail.mode == "RGB"
+    assert thumbnail.size == (300, 200)
+
+
+def test_thumbnails_are_decoded_once(tmp_path, photo):
+    cache = ThumbnailCache(directory=str(tmp_path / "thumbs"))
+
+    with patch("images.make_thumbnail", wraps=make_thumbnail) as resize:
+        first = cache.get(photo)
+        second = cache.get(photo)
+
+        # A new process starts with an empty memory cache but reuses the disk cache
+        third = ThumbnailCache(directory=str(tmp_path / "thumbs")).get(photo)
+
+    assert first == second == third
+    assert resize.call_count == 1
+
+
+def test_changed_source_gets_a_new_thumbnail(tmp_path, photo):
+    cache = ThumbnailCache(directory=str(tmp_path / "thumbs"))
+    before = cache.get(photo)
+
+    Image.new("RGB", (100, 100), (0, 0, 255)).save(photo, format="PNG")
+    os.utime(photo, ns=(0, os.stat(photo).st_mtime_ns + 1))
+
+    assert Image.open(BytesIO(cache.get(photo))).size == (100, 100)
+    assert cache.get(photo) != before
+
+
+def test_memory_cache_is_bounded(tmp_path, photo):
+    cache = ThumbnailCache(directory=str(tmp_path / "thumbs"), max_items=1)
+
+    cache.get(photo)
+    cache.get(photo, size=(50, 50))
+
+    assert len(cache._memory) == 1
+
+
+def test_changed_source_replaces_its_old_thumbnail_on_disk(tmp_path, photo):
+    directory = tmp_path / "thumbs"
+    cache = ThumbnailCache(directory=str(directory))
+    cache.get(photo)
+    cache.get(photo, size=(50, 50))
+
+    Image.new("RGB", (100, 100), (0, 0, 255)).save(photo, format="PNG")
+    os.utime(photo, ns=(0, os.stat(photo).st_mtime_ns + 1))
+    cache.get(photo)
+
+    # The old 300px version is gone; the 50px one is another size and stays until it is refreshed
+    assert len(os.listdir(directory)) == 2
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    directory = tmp_path / "thumbs"
+    photos = []
+    for index in range(3):
+        path = tmp_path / f"photo{index}.png"
+        Image.effect_noise((400, 400), 64 + index).save(path)
+        photos.append(str(path))
+
+    cache = ThumbnailCache(directory=str(directory))
+    first_size = len(cache.get(photos[0]))
+    [oldest] = os.listdir(directory)
+    second_size = len(cache.get(photos[1]))
+    os.utime(directory / oldest, (0, 0))
+
+    # Room for two thumbnails: the third write evicts the least recently used
+    cache.max_bytes = first_size + second_size + 1024
+    cache.get(photos[2])
+
+    remaining = os.listdir(directory)
+    assert len(remaining) == 2
+    assert oldest not in remaining
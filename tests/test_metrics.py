@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+def test_exposition_follows_the_text_format(registry):
+    requests = metrics.Counter("test_requests", "Requests.", ["path"], registry=registry)
+    latency = metrics.Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+    requests.labels(path='/a"b').inc(2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.exposition().splitlines() == [
+        "# HELP test_latency_seconds Latency.",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1.0"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        "test_latency_seconds_count 3",
+        "test_latency_seconds_sum 5.55",
+        "# HELP test_requests_total Requests.",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{path="/a\\"b"} 2',
+    ]
+
+
+def test_labels_are_validated(registry):
+    counter = metrics.Counter("test_events", "Events.", ["kind"], registry=registry)
+
+    with pytest.raises(ValueError, match="takes labels kind"):
+        counter.labels(other="x")
+    with pytest.raises(ValueError, match="only increase"):
+        counter.labels(kind="x").inc(-1)
+    with pytest.raises(ValueError, match="already registered"):
+        metrics.Counter("test_events", "Again.", registry=registry)
+
+
+def test_concurrent_updates_are_not_lost(registry):
+    latency = metrics.Histogram("test_seconds", "Latency.", ["stage"], registry=registry)
+
+    def observe():
+        for _ in range(10_000):
+            latency.labels(stage="pdf").observe(0.01)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 'test_seconds_count{stage="pdf"} 40000' in registry.exposition()
+
+
+def test_drained_samples_merge_into_another_registry(registry):
+    worker = metrics.Registry()
+    for target in (registry, worker):
+        metrics.Histogram("test_seconds", "Latency.", ["stage"], buckets=(1.0,), registry=target)
+    worker_latency = worker._metrics["test_seconds"]
+    worker_latency.labels(stage="pdf").observe(0.5)
+
+    samples = worker.drain()
+    registry.merge(samples)
+    registry.merge(worker.drain())  # Drained samples are not shipped twice
+
+    assert 'test_seconds_count{stage="pdf"} 1' in registry.exposition()
+    assert 'test_seconds_count{stage="pdf"} 0' in worker.exposition()
+
+
+def test_middleware_labels_requests_by_route():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    exposition = metrics.REGISTRY.exposition()
+    assert 'ars_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in exposition
+    assert 'ars_http_requests_total{method="GET",route="unmatched",status="404"} 1' in exposition
@@ -0,0 +1,83 @@
+import os
+import pstats
+import time
+
+import pytest
+
+import config
+import profiling
+
+
+def busy_report_step():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_cprofile_stores_pstats(profile_dir):
+    with profiling.profiled("cprofile", "student-profile-1") as run:
+        assert profiling.active()
+        busy_report_step()
+
+    assert not profiling.active()
+    assert run.path == str(profile_dir / f"{run.id}.pstats")
+    assert run.headers() == {"X-Profile-Id": run.id}
+    stats = pstats.Stats(run.path)
+    assert any(function == "busy_report_step" for _, _, function in stats.stats)
+
+
+def test_sampling_stores_collapsed_stacks(profile_dir):
+    with profiling.profiled("sample", "academic-performance") as run:
+        busy_report_step()
+
+    with open(run.path) as f:
+        lines = f.read().splitlines()
+    assert run.path.endswith(".collapsed")
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_report_step (test_profiling.py" in line for line in lines)
+
+
+def test_profile_is_stored_when_the_block_raises(profile_dir):
+    with pytest.raises(RuntimeError):
+        with profiling.profiled("sample", "failing") as run:
+            raise RuntimeError("render failed")
+
+    assert os.path.exists(run.path)
+    assert profiling.profile_path(run.id) == run.path
+
+
+def test_unprofiled_and_unknown_modes(profile_dir):
+    with profiling.profiled(None, "plain") as run:
+        assert run is None
+        assert not profiling.active()
+    with pytest.raises(ValueError, match="Unknown profile mode"):
+        with profiling.profiled("perf", "plain"):
+            pass
+    assert os.listdir(profile_dir) == []
+
+
+def test_only_the_newest_profiles_are_kept(profile_dir, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_KEEP", 2)
+    runs = []
+    for _ in range(3):
+        with profiling.profiled("sample", "report") as run:
+            pass
+        runs.append(run)
+        time.sleep(0.01)
+
+    assert sorted(os.listdir(profile_dir)) == sorted(os.path.basename(run.path) for run in runs[1:])
+
+
+def test_profile_path_rejects_unknown_ids(profile_dir):
+    with pytest.raises(LookupError):
+        profiling.profile_path("20260101T000000-report-0123abcd")
+    with pytest.raises(LookupError):
+        profiling.profile_path("../../etc/passwd")
@@ -0,0 +1,91 @@
+import pytest
+import pandas as pd
+from unittest.mock import Mock
+import metrics
+from renderer import RendererPool
+from report_generator import ReportGenerator
+
+GRADES = pd.DataFrame(
+    {
+        "SubjectName": ["Math", "Physics"] * 2,
+        "StudentMarks": [85, 90, 88, 92],
+        "MaxMarks": [100, 100, 100, 100],
+        "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
+    }
+)
+
+METADATA = {
+    "report_date": "2025-01-01",
+    "academic_year": 2025,
+    "university": {"logo_url": "", "name": "Test University"},
+    "student": {
+        "id": 1,
+        "photo_url": None,
+        "name": "John Doe",
+        "dob": "2000-01-01",
+        "email": "john.doe@example.com",
+        "subjects": [{"SubjectName": "Math", "Department": "Science"}],
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    renderer_pool = RendererPool(workers=1)
+    yield renderer_pool
+    renderer_pool.shutdown()
+
+
+def test_pool_renders_pdf_bytes(pool):
+    pdf_bytes = pool.render("render_student_profile", GRADES, METADATA)
+
+    assert pdf_bytes.startswith(b"%PDF")
+
+
+def stage_counts():
+    lines = metrics.REGISTRY.exposition().splitlines()
+    return {
+        stage: next((int(line.split()[-1]) for line in lines
+                     if line.startswith(f'ars_report_stage_seconds_count{{stage="{stage}"}}')), 0)
+        for stage in ("chart_draw", "chart_encode", "template", "pdf")
+    }
+
+
+def test_pool_merges_worker_metrics(pool):
+    before = stage_counts()
+    pool.render("render_student_profile", GRADES, METADATA)
+
+    # The stages ran in the worker process but are counted here
+    assert {stage: count - before[stage] for stage, count in stage_counts().items()} == {
+        "chart_draw": 1, "chart_encode": 1, "template": 1, "pdf": 1,
+    }
+
+
+def test_pool_workers_are_reused(pool):
+    assert pool.warm_up() == pool.warm_up()
+
+
+def test_pool_rejects_unknown_tasks(pool):
+    with pytest.raises(ValueError, match="Unknown render task"):
+        pool.submit("generate_student_profile_report", 1)
+
+
+def test_report_generator_delegates_rendering(tmp_path):
+    db_manager = Mock()
+    db_manager.get_student_report_bundle.return_value = {
+        "student": pd.Series({"FirstName": "John", "LastName": "Doe", "DateOfBirth": "2000-01-01",
+                              "Email": "john.doe@example.com", "ImageURL": "missing.jpg", "AcademicYear": 2025}),
+        "subjects": pd.DataFrame([{"SubjectName": "Math", "Department": "Science"}]),
+        "grades": GRADES,
+        "university": pd.Series({"UniversityName": "Test University", "LogoURL": ""}),
+    }
+    renderer = Mock()
+    renderer.render.return_value = b"%PDF-1.4"
+
+    output_path = tmp_path / "profile.pdf"
+    ReportGenerator(db_manager, renderer=renderer).generate_student_profile_report(1, output_path=str(output_path))
+
+    task, grades_df, metadata = renderer.render.call_args.args
+    assert task == "render_student_profile"
+    assert metadata["student"]["name"] == "John Doe"
+    assert output_path.read_bytes() == b"%PDF-1.4"
@@ -0,0 +1,56 @@
+import os
+import time
+import pytest
+from report_cache import ReportCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(directory=str(tmp_path / "cache"), max_bytes=1000, max_age_seconds=3600)
+
+
+def test_key_covers_every_input():
+    key = ReportCache.key("student-profile", {"student_id": 1}, "1.1", "abc")
+
+    assert key == ReportCache.key("student-profile", {"student_id": 1}, "1.1", "abc")
+    assert key != ReportCache.key("student-profile", {"student_id": 2}, "1.1", "abc")
+    assert key != ReportCache.key("student-profile", {"student_id": 1}, "1.2", "abc")
+    assert key != ReportCache.key("student-profile", {"student_id": 1}, "1.1", "abd")
+    assert key != ReportCache.key("academic-performance", {"student_id": 1}, "1.1", "abc")
+
+
+def test_lookup_counts_hits_and_misses(cache):
+    assert cache.lookup("a") is None
+
+    cache.put("a", b"%PDF-a")
+    path = cache.lookup("a")
+
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-a"
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "hit_ratio": 0.5, "evictions": 0, "entries": 1, "bytes": 6,
+    }
+
+
+def test_expired_entries_are_not_served(cache):
+    cache.put("a", b"%PDF-a")
+    created = time.time() - 7200
+    os.utime(cache._path("a"), (created, created))
+
+    assert cache.lookup("a") is None
+    cache.evict()
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_first(cache):
+    now = time.time()
+    for age, key in enumerate(["c", "b", "a"]):
+        cache.put(key, b"x" * 400)
+        os.utime(cache._path(key), (now - 10 * (3 - age), now))
+
+    # Reading "a" makes "b" the least recently used entry
+    cache.lookup("a")
+    cache.put("d", b"x" * 400)
+
+    assert [cache.lookup(key) is not None for key in "abcd"] == [True, False, False, True]
+    assert cache.stats()["bytes"] <= 1000
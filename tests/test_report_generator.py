@@ -1,8 +1,9 @@
 import pytest
 import pandas as pd
-import matplotlib.pyplot as plt
-import base64
+import io
+import zipfile
 from report_generator import ReportGenerator
+from grade_store import GradeStore
 from unittest.mock import Mock, patch, mock_open
 
 @pytest.fixture
@@ -44,52 +45,48 @@ def mock_db_manager():
         'LogoURL': 'http://example.com/logo.png'
     })
 
-    # Mock all grades data
-    mock_db.get_all_grades.return_value = pd.DataFrame(
-        {
-            "StudentID": [1, 2, 3, 1, 2, 3],
-            "SubjectName": [
-                "Math",
-                "Physics",
-                "Chemistry",
-                "Math",
-                "Physics",
-                "Chemistry",
-            ],
-            "StudentMarks": [85, 90, 88, 75, 80, 78],
-            "MaxMarks": [100, 100, 100, 100, 100, 100],
-            "ExamDate": [
-                "2025-01-01",
-                "2025-01-02",
-                "2025-01-03",
-                "2025-02-01",
-                "2025-02-02",
-                "2025-02-03",
-            ],
-            "Department": [
-                "Science",
-                "Science",
-                "Science",
-                "Science",
-                "Science",
-                "Science",
-            ],
-        }
-    )
+    # Mock the single-snapshot bundle used by student profile reports
+    mock_db.get_student_report_bundle.return_value = {
+        "student": mock_db.get_student_data_by_id.return_value,
+        "subjects": mock_db.get_subjects_per_student.return_value,
+        "grades": mock_db.get_grades_per_student.return_value,
+        "university": mock_db.get_university_per_student.return_value,
+    }
 
-    # Mock all students data
-    mock_db.get_all_students.return_value = pd.DataFrame(
-        {
-            "StudentID": [1, 2, 3],
-            "FirstName": ["John", "Jane", "Jim"],
-            "LastName": ["Doe", "Smith", "Beam"],
-            "ImageURL": [
-                "http://example.com/photo1.jpg",
-                "http://example.com/photo2.jpg",
-                "http://example.com/photo3.jpg",
-            ],
-        }
-    )
+    # Mock academic statistics
+    mock_db.get_academic_statistics.return_value = {
+        "grade_bands": [0, 0, 0, 3, 3, 0],
+        "total_students": 3,
+        "average_performance": 82.67,
+        "passing_students": 3,
+        "top_performers": 0,
+        "subject_avg": pd.Series(
+            {"Chemistry": 83.0, "Math": 80.0, "Physics": 85.0}, name="percentage"
+        ),
+        "dept_avg": pd.Series({"Science": 82.67}, name="percentage"),
+        "monthly_avg": pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2025-01-01", "2025-02-01"]),
+                "mean": [87.67, 77.67],
+                "std": [2.52, 2.52],
+            }
+        ),
+        "top_students": pd.DataFrame(
+            {
+                "StudentID": [2, 3, 1],
+                "FirstName": ["Jane", "Jim", "John"],
+                "LastName": ["Smith", "Beam", "Doe"],
+                "ImageURL": [
+                    "http://example.com/photo2.jpg",
+                    "http://example.com/photo3.jpg",
+                    "http://example.com/photo1.jpg",
+                ],
+                "average": [85.0, 83.0, 80.0],
+                "subjects": [1, 1, 1],
+                "top_subject": ["Physics", "Chemistry", "Math"],
+            }
+        ),
+    }
 
     # Mock university details
     mock_db.get_universities_details.return_value = pd.Series(
@@ -106,65 +103,62 @@ def report_generator(mock_db_manager):
         mock_template.render.return_value = '<html>Test Template</html>'
         mock_env.return_value.get_template.return_value = mock_template
         
-        return ReportGenerator(mock_db_manager)
+        # Keep the example.com logo and photo URLs offline
+        assets = Mock()
+        assets.resolve.return_value = None
+        assets.data_uri.return_value = ''
 
-def test_save_plot_to_base64_with_plt():
-    """Test _save_plot_to_base64 method with matplotlib plot"""
-    generator = ReportGenerator(Mock())
-    
-    # Create a simple plot
-    plt.figure()
-    plt.plot([1, 2, 3], [1, 2, 3])
-    
-    # Get base64 string
-    result = generator._save_plot_to_base64(plt)
-    
-    assert isinstance(result, str)
-    assert result.startswith('iVBOR') # Common PNG header in base64
-
-def test_save_plot_to_base64_with_image():
-    """Test _save_plot_to_base64 method with raw image data"""
-    generator = ReportGenerator(Mock())
-    
-    # Create dummy image data
-    image_data = b'test image data'
-    result = generator._save_plot_to_base64(image=image_data)
-    
-    assert isinstance(result, str)
-    assert result == base64.b64encode(image_data).decode('utf-8')
-
-def test_html_to_pdf():
-    """Test _html_to_pdf method"""
+        return ReportGenerator(mock_db_manager, assets=assets)
+
+GRADES = pd.DataFrame(
+    {
+        "SubjectName": ["Math", "Physics"] * 2,
+        "StudentMarks": [85, 90, 88, 92],
+        "MaxMarks": [100, 100, 100, 100],
+        "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
+    }
+)
+
+def test_html_to_pdf_bytes():
+    """Test _html_to_pdf_bytes returns what xhtml2pdf writes"""
     generator = ReportGenerator(Mock())
-    
-    with patch('xhtml2pdf.pisa.CreatePDF') as mock_create_pdf:
+
+    def create_pdf(html, dest):
+        dest.write(b"%PDF-1.4")
+        return Mock(err=0)
+
+    with patch('xhtml2pdf.pisa.CreatePDF', side_effect=create_pdf) as mock_create_pdf:
+        result = generator._html_to_pdf_bytes('<html>Test</html>')
+
+    mock_create_pdf.assert_called_once()
+    assert result == b"%PDF-1.4"
+
+def test_render_student_profile_embeds_the_achievements_chart(report_generator):
+    """Test render_student_profile passes charts.render_data_uri's PNG to the template"""
+    template = Mock()
+    template.render.return_value = '<html>Test Template</html>'
+
+    with patch.object(report_generator.template_env, 'get_template', return_value=template), \
+            patch('xhtml2pdf.pisa.CreatePDF') as mock_create_pdf:
         mock_create_pdf.return_value.err = 0
-        
-        with patch('builtins.open', mock_open()) as mock_file:
-            result = generator._html_to_pdf('<html>Test</html>', 'test.pdf')
-            
-            mock_create_pdf.assert_called_once()
-            mock_file.assert_called_once_with('test.pdf', 'w+b')
-            assert result == 0
-
-def test_create_student_achievements_plots():
-    """Test _create_student_achievements_plots method"""
-    generator = ReportGenerator(Mock())
+        report_generator.render_student_profile(GRADES.copy(), {"student": {"name": "John Doe"}})
 
-    # Create test data
-    grades_df = pd.DataFrame(
-        {
-            "SubjectName": ["Math", "Physics"] * 2,
-            "StudentMarks": [85, 90, 88, 92],
-            "MaxMarks": [100, 100, 100, 100],
-            "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
-        }
-    )
+    context = template.render.call_args.kwargs
+    assert context["student"] == {"name": "John Doe"}
+    assert context["general_achievements"].startswith("data:image/png;base64,iVBOR")
+
+def test_render_academic_performance_embeds_its_chart(report_generator):
+    """Test render_academic_performance passes charts.render_data_uri's PNG to the template"""
+    chart_data, template_data = report_generator._academic_performance_data()
+    template = Mock()
+    template.render.return_value = '<html>Test Template</html>'
 
-    fig = generator._create_student_achievements_plots(grades_df)
+    with patch.object(report_generator.template_env, 'get_template', return_value=template), \
+            patch('xhtml2pdf.pisa.CreatePDF') as mock_create_pdf:
+        mock_create_pdf.return_value.err = 0
+        report_generator.render_academic_performance(chart_data, template_data)
 
-    assert isinstance(fig, plt.Figure)
-    assert len(fig.axes) == 4  # Should have 4 subplots
+    assert template.render.call_args.kwargs["performance_data"].startswith("data:image/png;base64,iVBOR")
 
 @pytest.mark.asyncio
 async def test_generate_student_profile_report(report_generator, mock_db_manager):
@@ -176,37 +170,16 @@ async def test_generate_student_profile_report(report_generator, mock_db_manager
 
                 result = report_generator.generate_student_profile_report(1)
 
-                # Verify all database calls were made
-                mock_db_manager.get_student_data_by_id.assert_called_once_with(1)
-                mock_db_manager.get_subjects_per_student.assert_called_once_with(1)
-                mock_db_manager.get_grades_per_student.assert_called_once_with(1)
-                mock_db_manager.get_university_per_student.assert_called_once_with(1)
+                # Verify all data came from a single bundle call
+                mock_db_manager.get_student_report_bundle.assert_called_once_with(1)
+                mock_db_manager.get_student_data_by_id.assert_not_called()
+                mock_db_manager.get_grades_per_student.assert_not_called()
 
                 # Verify PDF was created
                 mock_makedirs.assert_called_once_with('reports', exist_ok=True)
                 assert result == 'reports/student_1_profile.pdf'
 
 
-def test_create_student_achievements_plots():
-    """Test _create_student_achievements_plots method"""
-    generator = ReportGenerator(Mock())
-
-    # Create test data
-    grades_df = pd.DataFrame(
-        {
-            "SubjectName": ["Math", "Physics"] * 2,
-            "StudentMarks": [85, 90, 88, 92],
-            "MaxMarks": [100, 100, 100, 100],
-            "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
-        }
-    )
-
-    fig = generator._create_student_achievements_plots(grades_df)
-
-    assert isinstance(fig, plt.Figure)
-    assert len(fig.axes) == 4  # Should have 4 subplots
-
-
 @pytest.mark.asyncio
 async def test_generate_academic_performance_report(report_generator, mock_db_manager):
     """Test generate_academic_performance_report method"""
@@ -218,10 +191,170 @@ async def test_generate_academic_performance_report(report_generator, mock_db_ma
                 result = report_generator.generate_academic_performance_report()
 
                 # Verify all database calls were made
-                mock_db_manager.get_all_grades.assert_called_once()
-                mock_db_manager.get_all_students.assert_called_once()
+                mock_db_manager.get_academic_statistics.assert_called_once()
                 mock_db_manager.get_universities_details.assert_called_once()
 
                 # Verify PDF was created
                 mock_makedirs.assert_called_once_with('reports', exist_ok=True)
                 assert result == 'reports/academic_performance_report.pdf'
+
+
+def test_stream_cohort_zip_writes_one_pdf_per_student():
+    """Test stream_cohort_zip renders every student of the cohort into one archive"""
+    mock_db = Mock()
+    grades = pd.DataFrame(
+        {
+            "StudentID": [1, 1, 2, 2],
+            "SubjectName": ["Math", "Physics"] * 2,
+            "Department": ["Science"] * 4,
+            "ExamName": ["Midterm"] * 4,
+            "StudentMarks": [85, 90, 88, 92],
+            "MaxMarks": [100, 100, 100, 100],
+            "ExamDate": ["2025-01-01", "2025-01-02", "2025-02-01", "2025-02-02"],
+        }
+    )
+    mock_db.get_cohort_report_data.return_value = {
+        "students": pd.DataFrame(
+            {
+                "StudentID": [1, 2, 3],
+                "FirstName": ["John", "Jane", "Jim"],
+                "LastName": ["Doe", "Smith", "Beam"],
+                "DateOfBirth": ["2000-01-01"] * 3,
+                "Email": ["student@example.com"] * 3,
+                "ImageURL": ["missing.jpg"] * 3,
+                "AcademicYear": [2025] * 3,
+                "UniversityID": [1] * 3,
+            }
+        ),
+        "universities": pd.DataFrame(
+            {"UniversityID": [1], "UniversityName": ["Test University"], "LogoURL": [""]}
+        ).set_index("UniversityID", drop=False),
+        "grades": GradeStore.from_frame(grades),
+    }
+    generator = ReportGenerator(mock_db)
+
+    def fake_render(grades_df, metadata):
+        if grades_df.empty:
+            raise IndexError("no grades")
+        return f"%PDF {metadata['student']['name']} {len(grades_df)}".encode()
+
+    with patch.object(generator, 'render_student_profile', side_effect=fake_render):
+        chunks = list(generator.stream_cohort_zip(university_id=1))
+
+    mock_db.get_cohort_report_data.assert_called_once_with(1, None, None)
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.read("student_1_profile.pdf") == b"%PDF John Doe 2"
+        assert archive.read("student_2_profile.pdf") == b"%PDF Jane Smith 2"
+        # Jim has no grades, so his report fails without aborting the others
+        assert archive.read("errors.txt") == b"student 3: no grades\n"
+
+
+def test_stream_cohort_zip_records_students_without_a_university():
+    """A student with a NULL or unknown UniversityID is listed in errors.txt, not a truncated archive"""
+    mock_db = Mock()
+    grades = pd.DataFrame(
+        {
+            "StudentID": [1, 2, 3],
+            "SubjectName": ["Math"] * 3,
+            "Department": ["Science"] * 3,
+            "ExamName": ["Midterm"] * 3,
+            "StudentMarks": [85, 90, 88],
+            "MaxMarks": [100] * 3,
+            "ExamDate": ["2025-01-01"] * 3,
+        }
+    )
+    mock_db.get_cohort_report_data.return_value = {
+        "students": pd.DataFrame(
+            {
+                "StudentID": [1, 2, 3],
+                "FirstName": ["John", "Jane", "Jim"],
+                "LastName": ["Doe", "Smith", "Beam"],
+                "DateOfBirth": ["2000-01-01"] * 3,
+                "Email": ["student@example.com"] * 3,
+                "ImageURL": ["missing.jpg"] * 3,
+                "AcademicYear": [2025] * 3,
+                "UniversityID": [None, 9, 1],
+            }
+        ),
+        "universities": pd.DataFrame(
+            {"UniversityID": [1], "UniversityName": ["Test University"], "LogoURL": [""]}
+        ).set_index("UniversityID", drop=False),
+        "grades": GradeStore.from_frame(grades),
+    }
+    generator = ReportGenerator(mock_db)
+
+    with patch.object(generator, 'render_student_profile', return_value=b"%PDF"):
+        chunks = list(generator.stream_cohort_zip(academic_year=2025))
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["student_3_profile.pdf", "errors.txt"]
+        assert archive.read("errors.txt") == (
+            b"student 1: No university recorded.\n"
+            b"student 2: University 9 not found.\n"
+        )
+
+
+def test_iter_cohort_reports_rejects_empty_cohorts():
+    mock_db = Mock()
+    mock_db.get_cohort_report_data.return_value = {"students": pd.DataFrame(), "universities": None, "grades": None}
+
+    with pytest.raises(LookupError):
+        ReportGenerator(mock_db).iter_cohort_reports(academic_year=1900)
+
+
+def test_cached_reports_skip_the_database_and_renderer(tmp_path):
+    """Test a second request for unchanged data is served from the report cache"""
+    from report_cache import ReportCache
+
+    mock_db = Mock()
+    mock_db.get_data_version.return_value = "1.1"
+    generator = ReportGenerator(mock_db, cache=ReportCache(directory=str(tmp_path / "cache")))
+
+    with patch.object(generator, '_student_profile_data', return_value=(None, None)) as data, \
+            patch.object(generator, 'render_student_profile', return_value=b"%PDF-1") as render:
+        first = generator.generate_student_profile_report(1, output_path=str(tmp_path / "first.pdf"))
+        second = generator.generate_student_profile_report(1, output_path=str(tmp_path / "second.pdf"))
+
+        # New data for the student invalidates the cached report
+        mock_db.get_data_version.return_value = "1.2"
+        generator.generate_student_profile_report(1, output_path=str(tmp_path / "third.pdf"))
+
+    assert data.call_count == render.call_count == 2
+    assert open(first, "rb").read() == open(second, "rb").read() == b"%PDF-1"
+    assert generator.cache.stats()["hits"] == 1
+
+
+def test_failed_pdf_conversions_are_errors_and_never_cached(tmp_path):
+    """A PDF xhtml2pdf reported errors for is neither written, cached nor zipped"""
+    from report_cache import ReportCache
+
+    mock_db = Mock()
+    mock_db.get_data_version.return_value = "1.1"
+    mock_db.get_cohort_report_data.return_value = {
+        "students": pd.DataFrame({"StudentID": [1], "UniversityID": [1]}),
+        "universities": pd.DataFrame({"UniversityID": [1]}).set_index("UniversityID", drop=False),
+        "grades": GradeStore.from_frame(pd.DataFrame({
+            "StudentID": [1], "SubjectName": ["Math"], "Department": ["Science"], "ExamName": ["Midterm"],
+            "StudentMarks": [85], "MaxMarks": [100], "ExamDate": ["2025-01-01"],
+        })),
+    }
+    generator = ReportGenerator(mock_db, cache=ReportCache(directory=str(tmp_path / "cache")))
+
+    def render(*args):
+        return generator._html_to_pdf_bytes("<html>Test</html>")
+
+    with patch('xhtml2pdf.pisa.CreatePDF') as create_pdf, \
+            patch.object(generator, '_student_profile_data', return_value=(None, None)), \
+            patch.object(generator, '_student_profile_metadata', return_value={}), \
+            patch.object(generator, 'render_student_profile', side_effect=render):
+        create_pdf.return_value.err = 2
+
+        with pytest.raises(RuntimeError, match="2 xhtml2pdf errors"):
+            generator.generate_student_profile_report(1, output_path=str(tmp_path / "profile.pdf"))
+        chunks = list(generator.stream_cohort_zip(student_ids=[1]))
+
+    assert not (tmp_path / "profile.pdf").exists()
+    assert generator.cache.stats()["entries"] == 0
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["errors.txt"]
+        assert archive.read("errors.txt") == b"student 1: PDF conversion failed with 2 xhtml2pdf errors.\n"
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from report_jobs import ReportJobManager
+
+
+def write_pdf(output_path, **params):
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.4")
+    return output_path
+
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def generator():
+    mock_generator = Mock()
+    mock_generator.generate_student_profile_report.side_effect = write_pdf
+    mock_generator.generate_academic_performance_report.side_effect = write_pdf
+    return mock_generator
+
+
+def test_job_renders_in_background(generator, tmp_path):
+    jobs = ReportJobManager(generator, workers=1, output_dir=str(tmp_path))
+
+    job = wait_for(jobs.submit("student-profile", student_id=7))
+
+    assert job.status == "succeeded"
+    assert os.path.isfile(job.output_path)
+    generator.generate_student_profile_report.assert_called_once_with(student_id=7, output_path=job.output_path)
+    jobs.shutdown()
+
+
+def test_failed_job_reports_error(generator, tmp_path):
+    generator.generate_academic_performance_report.side_effect = IndexError("no grades")
+    jobs = ReportJobManager(generator, workers=1, output_dir=str(tmp_path))
+
+    job = wait_for(jobs.submit("academic-performance"))
+
+    assert job.status == "failed"
+    assert job.error == "no grades"
+    jobs.shutdown()
+
+
+def test_concurrency_is_bounded(generator, tmp_path):
+    release = threading.Event()
+    generator.generate_academic_performance_report.side_effect = lambda **kwargs: release.wait(5)
+    jobs = ReportJobManager(generator, workers=1, output_dir=str(tmp_path))
+
+    first = jobs.submit("academic-performance")
+    second = jobs.submit("academic-performance")
+    time.sleep(0.1)
+
+    assert (first.status, second.status) == ("running", "queued")
+    release.set()
+    assert wait_for(second).status == "succeeded"
+    jobs.shutdown()
+
+
+def test_expired_jobs_are_purged_with_their_files(generator, tmp_path):
+    jobs = ReportJobManager(generator, workers=1, ttl_seconds=0, output_dir=str(tmp_path))
+
+    job = wait_for(jobs.submit("student-profile", student_id=7))
+
+    assert jobs.get(job.id) is None
+    assert not os.path.exists(job.output_path)
+    jobs.shutdown()
+
+
+def test_unknown_report_type(generator, tmp_path):
+    jobs = ReportJobManager(generator, output_dir=str(tmp_path))
+
+    with pytest.raises(ValueError, match="Unknown report type"):
+        jobs.submit("transcript")
+    jobs.shutdown()
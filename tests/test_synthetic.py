@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.bench_suite import query_benchmarks
+from database import DatabaseManager
+
+
+def file_hashes(directory):
+    hashes = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    """DatabaseManager seeded from a small synthetic dataset"""
+    synthetic.generate(str(tmp_path / "csv"), students=300, grades=5_000, seed=7)
+    manager = DatabaseManager(db_path=str(tmp_path / "synthetic.db"), csv_dir=str(tmp_path / "csv"))
+    yield manager
+    manager.close()
+
+
+def test_generate_is_deterministic(tmp_path):
+    counts = synthetic.generate(str(tmp_path / "a"), students=200, grades=3_000, seed=1)
+    synthetic.generate(str(tmp_path / "b"), students=200, grades=3_000, seed=1)
+    synthetic.generate(str(tmp_path / "c"), students=200, grades=6_000, seed=1)
+
+    assert counts == {"Universities": 2, "Subjects": 40, "Students": 200, "Exams": 120, "Grades": 3_000}
+    assert file_hashes(tmp_path / "a") == file_hashes(tmp_path / "b")
+    # More grades leave the other tables untouched
+    grown = file_hashes(tmp_path / "c")
+    assert grown.pop("Grades.csv") != file_hashes(tmp_path / "a")["Grades.csv"]
+    assert all(file_hashes(tmp_path / "a")[name] == digest for name, digest in grown.items())
+
+
+def test_generate_rejects_empty_tables(tmp_path):
+    with pytest.raises(ValueError, match="at least one row"):
+        synthetic.generate(str(tmp_path), students=0, grades=10)
+
+
+def test_generated_dataset_seeds_consistently(seeded):
+    with seeded.connection() as conn:
+        orphans = conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM Grades g LEFT JOIN Students s USING (StudentID) WHERE s.StudentID IS NULL),
+                (SELECT COUNT(*) FROM Grades g LEFT JOIN Exams e USING (ExamID) WHERE e.ExamID IS NULL),
+                (SELECT COUNT(*) FROM Exams e LEFT JOIN Subjects s USING (SubjectID) WHERE s.SubjectID IS NULL),
+                (SELECT COUNT(*) FROM Students s LEFT JOIN Universities u USING (UniversityID)
+                 WHERE u.UniversityID IS NULL)
+        """).fetchone()
+        out_of_range = conn.execute("""
+            SELECT COUNT(*) FROM Grades g JOIN Exams e USING (ExamID)
+            WHERE g.MarksObtained < 0 OR g.MarksObtained > e.MaximumMarks
+        """).fetchone()[0]
+        photos = [row[0] for row in conn.execute("SELECT DISTINCT ImageURL FROM Students")]
+
+    assert orphans == (0, 0, 0, 0)
+    assert out_of_range == 0
+    assert all(os.path.exists(os.path.join("static", "imgs", "students", photo)) for photo in photos)
+    statistics = seeded.get_academic_statistics([50, 60, 70, 80, 90])
+    assert 50 < statistics["average_performance"] < 85
+
+
+def test_suite_covers_every_query(seeded):
+    with seeded.connection() as conn:
+        ids = {
+            "Universities": np.array([row[0] for row in conn.execute("SELECT UniversityID FROM Universities")]),
+            "Students": np.array([row[0] for row in conn.execute("SELECT StudentID FROM Students")]),
+        }
+    ids["Grades"] = range(1, 5_001)
+
+    benchmarks = query_benchmarks(seeded, np.random.default_rng(0), 3, ids, max_full_rows=10_000)
+
+    # Each benchmark runs against the generated data
+    for call, arguments in benchmarks.values():
+        call(arguments[0])